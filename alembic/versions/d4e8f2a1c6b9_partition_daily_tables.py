@@ -0,0 +1,162 @@
+"""partition daily tables by year, covering date indexes
+
+Revision ID: d4e8f2a1c6b9
+Revises: c3d9e1f0b2a7
+Create Date: 2026-10-17 14:05:11.402913
+
+daily_inputs and daily_kpis become PARTITION BY RANGE (date) tables with one partition per
+year (<table>_yYYYY) and a <table>_default partition, so range reads only touch the years
+they need (partition pruning).
+
+The unique constraint on date becomes a covering index, UNIQUE (date) INCLUDE (<value columns>):
+the dashboard KPI range reads and the ingest context reads select only date + those columns,
+so they can be answered with index-only scans (no heap access once autovacuum has set the
+visibility map).
+
+Postgres rules for partitioned tables:
+- the primary key must contain the partition key: (id) -> (id, date). ids still come from the
+  same sequence, so they stay unique and the ORM models (primary key = id) keep working.
+- ON CONFLICT must infer the unique index from (date) (the repositories do).
+
+Partitions are created here from the first stored year to this year + 2. Later years are created
+by app/infrastructure/db/partitions.py (at API startup or from cron); until then rows land in the
+default partition.
+"""
+from datetime import date
+from typing import Callable, Sequence, Union
+
+from alembic import context, op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd4e8f2a1c6b9'
+down_revision: Union[str, Sequence[str], None] = 'c3d9e1f0b2a7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+YEARS_AHEAD = 2
+
+
+def _id_column(table: str) -> sa.Column:
+    # Keeps using the SERIAL sequence of the original table (no new sequence, same ids)
+    return sa.Column('id', sa.Integer(), server_default=sa.text(f"nextval('{table}_id_seq'::regclass)"),
+                     autoincrement=False, nullable=False)
+
+
+def _kpi_columns() -> list[sa.Column]:
+    return [
+        _id_column('daily_kpis'),
+        sa.Column('date', sa.Date(), nullable=False),
+        sa.Column('kcal_out_total', sa.Float(), nullable=True),
+        sa.Column('balance_kcal', sa.Float(), nullable=True),
+        sa.Column('balance_7d_average', sa.Float(), nullable=True),
+        sa.Column('protein_per_kg', sa.Float(), nullable=True),
+        sa.Column('healthy_food_pct', sa.Float(), nullable=True),
+        sa.Column('adherence_steps', sa.Integer(), nullable=True),
+        sa.Column('weight_7d_avg', sa.Float(), nullable=True),
+        sa.Column('waist_change_7d', sa.Float(), nullable=True),
+        sa.Column('computed_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    ]
+
+
+def _input_columns() -> list[sa.Column]:
+    return [
+        _id_column('daily_inputs'),
+        sa.Column('date', sa.Date(), nullable=False),
+        sa.Column('steps_n', sa.Integer(), nullable=True),
+        sa.Column('proteins_g', sa.Integer(), nullable=True),
+        sa.Column('kcal_in', sa.Integer(), nullable=True),
+        sa.Column('kcal_junk_in', sa.Integer(), nullable=True),
+        sa.Column('kcal_out_training', sa.Integer(), nullable=True),
+        sa.Column('stress_rel', sa.Integer(), nullable=True),
+        sa.Column('sleep_hours', sa.Float(), nullable=True),
+        sa.Column('weight_kg', sa.Float(), nullable=True),
+        sa.Column('waist_cm', sa.Float(), nullable=True),
+        sa.Column('source', sa.String(length=50), nullable=True),
+    ]
+
+
+# table -> (columns, columns INCLUDEd in the covering unique index on date)
+TABLES: dict[str, tuple[Callable[[], list[sa.Column]], list[str]]] = {
+    'daily_inputs': (_input_columns, [
+        'steps_n', 'proteins_g', 'kcal_in', 'kcal_junk_in', 'kcal_out_training',
+        'sleep_hours', 'stress_rel', 'weight_kg', 'waist_cm',
+    ]),
+    'daily_kpis': (_kpi_columns, [
+        'kcal_out_total', 'balance_kcal', 'balance_7d_average', 'protein_per_kg', 'healthy_food_pct',
+        'adherence_steps', 'weight_7d_avg', 'waist_change_7d',
+    ]),
+}
+
+
+def _column_list(columns: Callable[[], list[sa.Column]]) -> str:
+    return ', '.join(c.name for c in columns())
+
+
+def _first_year(table: str) -> int:
+    this_year = date.today().year
+    if context.is_offline_mode():
+        return this_year
+    first = op.get_bind().execute(sa.text(f'SELECT min(date) FROM {table}')).scalar()
+    return min(first.year, this_year) if first is not None else this_year
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    if op.get_context().dialect.name != 'postgresql':
+        return
+
+    for table, (columns, include) in TABLES.items():
+        old = f'{table}_unpartitioned'
+        op.rename_table(table, old)
+        # Free the constraint / index names for the new table
+        op.execute(f'ALTER TABLE {old} RENAME CONSTRAINT {table}_pkey TO {old}_pkey')
+        op.execute(f'ALTER TABLE {old} RENAME CONSTRAINT uq_{table}_date TO uq_{old}_date')
+
+        op.create_table(
+            table,
+            *columns(),
+            sa.PrimaryKeyConstraint('id', 'date', name=f'{table}_pkey'),
+            sa.UniqueConstraint('date', name=f'uq_{table}_date', postgresql_include=include),
+            postgresql_partition_by='RANGE (date)',
+        )
+        op.execute(f'CREATE TABLE {table}_default PARTITION OF {table} DEFAULT')
+        for year in range(_first_year(old), date.today().year + YEARS_AHEAD + 1):
+            op.execute(
+                f"CREATE TABLE {table}_y{year} PARTITION OF {table} "
+                f"FOR VALUES FROM ('{date(year, 1, 1)}') TO ('{date(year + 1, 1, 1)}')"
+            )
+
+        column_list = _column_list(columns)
+        op.execute(f'INSERT INTO {table} ({column_list}) SELECT {column_list} FROM {old}')
+        # The sequence belongs to the old id column: move it before dropping the old table
+        op.execute(f'ALTER SEQUENCE {table}_id_seq OWNED BY {table}.id')
+        op.drop_table(old)
+        op.execute(f'ANALYZE {table}')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_context().dialect.name != 'postgresql':
+        return
+
+    for table, (columns, _include) in TABLES.items():
+        partitioned = f'{table}_partitioned'
+        op.rename_table(table, partitioned)
+        op.execute(f'ALTER TABLE {partitioned} RENAME CONSTRAINT {table}_pkey TO {partitioned}_pkey')
+        op.execute(f'ALTER TABLE {partitioned} RENAME CONSTRAINT uq_{table}_date TO uq_{partitioned}_date')
+
+        op.create_table(
+            table,
+            *columns(),
+            sa.PrimaryKeyConstraint('id', name=f'{table}_pkey'),
+            sa.UniqueConstraint('date', name=f'uq_{table}_date'),
+        )
+
+        column_list = _column_list(columns)
+        op.execute(f'INSERT INTO {table} ({column_list}) SELECT {column_list} FROM {partitioned}')
+        op.execute(f'ALTER SEQUENCE {table}_id_seq OWNED BY {table}.id')
+        # Dropping the partitioned table drops its partitions too
+        op.drop_table(partitioned)
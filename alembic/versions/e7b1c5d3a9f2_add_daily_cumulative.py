@@ -0,0 +1,51 @@
+"""add daily_cumulative
+
+Revision ID: e7b1c5d3a9f2
+Revises: d4e8f2a1c6b9
+Create Date: 2026-10-17 16:40:27.559301
+
+Prefix sums for /api/stats/range: one row per calendar day with the running sum (<column>_sum)
+and non-null count (<column>_n) of every input and KPI column up to that day.
+The table starts empty; the next CSV upload fills it from the first input day
+(RefreshCumulativeStats finds no earlier row and rebuilds everything).
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e7b1c5d3a9f2'
+down_revision: Union[str, Sequence[str], None] = 'd4e8f2a1c6b9'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+COLUMNS = (
+    # inputs
+    'steps_n', 'proteins_g', 'kcal_in', 'kcal_junk_in', 'kcal_out_training',
+    'sleep_hours', 'stress_rel', 'weight_kg', 'waist_cm',
+    # KPIs
+    'kcal_out_total', 'balance_kcal', 'balance_7d_average', 'protein_per_kg', 'healthy_food_pct',
+    'adherence_steps', 'weight_7d_avg', 'waist_change_7d',
+)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('daily_cumulative',
+    sa.Column('date', sa.Date(), nullable=False),
+    sa.Column('input_days', sa.Integer(), nullable=False),
+    *[
+        column
+        for name in COLUMNS
+        for column in (sa.Column(f'{name}_sum', sa.Float(), nullable=False), sa.Column(f'{name}_n', sa.Integer(), nullable=False))
+    ],
+    sa.PrimaryKeyConstraint('date')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('daily_cumulative')
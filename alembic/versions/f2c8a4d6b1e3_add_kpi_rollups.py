@@ -0,0 +1,55 @@
+"""add kpi_rollups
+
+Revision ID: f2c8a4d6b1e3
+Revises: e7b1c5d3a9f2
+Create Date: 2026-10-17 18:05:12.184390
+
+Weekly / monthly KPI rollups for /api/kpis/rollup: one row per (granularity, period_start)
+with <kpi>_mean / _min / _max / _n of every persisted KPI and the steps adherence ratio.
+The table starts empty; the next CSV upload fills it for the whole history
+(RefreshKPIRollups rebuilds everything while the table is empty).
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f2c8a4d6b1e3'
+down_revision: Union[str, Sequence[str], None] = 'e7b1c5d3a9f2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+KPI_COLUMNS = (
+    'kcal_out_total', 'balance_kcal', 'balance_7d_average', 'protein_per_kg', 'healthy_food_pct',
+    'adherence_steps', 'weight_7d_avg', 'waist_change_7d',
+)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('kpi_rollups',
+    sa.Column('granularity', sa.String(length=8), nullable=False),
+    sa.Column('period_start', sa.Date(), nullable=False),
+    sa.Column('period_end', sa.Date(), nullable=False),
+    sa.Column('days', sa.Integer(), nullable=False),
+    sa.Column('adherence_ratio', sa.Float(), nullable=True),
+    *[
+        column
+        for name in KPI_COLUMNS
+        for column in (
+            sa.Column(f'{name}_mean', sa.Float(), nullable=True),
+            sa.Column(f'{name}_min', sa.Float(), nullable=True),
+            sa.Column(f'{name}_max', sa.Float(), nullable=True),
+            sa.Column(f'{name}_n', sa.Integer(), nullable=False),
+        )
+    ],
+    sa.PrimaryKeyConstraint('granularity', 'period_start')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('kpi_rollups')
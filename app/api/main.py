@@ -1,12 +1,40 @@
 from fastapi import FastAPI
 #from fastapi import APIRouter
-from app.api.routers import kpis, upload
+from contextlib import asynccontextmanager
+
+from fastapi.concurrency import run_in_threadpool
+
+from app.api.routers import kpis, metrics, stats, upload
+from app.infrastructure.cache.hot_series import get_hot_series_store, hot_store_enabled
+from app.infrastructure.db.engine import dispose_async_engine, engine as db_engine
+from app.infrastructure.db.partitions import ensure_future_partitions
+
+import logging
+
+logger = logging.getLogger(__name__)
 
 from dotenv import load_dotenv
 load_dotenv()
 
 
-app = FastAPI(title="Health Metrics Hub API", version="1.0.0", debug=True)
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Yearly partitions of the daily tables for the coming years (no-op on SQLite / unpartitioned tables).
+    # A failure only means new rows go to the default partition for now: log it and keep starting.
+    try:
+        await run_in_threadpool(ensure_future_partitions, db_engine)
+    except Exception:
+        logger.exception("Could not create future partitions")
+
+    # Warm the in-memory KPI history once at startup (if the DB is down it stays cold
+    # and reads fall back to Postgres until it can be loaded)
+    if hot_store_enabled():
+        await run_in_threadpool(get_hot_series_store().load)
+    yield
+    await dispose_async_engine()
+
+
+app = FastAPI(title="Health Metrics Hub API", version="1.0.0", debug=True, lifespan=lifespan)
 
 from fastapi.middleware.cors import CORSMiddleware
 
@@ -21,5 +49,7 @@ app.add_middleware(
 #Include routers
 app.include_router(kpis.router, prefix="/api", tags=["KPIs"])
 app.include_router(upload.router, prefix="/api", tags=["Upload"])
+app.include_router(metrics.router, prefix="/api", tags=["Metrics"])
+app.include_router(stats.router, prefix="/api", tags=["Stats"])
 
 
@@ -1,26 +1,88 @@
-from fastapi import APIRouter, Query
-from datetime import datetime
-from app.api.schemas import DailyKPIsResponse
+from fastapi import APIRouter, Query, Response
+from datetime import date, datetime
+import base64
+import binascii
+import json
+from app.api.schemas import DailyKPIsResponse, KPIRollupResponse, KPISeriesResponse
 from fastapi import HTTPException
-from app.infrastructure.db.repository_impl import DI_Postgres_OutputRepository
-from app.infrastructure.db.engine import get_db_session
+from app.infrastructure.db.repository_impl import DI_Postgres_OutputRepository, DI_Postgres_RollupRepository
+from app.infrastructure.db.engine import get_async_read_db_session, get_read_db_session
+from app.infrastructure.db.async_repository_impl import DI_AsyncPostgres_OutputRepository
+from app.infrastructure.archive.parquet_archive import get_parquet_archive
+from app.infrastructure.archive.tiered_repository import AsyncTieredOutputRepository, build_output_repository
+from app.infrastructure.cache.kpi_cache import CachedOutputRepository, get_kpi_cache
+from app.infrastructure.cache.hot_series import HotSeriesOutputRepository, get_hot_series_store, hot_store_enabled
+from app.domain.interfaces import AsyncOutputRepository_Interface, OutputRepository_Interface, RollupRepository_Interface
 
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from fastapi import Depends
+from fastapi.responses import StreamingResponse
+from typing import AsyncIterator, Optional
 
-from app.business.use_cases import GetKPIs
+from app.business.use_cases import AsyncStreamKPIs, GetKPIPage, GetKPIRollups, GetKPIs, GetKPISeries
 
 
 
 
 router = APIRouter()
 
-# Dependency provider for the repo. This function will be called by FastAPI to get an instance of the repository for each request. It uses the get_db_session dependency to get a database session and then creates an instance of DI_Postgres_OutputRepository with that session.
-def get_output_repo(db: Session = Depends(get_db_session)) -> DI_Postgres_OutputRepository:
-    return DI_Postgres_OutputRepository(db_session=db)
+# Dependency provider for the repo. This function will be called by FastAPI to get an instance of the repository for each request. It uses the get_read_db_session dependency to get a database session and then creates an instance of DI_Postgres_OutputRepository with that session.
+# ONE in-process read layer wraps the Postgres repo:
+# - the hot series store (full history in memory) by default: once warm it answers every range read,
+#   so a range cache under it would never be hit;
+# - the read-through range cache when the store is disabled (KPI_HOT_STORE=0).
+# Also used by the upload router, so writes go through the same layer and keep it up to date (the upload passes its own primary session).
+# Read endpoints get a read session: the replica if READ_DATABASE_URL is set, except right after a write.
+# With KPI_ARCHIVE_DIR set, closed years are read from (and written to) their Parquet files under that layer.
+def get_output_repo(db: Session = Depends(get_read_db_session)) -> OutputRepository_Interface:
+    repo = build_output_repository(db)
+    if hot_store_enabled():
+        return HotSeriesOutputRepository(repo, get_hot_series_store())
+    return CachedOutputRepository(repo, get_kpi_cache())
 
 
+# Async repository for `async def` endpoints (AsyncSession, the event loop is never blocked by the DB).
+# The sync endpoints above stay `def`: FastAPI runs them in its thread pool, so they don't block the
+# loop either, and they keep the in-process cache / hot store (which are sync, in-memory).
+def get_async_output_repo(db: AsyncSession = Depends(get_async_read_db_session)) -> AsyncOutputRepository_Interface:
+    repo: AsyncOutputRepository_Interface = DI_AsyncPostgres_OutputRepository(db_session=db)
+    archive = get_parquet_archive()
+    return AsyncTieredOutputRepository(repo, archive) if archive is not None else repo
+
+
+# Dependency provider for the weekly / monthly rollups (read session: replica if configured).
+# kpi_rollups stays in Postgres whatever is archived: it is small and covers the whole history.
+def get_rollup_repo(db: Session = Depends(get_read_db_session)) -> RollupRepository_Interface:
+    return DI_Postgres_RollupRepository(db_session=db)
+
+
+
+# Keyset pagination on /kpis/ (opt-in with `limit` or `cursor`)
+DEFAULT_PAGE_LIMIT = 100
+MAX_PAGE_LIMIT = 1000
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+# The cursor is opaque for clients: base64url of a small versioned JSON token holding the
+# last date of the previous page. Clients only pass it back, so its content can change later
+# (bump "v") without breaking them.
+def encode_cursor(after: date) -> str:
+    token = json.dumps({"v": 1, "after": after.isoformat()}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(token.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> date:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        token = json.loads(raw)
+        if token.get("v") != 1:
+            raise ValueError
+        return date.fromisoformat(token["after"])
+    except (binascii.Error, UnicodeDecodeError, ValueError, KeyError, TypeError, AttributeError):
+        raise ValueError("Invalid cursor.")
+
 
 #Get endpoint to retrieve KPIs for a given date range
 '''
@@ -28,11 +90,30 @@ Keep in mind that, if this endpoint is called is beacause the client wants to fe
 '''
 @router.get("/kpis/", response_model = list[DailyKPIsResponse])
 def get_kpis(
+    response: Response,
     start_date: datetime = Query(..., description = "Start date in YYYY-MM-DD format"),
     end_date:   datetime = Query(..., description = "End date in YYYY-MM-DD format"), 
-    repo: DI_Postgres_OutputRepository = Depends(get_output_repo),
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_LIMIT, description="Page size (enables keyset pagination)"),
+    cursor: Optional[str] = Query(None, description=f"Opaque cursor from the {NEXT_CURSOR_HEADER} header of the previous page"),
+    repo: OutputRepository_Interface = Depends(get_output_repo),
     ):
     
+    # Paged mode: same JSON list, one page at a time. Pages are read with WHERE date > last date
+    # (keyset), so page 1000 costs the same as page 1. The next page's cursor is sent in the
+    # X-Next-Cursor header (absent on the last page), so the body stays the same as unpaged.
+    if limit is not None or cursor is not None:
+        try:
+            after = decode_cursor(cursor) if cursor is not None else None
+            page = GetKPIPage(output_repo=repo).execute(
+                start=start_date, end=end_date, limit=limit or DEFAULT_PAGE_LIMIT, after=after
+            )
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+        if page.next_after is not None:
+            response.headers[NEXT_CURSOR_HEADER] = encode_cursor(page.next_after)
+        return [DailyKPIsResponse.from_domain(domain_obj) for domain_obj in page.rows]
+    
     #1 ) Build repository (DI)
     # OBSOLETE: repo = DI_Postgres_OutputRepository(db_session = db)
     
@@ -49,4 +130,72 @@ def get_kpis(
     #4) Build Pydantic response. Map DOMAIN -> API schema (DTO) to return JSON
     response = [DailyKPIsResponse.from_domain(domain_obj) for domain_obj in domain_rows]
     
-    return response
\ No newline at end of file
+    return response
+
+
+# Columnar variant for long ranges: {"date": [...], "balance_kcal": [...], ...}
+# Read as a KPISeries (typed arrays), so years of history cost no per-row objects.
+@router.get("/kpis/columns", response_model=KPISeriesResponse)
+def get_kpis_columns(
+    start_date: datetime = Query(..., description="Start date in YYYY-MM-DD format"),
+    end_date: datetime = Query(..., description="End date in YYYY-MM-DD format"),
+    repo: OutputRepository_Interface = Depends(get_output_repo),
+):
+    use_case = GetKPISeries(output_repo=repo)
+
+    try:
+        series = use_case.execute(start=start_date, end=end_date)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    return KPISeriesResponse.from_series(series)
+
+
+# Long-term trends: one row per week (ISO, Monday start) or month instead of one per day, e.g.
+#   /api/kpis/rollup?granularity=month&start_date=2016-01-01&end_date=2025-12-31  -> 120 rows, not 3650
+# Served from the materialized kpi_rollups table (kept up to date by uploads), nothing is aggregated per request.
+@router.get("/kpis/rollup", response_model=list[KPIRollupResponse])
+def get_kpi_rollups(
+    granularity: str = Query(..., description="week | month"),
+    start_date: datetime = Query(..., description="Start date in YYYY-MM-DD format"),
+    end_date: datetime = Query(..., description="End date in YYYY-MM-DD format"),
+    repo: RollupRepository_Interface = Depends(get_rollup_repo),
+):
+    try:
+        rollups = GetKPIRollups(rollup_repo=repo).execute(granularity=granularity, start=start_date, end=end_date)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    return [KPIRollupResponse.from_domain(r) for r in rollups]
+
+
+async def _json_array(batches: AsyncIterator[list]) -> AsyncIterator[bytes]:
+    # Same JSON as /kpis/ (a list of DailyKPIsResponse), written one batch at a time
+    yield b"["
+    first = True
+    async for batch in batches:
+        if not batch:
+            continue
+        rows = ",".join(DailyKPIsResponse.from_domain(k).model_dump_json() for k in batch)
+        yield (rows if first else "," + rows).encode()
+        first = False
+    yield b"]"
+
+
+# Streaming variant for long ranges: same JSON body as /kpis/, but rows are read from a
+# server-side cursor and sent batch by batch, so memory stays flat whatever the range is.
+# Fully async: a long download holds no worker thread, only an awaited cursor.
+@router.get("/kpis/stream", response_model=list[DailyKPIsResponse])
+async def stream_kpis(
+    start_date: datetime = Query(..., description="Start date in YYYY-MM-DD format"),
+    end_date: datetime = Query(..., description="End date in YYYY-MM-DD format"),
+    repo: AsyncOutputRepository_Interface = Depends(get_async_output_repo),
+):
+    use_case = AsyncStreamKPIs(output_repo=repo)
+
+    try:
+        batches = use_case.execute(start=start_date, end=end_date)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    return StreamingResponse(_json_array(batches), media_type="application/json")
@@ -0,0 +1,40 @@
+from typing import Any, Optional
+
+from fastapi import APIRouter
+from sqlalchemy.engine import Engine
+
+from app.infrastructure.cache.kpi_cache import get_kpi_cache
+from app.infrastructure.db import engine as db_engine
+
+
+router = APIRouter()
+
+
+# Monitoring: counters of the in-process KPI cache (hits / misses / evictions are counted in days)
+@router.get("/metrics/cache")
+def get_cache_metrics() -> dict[str, int]:
+    return get_kpi_cache().stats()
+
+
+def _pool_stats(engine: Optional[Engine]) -> Optional[dict[str, Any]]:
+    if engine is None:
+        return None
+    metrics = getattr(engine.pool, "metrics", None)
+    if metrics is None:
+        return {"pool_class": type(engine.pool).__name__, "instrumented": False}
+    return metrics.snapshot(engine.pool)
+
+
+# Monitoring: DB connection pools (sync engine, async one once something used it, read replica ones if configured).
+# Checkout latency / waits / timeouts tell whether DB_POOL_SIZE / DB_MAX_OVERFLOW are too small.
+@router.get("/metrics/pool")
+def get_pool_metrics() -> dict[str, Any]:
+    async_engine = db_engine.async_engine_if_created()
+    async_read_engine = db_engine.async_read_engine_if_created()
+    return {
+        "sync": _pool_stats(db_engine.engine),
+        "async": _pool_stats(async_engine.sync_engine if async_engine is not None else None),
+        # Read replica pools (null without READ_DATABASE_URL)
+        "read": _pool_stats(db_engine.read_engine),
+        "async_read": _pool_stats(async_read_engine.sync_engine if async_read_engine is not None else None),
+    }
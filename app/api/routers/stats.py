@@ -0,0 +1,38 @@
+from datetime import datetime
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+
+from app.api.schemas import RangeStatsResponse
+from app.business.use_cases import GetRangeStats
+from app.domain.interfaces import CumulativeRepository_Interface
+from app.infrastructure.db.engine import get_read_db_session
+from app.infrastructure.db.repository_impl import DI_Postgres_CumulativeRepository
+
+
+router = APIRouter()
+
+
+# Dependency provider for the running-totals repo (read session: replica if configured)
+def get_cumulative_repo(db: Session = Depends(get_read_db_session)) -> CumulativeRepository_Interface:
+    return DI_Postgres_CumulativeRepository(db_session=db)
+
+
+# Total / mean / coverage of inputs and KPIs over any range, e.g.
+#   /api/stats/range?start_date=2020-01-01&end_date=2025-12-31&metrics=balance_kcal&metrics=weight_kg
+# Answered from two rows of daily_cumulative (prefix sums), so 5 years cost the same as 5 days.
+# Without `metrics` every input and KPI column is returned.
+@router.get("/stats/range", response_model=RangeStatsResponse)
+def get_range_stats(
+    start_date: datetime = Query(..., description="Start date in YYYY-MM-DD format"),
+    end_date: datetime = Query(..., description="End date in YYYY-MM-DD format"),
+    metrics: Optional[list[str]] = Query(None, description="Input / KPI columns (repeat the parameter); all if omitted"),
+    repo: CumulativeRepository_Interface = Depends(get_cumulative_repo),
+):
+    try:
+        stats = GetRangeStats(cumulative_repo=repo).execute(start=start_date, end=end_date, metrics=metrics)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    return RangeStatsResponse.from_domain(stats)
@@ -2,16 +2,18 @@ import json
 from pathlib import Path
 
 from fastapi import APIRouter, UploadFile, File
-from app.infrastructure.db.engine import get_db_session
+from app.infrastructure.db.engine import get_db_session, session_router
 from sqlalchemy.orm import Session
 from fastapi import Depends
 from app.infrastructure.db.models import DailyKPIORM, DailyInputORM
-from app.infrastructure.db.repository_impl import DI_Postgres_InputRepository, DI_Postgres_OutputRepository
-from app.infrastructure.parser.parser_impls import DI_CsvParserV1
+from app.infrastructure.db.repository_impl import DI_Postgres_InputRepository, DI_Postgres_OutputRepository, DI_Postgres_CheckpointRepository, DI_Postgres_CumulativeRepository, DI_Postgres_RollupRepository
+from app.infrastructure.parser.parser_impls import DI_CsvParserV2
+from app.api.routers.kpis import get_output_repo
+from app.infrastructure.archive.tiered_repository import build_input_repository
 
 from app.infrastructure.storage.storage_impl import DI_LocalFileStorage
 
-from app.business.use_cases import IngestDailyCSV
+from app.business.use_cases import AsyncIngestDailyCSV, IngestDailyCSV
 from app.api.schemas import IngestReportResponse
 
 
@@ -26,14 +28,21 @@ async def upload_daily_csv(file: UploadFile = File(...), db: Session = Depends(g
     filename = file.filename or "upload.csv"
     
     #create the 2 repositories (DI). In this case we create the repos inside the function instead of using a dependency provider just for playing and learning, but we could also create dependency providers for them like we did in the kpis.py router and then use Depends to get them as parameters in the function. That would be more consistent with the rest of the codebase and would allow us to reuse the repos in other endpoints if needed.
-    input_repo = DI_Postgres_InputRepository(db_session = db)
-    output_repo = DI_Postgres_OutputRepository(db_session = db)
+    # (closed years archived to Parquet are read from / written to their files, see KPI_ARCHIVE_DIR)
+    input_repo = build_input_repository(db)
+    # same layers as the read side (KPI cache + hot store), so this upload keeps them up to date
+    output_repo = get_output_repo(db)
+    checkpoint_repo = DI_Postgres_CheckpointRepository(db_session = db)
+    # running totals behind /api/stats/range, refreshed from the earliest uploaded day forward
+    cumulative_repo = DI_Postgres_CumulativeRepository(db_session = db)
+    # weekly / monthly rollups behind /api/kpis/rollup, refreshed for the periods whose KPIs changed
+    rollup_repo = DI_Postgres_RollupRepository(db_session = db)
     
     #create the implementation for the file storage intarface (DI) 
     file_storage = DI_LocalFileStorage(base_path="./storage")
     
     #create the parser implementation
-    parser = DI_CsvParserV1()
+    parser = DI_CsvParserV2()
     
     #Build the use case:
     profile_path = Path("app/config/user_profile.json")
@@ -44,10 +53,19 @@ async def upload_daily_csv(file: UploadFile = File(...), db: Session = Depends(g
                               output_repo = output_repo, 
                               file_storage = file_storage, 
                               parser = parser,
-                              steps_goal = steps_goal)
+                              steps_goal = steps_goal,
+                              checkpoint_repo = checkpoint_repo,
+                              cumulative_repo = cumulative_repo,
+                              rollup_repo = rollup_repo)
     
-    #Execute the use case
-    report = use_case.execute(file_bytes = file_bytes, filename = filename)
+    #Execute the use case. This endpoint is `async def`, so the sync pipeline (CSV parsing, KPI computation,
+    #sync DB session) must not run on the event loop: AsyncIngestDailyCSV runs it on a worker thread,
+    #and other requests keep being served during a big upload.
+    report = await AsyncIngestDailyCSV(ingest = use_case).execute(file_bytes = file_bytes, filename = filename)
+    
+    #The upload wrote to the primary: keep reads on the primary for the read-your-writes window,
+    #so the dashboard sees the new KPIs at once even if the read replica lags a bit
+    session_router.mark_write()
     
     #Build the response mapping DOMAIN -> API schema (DTO)
     report_response = IngestReportResponse.from_domain(report)
@@ -1,9 +1,10 @@
 from pydantic import BaseModel
-from datetime import datetime
+from datetime import date, datetime
 
 from app.domain.entities import DailyKPIsOutput
+from app.domain.series import KPISeries
 
-from app.domain.entities import IngestReport
+from app.domain.entities import IngestReport, KPIRollup, RangeStats
 
 
 class DailyKPIsResponse(BaseModel):
@@ -41,6 +42,31 @@ class DailyKPIsResponse(BaseModel):
         )
 
 
+class KPISeriesResponse(BaseModel):
+    """
+    Columnar KPI response: one list per field, all the same length, aligned with `date`.
+    Built column by column from a KPISeries, so no per-day object is created.
+    """
+
+    date: list[date]
+
+    kcal_out_total: list[float | None]
+    balance_kcal: list[float | None]
+    balance_7d_average: list[float | None]
+    protein_per_kg: list[float | None]
+    healthy_food_pct: list[float | None]
+    adherence_steps: list[int | None]
+    weight_7d_avg: list[float | None]
+    waist_change_7d: list[float | None]
+
+    @classmethod
+    def from_series(cls, series: KPISeries) -> "KPISeriesResponse":
+        return cls(
+            date=[date.fromordinal(o) for o in series.days],
+            **{name: series.column(name) for name in KPISeries.TYPECODES},
+        )
+
+
 class IngestReportResponse(BaseModel):
     file_id: str
     status: str
@@ -59,4 +85,62 @@ class IngestReportResponse(BaseModel):
             records_processed=domain_obj.records_processed,
             kpi_records_upserted=domain_obj.kpi_records_upserted,
         )
-    
\ No newline at end of file
+    
+
+
+class MetricRangeStatsResponse(BaseModel):
+    total: float
+    count: int
+    mean: float | None = None
+    coverage: float
+
+
+class RangeStatsResponse(BaseModel):
+    start: datetime
+    end: datetime
+    days: int
+    input_days: int
+    metrics: dict[str, MetricRangeStatsResponse]
+
+    @classmethod
+    def from_domain(cls, domain_obj: RangeStats) -> "RangeStatsResponse":
+        return cls(
+            start=domain_obj.start,
+            end=domain_obj.end,
+            days=domain_obj.days,
+            input_days=domain_obj.input_days,
+            metrics={
+                name: MetricRangeStatsResponse(total=m.total, count=m.count, mean=m.mean, coverage=m.coverage)
+                for name, m in domain_obj.metrics.items()
+            },
+        )
+
+
+class MetricRollupResponse(BaseModel):
+    mean: float | None = None
+    min: float | None = None
+    max: float | None = None
+    count: int
+
+
+class KPIRollupResponse(BaseModel):
+    granularity: str
+    period_start: date
+    period_end: date
+    days: int
+    adherence_ratio: float | None = None
+    metrics: dict[str, MetricRollupResponse]
+
+    @classmethod
+    def from_domain(cls, domain_obj: KPIRollup) -> "KPIRollupResponse":
+        return cls(
+            granularity=domain_obj.granularity,
+            period_start=domain_obj.period_start.date(),
+            period_end=domain_obj.period_end.date(),
+            days=domain_obj.days,
+            adherence_ratio=domain_obj.adherence_ratio,
+            metrics={
+                name: MetricRollupResponse(mean=m.mean, min=m.min, max=m.max, count=m.count)
+                for name, m in domain_obj.metrics.items()
+            },
+        )
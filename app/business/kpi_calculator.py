@@ -1,10 +1,91 @@
-
 from __future__ import annotations
 
+import math
 from datetime import datetime, date, time, timezone, timedelta
-from typing import Optional
+from typing import Any, Iterable, Iterator, Optional
 
+from app.business.kpi_registry import (
+    KPI_FIELDS,
+    KPI_REGISTRY,
+    plan_lookahead_days,
+    plan_lookback_days,
+    requested_kpi_names,
+    required_input_columns,
+    resolve_kpis,
+)
+from app.business.rolling import LagBuffer, RollingEngine
 from app.domain.entities import DailyMetricsInput, DailyKPIsOutput
+from app.domain.series import KPISeries, MetricsSeries
+
+
+# backend="auto" switches to the NumPy backend from this many input records
+NUMPY_BACKEND_MIN_RECORDS = 1_000
+
+KPI_BACKENDS = ("auto", "python", "numpy")
+
+# KPI rows per chunk yielded by iter_daily_kpis (matches the repository upsert batch size)
+DEFAULT_STREAM_CHUNK_SIZE = 1_000
+
+
+def kpi_max_lookback_days(windows: Iterable[int] = (), kpis: Optional[Iterable[str]] = None) -> int:
+    """
+    How many days back a KPI on day D can look (from the registry):
+    - rolling N-day windows read D-(N-1) .. D
+    - waist_change_7d reads exactly D-7
+
+    The same number is the look-ahead of an input: changing day X can change the
+    KPIs of X .. X+lookback, and nothing after that.
+    """
+    return plan_lookback_days(resolve_kpis(kpis, windows))
+
+
+def kpi_dirty_range(
+    changed_start: date,
+    changed_end: date,
+    windows: Iterable[int] = (),
+    kpis: Optional[Iterable[str]] = None,
+) -> tuple[date, date, date, date]:
+    """
+    Given the span of input days that changed, return (context_start, dirty_start, dirty_end, context_end):
+    - [dirty_start, dirty_end]: the only days whose KPIs can change
+    - [context_start, context_end]: the minimum input range needed to recompute them
+
+    A KPI with lookback B and look-ahead A on day D reads inputs D-B .. D+A, so an input
+    change on day X reaches the KPIs of X-A .. X+B.
+    """
+    plan = resolve_kpis(kpis, windows)
+    lookback = timedelta(days=plan_lookback_days(plan))
+    lookahead = timedelta(days=plan_lookahead_days(plan))
+
+    dirty_start = changed_start - lookahead
+    dirty_end = changed_end + lookback
+    return dirty_start - lookback, dirty_start, dirty_end, dirty_end + lookahead
+
+
+def kpis_equal(
+    a: DailyKPIsOutput,
+    b: DailyKPIsOutput,
+    rel_tol: float = 1e-9,
+    abs_tol: float = 1e-9,
+    fields: Iterable[str] = KPI_FIELDS,
+) -> bool:
+    """
+    Compare the persisted KPI fields of two rows (or only `fields`).
+    Floats are compared with a tolerance: running sums can differ in the last bits
+    depending on where the context started, which is not a real change.
+    """
+    if a.date.date() != b.date.date():
+        return False
+
+    for field_name in fields:
+        x, y = getattr(a, field_name), getattr(b, field_name)
+        if x is None or y is None:
+            if x is not y:
+                return False
+        elif not math.isclose(x, y, rel_tol=rel_tol, abs_tol=abs_tol):
+            return False
+
+    return True
 
 
 def compute_daily_kpis(
@@ -13,105 +94,310 @@ def compute_daily_kpis(
     start: date,
     end: date,
     target_steps: int = 10_000,
+    windows: Iterable[int] = (),
+    kpis: Optional[Iterable[str]] = None,
+    backend: str = "auto",
+) -> list[DailyKPIsOutput]:
+    """
+    Compute KPIs for every day in [start, end] that has a record.
+    Records before `start` are only used as context for the rolling windows.
+
+    `windows` asks for extra rolling averages (e.g. (14, 28, 90)); they are returned in
+    DailyKPIsOutput.rolling as "balance_{N}d_average" / "weight_{N}d_avg".
+
+    `kpis` narrows the work to some KPIs (e.g. ["balance_7d_average", "adherence_steps"]):
+    only those and their dependencies are evaluated, the other fields stay None.
+    Names of extra windows ("weight_28d_avg") are accepted too.
+
+    `backend` picks the implementation (both return the same KPIs):
+    - "python": per-day loop with running sums (best for small uploads)
+    - "numpy":  columnar arrays on a dense calendar (best for full-history recomputes)
+    - "auto":   numpy from NUMPY_BACKEND_MIN_RECORDS records on, if NumPy is installed
+    """
+    if backend not in KPI_BACKENDS:
+        raise ValueError(f"Unknown KPI backend: {backend!r} (expected one of {', '.join(KPI_BACKENDS)})")
+
+    if backend == "auto":
+        backend = "numpy" if len(records) >= NUMPY_BACKEND_MIN_RECORDS else "python"
+        if backend == "numpy":
+            try:
+                import numpy  # noqa: F401
+            except ImportError:
+                backend = "python"
+
+    if backend == "numpy":
+        # Imported lazily: NumPy is only needed when the columnar backend is used
+        from app.business.kpi_calculator_numpy import compute_daily_kpis_numpy
+
+        return compute_daily_kpis_numpy(
+            records, start=start, end=end, target_steps=target_steps, windows=windows, kpis=kpis
+        )
+
+    return _compute_daily_kpis_python(
+        records, start=start, end=end, target_steps=target_steps, windows=windows, kpis=kpis
+    )
+
+
+def compute_kpi_series(
+    series: MetricsSeries,
+    *,
+    start: date,
+    end: date,
+    target_steps: int = 10_000,
+    kpis: Optional[Iterable[str]] = None,
+    backend: str = "auto",
+) -> KPISeries:
+    """
+    Columnar version of compute_daily_kpis: MetricsSeries in, KPISeries out.
+    Same KPIs, same backends; with NumPy no per-row object is created at all.
+    Only persisted KPIs (KPI_FIELDS) can be requested, since that is what a KPISeries holds.
+    """
+    if backend not in KPI_BACKENDS:
+        raise ValueError(f"Unknown KPI backend: {backend!r} (expected one of {', '.join(KPI_BACKENDS)})")
+
+    if backend != "python":
+        try:
+            from app.business.kpi_calculator_numpy import compute_kpi_series_numpy
+        except ImportError:
+            if backend == "numpy":
+                raise
+        else:
+            return compute_kpi_series_numpy(series, start=start, end=end, target_steps=target_steps, kpis=kpis)
+
+    # Pure-Python fallback: rows are materialized one at a time from the series
+    kpis = tuple(kpis) if kpis is not None else None
+    records = sorted(series, key=lambda r: r.date.date())
+    result = KPISeries(kpis)
+    for chunk in iter_daily_kpis(records, start=start, end=end, target_steps=target_steps, kpis=kpis):
+        for kpi in chunk:
+            result.append(kpi)
+    return result
+
+
+def _compute_daily_kpis_python(
+    records: list[DailyMetricsInput],
+    *,
+    start: date,
+    end: date,
+    target_steps: int,
+    windows: Iterable[int],
+    kpis: Optional[Iterable[str]] = None,
 ) -> list[DailyKPIsOutput]:
+    """
+    Pure-Python backend: one pass over the sorted days.
+    All windows are served from running sums, so the loop stays O(days) whatever N is.
+    """
     
     if not records:
         return []
 
-    # 1) Create a dictionaty with day, inputs. We will add the inputs by day, and sort later. If a day is duplicated, because of the dictionaries nature (no repeated keys), the last one will remain.
-    dict_inputs: dict[date, DailyMetricsInput] = {}
-    
+    # Sort by day. sorted() is stable, so if a day is duplicated its records keep their
+    # upload order and the streaming loop keeps the last one.
+    records_sorted = sorted(records, key=lambda r: r.date.date())
+
+    results: list[DailyKPIsOutput] = []
+    for chunk in iter_daily_kpis(
+        records_sorted, start=start, end=end, target_steps=target_steps, windows=windows, kpis=kpis
+    ):
+        results.extend(chunk)
+
+    return results
+
+
+def iter_daily_kpis(
+    records: Iterable[DailyMetricsInput],
+    *,
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    target_steps: int = 10_000,
+    windows: Iterable[int] = (),
+    kpis: Optional[Iterable[str]] = None,
+    chunk_size: int = DEFAULT_STREAM_CHUNK_SIZE,
+) -> Iterator[list[DailyKPIsOutput]]:
+    """
+    Streaming variant of compute_daily_kpis for unbounded histories.
+
+    - `records` can be any iterator (e.g. a server-side cursor), sorted by date.
+      Consecutive records of the same day: the last one wins (same rule as compute_daily_kpis).
+    - Yields lists of at most `chunk_size` KPI rows, so each chunk can be saved
+      while the next one is computed.
+    - Memory stays flat: only the rolling windows / lag buffers are kept, never the history.
+    - start / end (optional) limit the emitted days; earlier days are only context,
+      and the iterator stops reading once it is past `end`.
+
+    Raises ValueError if the records go back in time.
+    """
+    if chunk_size < 1:
+        raise ValueError("chunk_size must be at least 1.")
+
+    calculator = IncrementalKPICalculator(target_steps=target_steps, windows=windows, kpis=kpis)
+    chunk: list[DailyKPIsOutput] = []
+
+    def push(r: DailyMetricsInput) -> None:
+        d = r.date.date()
+        in_range = (start is None or d >= start) and (end is None or d <= end)
+        kpi = calculator.push(r, emit=in_range)
+        if kpi is not None:
+            chunk.append(kpi)
+
+    # A day is only pushed once the next day shows up, because a duplicate may still follow
+    pending: Optional[DailyMetricsInput] = None
+
     for r in records:
-        #we are creating a key, value pair where the key is the date object representing the day of the record r, and the value is the DailyMetricsInput object for that day.
-        dict_inputs[r.date.date()] = r 
-    
-    # 2) Sort days with sorted()
-    days_sorted: list[date] = sorted(dict_inputs.keys())
+        if pending is not None:
+            pending_day, day = pending.date.date(), r.date.date()
+            if day < pending_day:
+                raise ValueError(f"Records must be sorted by date: got {day} after {pending_day}.")
+            if day > pending_day:
+                push(pending)
+                if len(chunk) >= chunk_size:
+                    yield chunk
+                    chunk = []
+        if end is not None and r.date.date() > end:
+            pending = None
+            break
+        pending = r
 
-    # Rolling helpers (store computed daily values so rolling windows can look back)
-    balance_by_day: dict[date, Optional[float]] = {}
-    weight_by_day: dict[date, Optional[float]] = {}
-    waist_by_day: dict[date, Optional[float]] = {}
+    if pending is not None:
+        push(pending)
+    if chunk:
+        yield chunk
 
-    results: list[DailyKPIsOutput] = []
 
-    for d in days_sorted: #we are iterating over the sorted list of dates, and for each date d, we are getting the corresponding DailyMetricsInput object r from the dict_inputs dictionary.
-        #r is a DailyMetricsInput object for that day, but we are iterating over unique days + sorted.
-        r = dict_inputs[d]
+def _as_float(value: Any) -> Optional[float]:
+    return float(value) if value is not None else None
+
+
+class IncrementalKPICalculator:
+    """
+    Computes KPIs one day at a time, in ascending date order, from a compact rolling state:
+    - running sums/counts of every rolling-window source (balance, weight, ...)
+    - the last N values of every lagged source (waist, for waist_change_7d)
+
+    What gets computed comes from the KPI registry: the requested KPIs are resolved into a
+    dependency-ordered plan, and only the plan's KPIs and input columns are touched.
+
+    The state can be saved with to_state() and restored with from_state(), so a new day
+    that directly follows the last computed one needs no input history at all.
+    """
+
+    STATE_VERSION = 2
+
+    def __init__(
+        self,
+        *,
+        target_steps: int = 10_000,
+        windows: Iterable[int] = (),
+        kpis: Optional[Iterable[str]] = None,
+    ):
+        self.target_steps = target_steps
+        self.last_day: Optional[date] = None
+
+        kpis = tuple(kpis) if kpis is not None else None
+        plan = resolve_kpis(kpis, windows)
+
+        self._params = {"target_steps": target_steps}
+        self._input_columns = required_input_columns(plan)
+        self._emit = requested_kpi_names(kpis, windows)
+        self._fixed_fields = tuple(name for name in self._emit if name in KPI_REGISTRY)
+        self._extra_fields = tuple(name for name in self._emit if name not in KPI_REGISTRY)
+
+        # Split the plan by kind once, so push() is a tight loop
+        self._daily = [(d.name, d.compute) for d in plan if d.kind == "daily"]
+        self._rolling = [(d.name, d.source, d.days) for d in plan if d.kind == "rolling_mean"]
+        self._lagged = [(d.name, d.source, d.days, f"{d.source}:{d.days}") for d in plan if d.kind == "lag_diff"]
+
+        self._rolling_sources = tuple(dict.fromkeys(source for _, source, _ in self._rolling))
+        self._engine = RollingEngine(
+            metrics=self._rolling_sources,
+            windows=(days for _, _, days in self._rolling),
+        )
+        self._lags: dict[str, LagBuffer] = {key: LagBuffer(days) for _, _, days, key in self._lagged}
+
+    def push(self, r: DailyMetricsInput, *, emit: bool = True) -> Optional[DailyKPIsOutput]:
+        """
+        Add the record for the next day and return its KPIs.
+        With emit=False the state is updated but no output object is built (context days).
+        """
+        d = r.date.date()
+        if self.last_day is not None and d <= self.last_day:
+            raise ValueError(f"Days must be pushed in ascending order: got {d} after {self.last_day}.")
+        self.last_day = d
 
         # ---- Per-day KPIs ----
-        
-        kcal_out_total: Optional[float] = None
-        if r.kcal_out_training is not None:
-            kcal_out_total = float(r.kcal_out_training)
-
-        balance_kcal: Optional[float] = None
-        if r.kcal_in is not None and kcal_out_total is not None:
-            balance_kcal = float(r.kcal_in) - kcal_out_total
-
-        protein_per_kg: Optional[float] = None
-        if r.proteins_g is not None and r.weight_kg is not None and r.weight_kg > 0:
-            protein_per_kg = float(r.proteins_g) / float(r.weight_kg)
-
-        healthy_food_pct: Optional[float] = None
-        if r.kcal_in is not None and r.kcal_in > 0 and r.kcal_junk_in is not None:
-            healthy_food_pct = 100.0 * (1.0 - (float(r.kcal_junk_in) / float(r.kcal_in)))
-
-        adherence_steps: Optional[int] = None
-        if r.steps_n is not None:
-            adherence_steps = 1 if r.steps_n >= target_steps else 0
-
-        # Store daily values for rolling computations (even if outside target range)
-        # this are dictionaries where the key is the date and the value is the computed metric for that day. 
-        # we will use these dictionaries later to compute rolling averages and changes over a 7-day window.
-        balance_by_day[d] = balance_kcal
-        weight_by_day[d] = float(r.weight_kg) if r.weight_kg is not None else None
-        waist_by_day[d] = float(r.waist_cm) if r.waist_cm is not None else None
-
-        # Only output KPIs for target range
-        # if the current day d is outside the specified start and end dates, we skip the rest of the loop and move to the next day.
-        # but we have already stored the daily values for rolling computations above.
-        if d < start or d > end:
-            continue
-        
-        # now here we are inside the target range, and we will compute the rolling 7-day KPIs.
-        
-        # Rolling 7d KPIs (current day + previous 6 days)
-        #this creates a list of dates representing the current day d and the previous 6 days.
-        window_days = [d - timedelta(days=i) for i in range(0, 7)]
-        #example: if d is 2024-06-10, window_days will be [2024-06-10, 2024-06-09, 2024-06-08, 2024-06-07, 2024-06-06, 2024-06-05, 2024-06-04]
-        
-        balances = [balance_by_day.get(x) for x in window_days]
-        # example: [None, -200.0, 150.0, None, 0.0, 100.0, -50.0]
-        balances = [v for v in balances if v is not None]
-        # example: [-200.0, 150.0, 0.0, 100.0, -50.0]
-        balance_7d_average = (sum(balances) / len(balances)) if balances else None
-        # example: (-200 + 150 + 0 + 100 - 50) / 5 = 0.0
-        
-        #the same
-        weights = [weight_by_day.get(x) for x in window_days]
-        weights = [v for v in weights if v is not None]
-        weight_7d_avg = (sum(weights) / len(weights)) if weights else None
-
-        waist_change_7d: Optional[float] = None
-        waist_today = waist_by_day.get(d)
-        waist_7ago = waist_by_day.get(d - timedelta(days=7))
-        
-        if waist_today is not None and waist_7ago is not None:
-            waist_change_7d = waist_today - waist_7ago
-
-        results.append(
-            DailyKPIsOutput(
-                date=datetime.combine(d, time.min, tzinfo=timezone.utc),
-                kcal_out_total=kcal_out_total,
-                balance_kcal=balance_kcal,
-                balance_7d_average=balance_7d_average,
-                protein_per_kg=protein_per_kg,
-                healthy_food_pct=healthy_food_pct,
-                adherence_steps=adherence_steps,
-                weight_7d_avg=weight_7d_avg,
-                waist_change_7d=waist_change_7d,
-            )
+        # v holds today's input columns, then every KPI as soon as it is computed
+        # (dependencies come first in the plan, e.g. kcal_out_total before balance_kcal)
+        v: dict[str, Any] = {c: getattr(r, c) for c in self._input_columns}
+        for name, compute in self._daily:
+            v[name] = compute(v, self._params)
+
+        # Feed daily values to the rolling windows (even if the day is not emitted)
+        # the engine adds today's value and drops the ones that fell out of each window.
+        # lagged sources go to small lag buffers (waist_change_7d needs the exact value from 7 days ago).
+        self._engine.push(d, {source: _as_float(v[source]) for source in self._rolling_sources})
+        for _, source, _, key in self._lagged:
+            self._lags[key].push(d, _as_float(v[source]))
+
+        if not emit:
+            return None
+
+        # Rolling KPIs, averaged over the days of the window that have a value
+        # example: balances in window [None, -200.0, 150.0, None, 0.0, 100.0, -50.0] -> 0.0
+        for name, source, days in self._rolling:
+            v[name] = self._engine.mean(source, days)
+
+        for name, source, days, key in self._lagged:
+            today = _as_float(v[source])
+            before = self._lags[key].get(d - timedelta(days=days))
+            v[name] = today - before if today is not None and before is not None else None
+
+        return DailyKPIsOutput(
+            date=datetime.combine(d, time.min, tzinfo=timezone.utc),
+            **{name: v[name] for name in self._fixed_fields},
+            rolling={name: v[name] for name in self._extra_fields},
         )
 
-    return results
\ No newline at end of file
+    def to_state(self) -> dict[str, Any]:
+        """JSON-serializable snapshot of everything the next day needs."""
+        if self.last_day is None:
+            raise ValueError("Nothing to snapshot: no day has been pushed yet.")
+        return {
+            "version": self.STATE_VERSION,
+            "last_day": self.last_day.isoformat(),
+            "windows": self._engine.to_state(),
+            "lags": {key: buffer.to_state() for key, buffer in self._lags.items()},
+        }
+
+    @classmethod
+    def from_state(
+        cls,
+        state: dict[str, Any],
+        *,
+        target_steps: int = 10_000,
+        windows: Iterable[int] = (),
+        kpis: Optional[Iterable[str]] = None,
+    ) -> "IncrementalKPICalculator":
+        """
+        Rebuild a calculator from to_state() output.
+        Raises ValueError if the state was written by an incompatible version or
+        does not hold the windows / lags the requested KPIs need.
+        """
+        if state.get("version") != cls.STATE_VERSION:
+            raise ValueError(f"Unsupported rolling state version: {state.get('version')!r}")
+
+        calculator = cls(target_steps=target_steps, windows=windows, kpis=kpis)
+
+        engine = RollingEngine.from_state(state["windows"])
+        for _, source, days in calculator._rolling:
+            if not engine.has_window(source, days):
+                raise ValueError(f"Rolling state has no {days}-day window for {source!r}")
+
+        lags = state["lags"]
+        for key in calculator._lags:
+            if key not in lags:
+                raise ValueError(f"Rolling state has no lag buffer {key!r}")
+            calculator._lags[key] = LagBuffer.from_state(calculator._lags[key].lag, lags[key])
+
+        calculator._engine = engine
+        calculator.last_day = date.fromisoformat(state["last_day"])
+        return calculator
@@ -0,0 +1,312 @@
+"""
+Declarative KPI registry.
+
+Each KPI declares what it needs instead of being hard-coded inside the calculator loop:
+- inputs:      DailyMetricsInput columns it reads on the same day
+- depends_on:  other KPIs it is derived from (same day, or the source of a rolling window)
+- params:      profile parameters it uses (e.g. "target_steps")
+- lookback / look-ahead: how many days before / after D are needed to compute D
+- compute:     scalar function for one day (Python backend)
+- vectorized:  whole-column function (NumPy backend)
+
+Rolling KPIs don't need functions: kind="rolling_mean" / "lag_diff" + source + days
+is enough for both backends.
+
+The calculator resolves the requested KPIs into a dependency-ordered plan and only
+evaluates (and only reads the input columns of) what is in the plan.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any, Callable, Iterable, Optional
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional: only the columnar backend needs it
+    np = None
+
+
+# Window used by the fixed KPI fields (balance_7d_average, weight_7d_avg)
+DEFAULT_WINDOW_DAYS = 7
+
+# waist_change_7d compares today against exactly this many days ago
+WAIST_CHANGE_LAG_DAYS = 7
+
+KPI_KINDS = ("daily", "rolling_mean", "lag_diff")
+
+
+@dataclass(frozen=True)
+class KPIDefinition:
+    name: str
+    kind: str = "daily"
+    inputs: tuple[str, ...] = ()
+    depends_on: tuple[str, ...] = ()
+    params: tuple[str, ...] = ()
+
+    # daily KPIs
+    compute: Optional[Callable[[dict[str, Any], dict[str, Any]], Optional[float]]] = None
+    vectorized: Optional[Callable[[dict[str, Any], dict[str, Any]], Any]] = None
+
+    # rolling KPIs: source is an input column or another KPI
+    source: Optional[str] = None
+    days: int = 0
+
+    lookahead_days: int = 0
+
+    @property
+    def lookback_days(self) -> int:
+        """Days before D read directly by this KPI (dependencies not included)."""
+        if self.kind == "rolling_mean":
+            return self.days - 1
+        if self.kind == "lag_diff":
+            return self.days
+        return 0
+
+
+# ---------------------------------------------------------------------------------------
+# Daily KPI functions. `v` holds the day's input columns + already computed KPIs,
+# `p` the profile parameters. Scalar versions get None for missing values,
+# vectorized versions get float64 arrays with NaN for missing values.
+# ---------------------------------------------------------------------------------------
+
+def _kcal_out_total(v, p):
+    return float(v["kcal_out_training"]) if v["kcal_out_training"] is not None else None
+
+
+def _kcal_out_total_vec(c, p):
+    return c["kcal_out_training"]
+
+
+def _balance_kcal(v, p):
+    if v["kcal_in"] is None or v["kcal_out_total"] is None:
+        return None
+    return float(v["kcal_in"]) - v["kcal_out_total"]
+
+
+def _balance_kcal_vec(c, p):
+    return c["kcal_in"] - c["kcal_out_total"]
+
+
+def _protein_per_kg(v, p):
+    if v["proteins_g"] is None or v["weight_kg"] is None or not v["weight_kg"] > 0:
+        return None
+    return float(v["proteins_g"]) / float(v["weight_kg"])
+
+
+def _protein_per_kg_vec(c, p):
+    return np.where(c["weight_kg"] > 0, c["proteins_g"] / c["weight_kg"], np.nan)
+
+
+def _healthy_food_pct(v, p):
+    if v["kcal_in"] is None or not v["kcal_in"] > 0 or v["kcal_junk_in"] is None:
+        return None
+    return 100.0 * (1.0 - (float(v["kcal_junk_in"]) / float(v["kcal_in"])))
+
+
+def _healthy_food_pct_vec(c, p):
+    return np.where(
+        (c["kcal_in"] > 0) & ~np.isnan(c["kcal_junk_in"]),
+        100.0 * (1.0 - (c["kcal_junk_in"] / c["kcal_in"])),
+        np.nan,
+    )
+
+
+def _adherence_steps(v, p):
+    if v["steps_n"] is None:
+        return None
+    return 1 if v["steps_n"] >= p["target_steps"] else 0
+
+
+def _adherence_steps_vec(c, p):
+    steps = c["steps_n"]
+    return np.where(np.isnan(steps), np.nan, (steps >= p["target_steps"]).astype(np.float64))
+
+
+def rolling_mean_kpi(name: str, source: str, days: int, *, from_input: bool) -> KPIDefinition:
+    return KPIDefinition(
+        name=name,
+        kind="rolling_mean",
+        source=source,
+        days=days,
+        inputs=(source,) if from_input else (),
+        depends_on=() if from_input else (source,),
+    )
+
+
+def rolling_kpi_names(days: int) -> tuple[str, str]:
+    """Names of the balance / weight rolling averages for an N-day window."""
+    return f"balance_{days}d_average", f"weight_{days}d_avg"
+
+
+def rolling_kpi_definitions(days: int) -> tuple[KPIDefinition, KPIDefinition]:
+    """On-demand balance / weight averages for any window length (e.g. 14, 28, 90)."""
+    balance_name, weight_name = rolling_kpi_names(days)
+    return (
+        rolling_mean_kpi(balance_name, "balance_kcal", days, from_input=False),
+        rolling_mean_kpi(weight_name, "weight_kg", days, from_input=True),
+    )
+
+
+# Registration order = column order of DailyKPIsOutput / daily_kpis
+KPI_REGISTRY: dict[str, KPIDefinition] = {
+    d.name: d
+    for d in (
+        KPIDefinition(
+            name="kcal_out_total",
+            inputs=("kcal_out_training",),
+            compute=_kcal_out_total,
+            vectorized=_kcal_out_total_vec,
+        ),
+        KPIDefinition(
+            name="balance_kcal",
+            inputs=("kcal_in",),
+            depends_on=("kcal_out_total",),
+            compute=_balance_kcal,
+            vectorized=_balance_kcal_vec,
+        ),
+        rolling_kpi_definitions(DEFAULT_WINDOW_DAYS)[0],  # balance_7d_average
+        KPIDefinition(
+            name="protein_per_kg",
+            inputs=("proteins_g", "weight_kg"),
+            compute=_protein_per_kg,
+            vectorized=_protein_per_kg_vec,
+        ),
+        KPIDefinition(
+            name="healthy_food_pct",
+            inputs=("kcal_in", "kcal_junk_in"),
+            compute=_healthy_food_pct,
+            vectorized=_healthy_food_pct_vec,
+        ),
+        KPIDefinition(
+            name="adherence_steps",
+            inputs=("steps_n",),
+            params=("target_steps",),
+            compute=_adherence_steps,
+            vectorized=_adherence_steps_vec,
+        ),
+        rolling_kpi_definitions(DEFAULT_WINDOW_DAYS)[1],  # weight_7d_avg
+        KPIDefinition(
+            name="waist_change_7d",
+            kind="lag_diff",
+            source="waist_cm",
+            days=WAIST_CHANGE_LAG_DAYS,
+            inputs=("waist_cm",),
+        ),
+    )
+}
+
+# Persisted KPI fields of DailyKPIsOutput / daily_kpis
+KPI_FIELDS: tuple[str, ...] = tuple(KPI_REGISTRY)
+
+
+def _definitions(windows: Iterable[int]) -> dict[str, KPIDefinition]:
+    definitions = dict(KPI_REGISTRY)
+    for n in sorted(set(windows)):
+        for d in rolling_kpi_definitions(n):
+            definitions.setdefault(d.name, d)
+    return definitions
+
+
+def requested_kpi_names(kpis: Optional[Iterable[str]] = None, windows: Iterable[int] = ()) -> tuple[str, ...]:
+    """The KPIs a caller asked for: all fixed KPIs + the extra windows, unless `kpis` narrows it."""
+    if kpis is not None:
+        return tuple(dict.fromkeys(kpis))
+    extra = tuple(name for n in sorted(set(windows)) for name in rolling_kpi_names(n))
+    return KPI_FIELDS + tuple(name for name in extra if name not in KPI_REGISTRY)
+
+
+def resolve_kpis(kpis: Optional[Iterable[str]] = None, windows: Iterable[int] = ()) -> list[KPIDefinition]:
+    """
+    Dependency-ordered evaluation plan for the requested KPIs (all of them if `kpis` is None).
+    Dependencies are pulled in even if not requested; everything else is left out.
+    Raises ValueError for unknown KPIs or dependency cycles.
+    """
+    definitions = _definitions(windows)
+    for name in kpis or ():
+        if name not in definitions:
+            # "balance_14d_average" style names are valid without listing the window explicitly
+            for n in _window_from_name(name):
+                for d in rolling_kpi_definitions(n):
+                    definitions.setdefault(d.name, d)
+
+    plan: list[KPIDefinition] = []
+    state: dict[str, str] = {}  # name -> "visiting" | "done"
+
+    def visit(name: str) -> None:
+        if name not in definitions:
+            raise ValueError(f"Unknown KPI: {name!r}")
+        if state.get(name) == "done":
+            return
+        if state.get(name) == "visiting":
+            raise ValueError(f"KPI dependency cycle at {name!r}")
+
+        state[name] = "visiting"
+        for dep in definitions[name].depends_on:
+            visit(dep)
+        state[name] = "done"
+        plan.append(definitions[name])
+
+    for name in requested_kpi_names(kpis, windows):
+        visit(name)
+
+    return plan
+
+
+def _window_from_name(name: str) -> tuple[int, ...]:
+    for prefix, suffix in (("balance_", "d_average"), ("weight_", "d_avg")):
+        if name.startswith(prefix) and name.endswith(suffix):
+            middle = name[len(prefix):-len(suffix)]
+            if middle.isdigit() and int(middle) > 0:
+                return (int(middle),)
+    return ()
+
+
+def required_input_columns(plan: Iterable[KPIDefinition]) -> tuple[str, ...]:
+    """Input columns read by a plan, in a stable order (projection for repository reads)."""
+    columns: dict[str, None] = {}
+    for d in plan:
+        for c in d.inputs:
+            columns.setdefault(c, None)
+    return tuple(columns)
+
+
+def plan_lookback_days(plan: Iterable[KPIDefinition]) -> int:
+    """
+    Longest chain of lookbacks in a plan: a KPI's own lookback plus the lookback of
+    whatever it is derived from (e.g. a rolling mean of a rolling mean).
+    """
+    plan = list(plan)
+    by_name = {d.name: d for d in plan}
+    total: dict[str, int] = {}
+
+    for d in plan:  # plan is dependency-ordered, so dependencies are already in `total`
+        total[d.name] = d.lookback_days + max((total[dep] for dep in d.depends_on if dep in by_name), default=0)
+
+    return max(total.values(), default=0)
+
+
+def plan_lookahead_days(plan: Iterable[KPIDefinition]) -> int:
+    plan = list(plan)
+    by_name = {d.name: d for d in plan}
+    total: dict[str, int] = {}
+
+    for d in plan:
+        total[d.name] = d.lookahead_days + max((total[dep] for dep in d.depends_on if dep in by_name), default=0)
+
+    return max(total.values(), default=0)
+
+
+def kpis_depending_on_params(params: Iterable[str]) -> tuple[str, ...]:
+    """
+    Persisted KPIs whose values change when one of these profile parameters changes,
+    directly or through a dependency (e.g. "target_steps" -> adherence_steps).
+    """
+    changed = set(params)
+    affected: set[str] = set()
+
+    for d in resolve_kpis():  # dependency order: a KPI's deps are classified before it
+        if changed.intersection(d.params) or affected.intersection(d.depends_on):
+            affected.add(d.name)
+
+    return tuple(name for name in KPI_FIELDS if name in affected)
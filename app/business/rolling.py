@@ -0,0 +1,158 @@
+"""
+Sliding-window helpers for the KPI calculator.
+
+Why this file exists:
+- A rolling average that rebuilds its window list every day costs O(days * window).
+- Here each window keeps a running sum + count and only touches the values that
+  enter or leave it, so the cost is O(days) whatever the window length is.
+- Missing days (no record, or a None value) are simply not counted, exactly like
+  the "average of available values" rule used by the 7-day KPIs.
+"""
+
+from __future__ import annotations
+
+from collections import deque
+from datetime import date, timedelta
+from typing import Any, Iterable, Optional
+
+
+class RollingWindow:
+    """
+    Running sum / count of the non-missing values seen in the last `days` calendar days
+    (current day included). Days must be pushed in ascending order.
+    """
+
+    __slots__ = ("days", "_entries", "_sum", "_count")
+
+    def __init__(self, days: int):
+        if days < 1:
+            raise ValueError("Rolling window must span at least 1 day.")
+        self.days = days
+        self._entries: deque[tuple[date, float]] = deque()  # values currently inside the window
+        self._sum = 0.0
+        self._count = 0
+
+    def push(self, day: date, value: Optional[float]) -> None:
+        """Move the window so it ends on `day`, then add today's value (if any)."""
+        oldest_allowed = day - timedelta(days=self.days - 1)
+
+        # values leaving the window
+        while self._entries and self._entries[0][0] < oldest_allowed:
+            _, old_value = self._entries.popleft()
+            self._sum -= old_value
+            self._count -= 1
+
+        if value is not None:
+            self._entries.append((day, value))
+            self._sum += value
+            self._count += 1
+
+        # Once the window is empty, reset the sum so float drift can't leak into later windows
+        if self._count == 0:
+            self._sum = 0.0
+
+    def mean(self) -> Optional[float]:
+        return self._sum / self._count if self._count else None
+
+    @property
+    def count(self) -> int:
+        return self._count
+
+    def to_state(self) -> dict[str, Any]:
+        """JSON-friendly snapshot: running sum/count plus the values that will leave the window."""
+        return {
+            "sum": self._sum,
+            "count": self._count,
+            "entries": [[d.isoformat(), v] for d, v in self._entries],
+        }
+
+    @classmethod
+    def from_state(cls, days: int, state: dict[str, Any]) -> "RollingWindow":
+        window = cls(days)
+        window._entries = deque((date.fromisoformat(d), float(v)) for d, v in state["entries"])
+        window._sum = float(state["sum"])
+        window._count = int(state["count"])
+        if window._count != len(window._entries):
+            raise ValueError("Corrupted rolling window state: count does not match entries.")
+        return window
+
+
+class RollingEngine:
+    """
+    One RollingWindow per (metric, window length).
+
+    Example:
+        engine = RollingEngine(metrics=("balance", "weight"), windows=(7, 28))
+        engine.push(day, {"balance": -200.0, "weight": 80.1})
+        engine.mean("weight", 28)
+    """
+
+    def __init__(self, metrics: Iterable[str], windows: Iterable[int]):
+        self.windows: tuple[int, ...] = tuple(sorted(set(windows)))
+        self._windows: dict[str, dict[int, RollingWindow]] = {
+            metric: {n: RollingWindow(n) for n in self.windows} for metric in metrics
+        }
+
+    def push(self, day: date, values: dict[str, Optional[float]]) -> None:
+        for metric, by_length in self._windows.items():
+            value = values.get(metric)
+            for window in by_length.values():
+                window.push(day, value)
+
+    def mean(self, metric: str, days: int) -> Optional[float]:
+        return self._windows[metric][days].mean()
+
+    def has_window(self, metric: str, days: int) -> bool:
+        return days in self._windows.get(metric, {})
+
+    def to_state(self) -> dict[str, dict[str, Any]]:
+        # JSON object keys must be strings, so window lengths are stored as "7", "28", ...
+        return {
+            metric: {str(n): window.to_state() for n, window in by_length.items()}
+            for metric, by_length in self._windows.items()
+        }
+
+    @classmethod
+    def from_state(cls, state: dict[str, dict[str, Any]]) -> "RollingEngine":
+        engine = cls(metrics=(), windows=())
+        engine._windows = {
+            metric: {int(n): RollingWindow.from_state(int(n), w) for n, w in by_length.items()}
+            for metric, by_length in state.items()
+        }
+        engine.windows = tuple(sorted({n for by_length in engine._windows.values() for n in by_length}))
+        return engine
+
+
+class LagBuffer:
+    """
+    Remembers the values of the last `lag` days so "value exactly `lag` days ago"
+    is available without keeping the whole history (at most lag + 1 entries).
+    """
+
+    __slots__ = ("lag", "_entries")
+
+    def __init__(self, lag: int):
+        self.lag = lag
+        self._entries: deque[tuple[date, float]] = deque()
+
+    def push(self, day: date, value: Optional[float]) -> None:
+        oldest_needed = day - timedelta(days=self.lag)
+        while self._entries and self._entries[0][0] < oldest_needed:
+            self._entries.popleft()
+        if value is not None:
+            self._entries.append((day, value))
+
+    def get(self, day: date) -> Optional[float]:
+        for d, v in self._entries:
+            if d == day:
+                return v
+        return None
+
+    def to_state(self) -> list[list[Any]]:
+        return [[d.isoformat(), v] for d, v in self._entries]
+
+    @classmethod
+    def from_state(cls, lag: int, state: list[list[Any]]) -> "LagBuffer":
+        buffer = cls(lag)
+        buffer._entries = deque((date.fromisoformat(d), float(v)) for d, v in state)
+        return buffer
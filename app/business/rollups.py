@@ -0,0 +1,114 @@
+"""
+Weekly / monthly rollups of the daily KPIs (mean, min, max, count + adherence ratio).
+
+Why this file exists:
+- Multi-year trend charts only need one point per week or month, but used to download
+  every daily KPI row (3650 rows for 10 years) and aggregate them in the dashboard.
+- The rollups are materialized in kpi_rollups (~520 weeks + ~120 months for 10 years) and
+  served as they are by /api/kpis/rollup.
+- A period only depends on its own days, so after an upload only the periods containing a
+  rewritten KPI day are recomputed (see RefreshKPIRollups).
+
+Missing values are not counted (same "available values" rule as the rolling KPIs):
+mean = sum / count of the days that have a value.
+"""
+
+from __future__ import annotations
+
+from calendar import monthrange
+from datetime import date, datetime, time, timedelta, timezone
+from typing import Iterable, Optional
+
+from app.business.kpi_registry import KPI_FIELDS
+from app.domain.entities import DailyKPIsOutput, KPIRollup, MetricRollup
+
+
+ROLLUP_GRANULARITIES = ("week", "month")
+
+# Columns aggregated per period: every persisted KPI
+ROLLUP_COLUMNS = KPI_FIELDS
+
+
+def period_bounds(day: date, granularity: str) -> tuple[date, date]:
+    """First and last day of the ISO week (Monday..Sunday) or calendar month containing `day`."""
+    if granularity == "week":
+        start = day - timedelta(days=day.weekday())
+        return start, start + timedelta(days=6)
+    if granularity == "month":
+        return day.replace(day=1), day.replace(day=monthrange(day.year, day.month)[1])
+    raise ValueError(f"Unknown granularity: {granularity!r} (expected one of {ROLLUP_GRANULARITIES})")
+
+
+def _midnight_utc(day: date) -> datetime:
+    return datetime.combine(day, time.min, tzinfo=timezone.utc)
+
+
+class _PeriodAccumulator:
+    __slots__ = ("days", "adherent_days", "sums", "mins", "maxs", "counts")
+
+    def __init__(self):
+        self.days = 0
+        self.adherent_days = 0
+        self.sums = dict.fromkeys(ROLLUP_COLUMNS, 0.0)
+        self.mins: dict[str, Optional[float]] = dict.fromkeys(ROLLUP_COLUMNS)
+        self.maxs: dict[str, Optional[float]] = dict.fromkeys(ROLLUP_COLUMNS)
+        self.counts = dict.fromkeys(ROLLUP_COLUMNS, 0)
+
+    def add(self, kpi: DailyKPIsOutput) -> None:
+        self.days += 1
+        for column in ROLLUP_COLUMNS:
+            value = getattr(kpi, column)
+            if value is None:
+                continue
+            self.sums[column] += value
+            self.counts[column] += 1
+            self.mins[column] = value if self.mins[column] is None else min(self.mins[column], value)
+            self.maxs[column] = value if self.maxs[column] is None else max(self.maxs[column], value)
+        if kpi.adherence_steps == 1:
+            self.adherent_days += 1
+
+
+def compute_rollups(
+    kpis: Iterable[DailyKPIsOutput],
+    granularity: str,
+    *,
+    periods: Optional[set[date]] = None,
+) -> list[KPIRollup]:
+    """
+    One KPIRollup per period that has KPI days, ordered by period. Only the periods
+    starting on a day of `periods` are kept when it is given.
+    Each period kept must be complete in `kpis` (all its stored days).
+    Duplicated days: the last record wins, like the KPI calculator.
+    """
+    by_day = {k.date.date(): k for k in kpis}
+
+    accumulators: dict[date, _PeriodAccumulator] = {}
+    for day in sorted(by_day):
+        start, _ = period_bounds(day, granularity)
+        if periods is not None and start not in periods:
+            continue
+        accumulators.setdefault(start, _PeriodAccumulator()).add(by_day[day])
+
+    rollups: list[KPIRollup] = []
+    for start, acc in accumulators.items():
+        _, end = period_bounds(start, granularity)
+        adherence_days = acc.counts["adherence_steps"]
+        rollups.append(
+            KPIRollup(
+                granularity=granularity,
+                period_start=_midnight_utc(start),
+                period_end=_midnight_utc(end),
+                days=acc.days,
+                adherence_ratio=acc.adherent_days / adherence_days if adherence_days else None,
+                metrics={
+                    column: MetricRollup(
+                        mean=acc.sums[column] / acc.counts[column] if acc.counts[column] else None,
+                        min=acc.mins[column],
+                        max=acc.maxs[column],
+                        count=acc.counts[column],
+                    )
+                    for column in ROLLUP_COLUMNS
+                },
+            )
+        )
+    return rollups
@@ -10,17 +10,42 @@ WHY THIS FILE EXISTS:
 - This makes the operation reusable (CLI, tests, background jobs) and keeps boundaries clean.
 """
 
+import asyncio
 from dataclasses import dataclass
 from datetime import date, datetime, time, timedelta, timezone
-from typing import Optional
-from app.business.kpi_calculator import compute_daily_kpis
-from app.domain.entities import DailyKPIsOutput, DailyMetricsInput, IngestReport, DailyMetricsInput
+from typing import AsyncIterator, Iterable, Iterator, Optional
+from app.business.kpi_calculator import (
+    DEFAULT_STREAM_CHUNK_SIZE,
+    IncrementalKPICalculator,
+    compute_daily_kpis,
+    iter_daily_kpis,
+    kpi_dirty_range,
+    kpi_max_lookback_days,
+    kpis_equal,
+)
+from app.business.kpi_registry import (
+    KPI_FIELDS,
+    kpis_depending_on_params,
+    plan_lookahead_days,
+    plan_lookback_days,
+    required_input_columns,
+    resolve_kpis,
+)
+from app.business.range_stats import CUMULATIVE_COLUMNS, accumulate_totals, range_stats
+from app.business.rollups import ROLLUP_GRANULARITIES, compute_rollups, period_bounds
+from app.domain.entities import DailyKPIsOutput, DailyMetricsInput, IngestReport, DailyMetricsInput, KPIRollup, RangeStats, RollingCheckpoint
+from app.domain.series import KPISeries
 
 from app.domain.interfaces import (
+    AsyncOutputRepository_Interface,
     OutputRepository_Interface,
     InputRepository_Interface,
     FileStorage_Interface,
     CSVParser_Interface,
+    CheckpointRepository_Interface,
+    CumulativeRepository_Interface,
+    KPIEngine_Interface,
+    RollupRepository_Interface,
 )
 @dataclass(frozen=True) 
 class GetKPIs:
@@ -32,6 +57,66 @@ class GetKPIs:
             raise ValueError("Start date must be before end date.")
         
         return self.output_repo.get_output(start, end)
+
+
+@dataclass(frozen=True)
+class StreamKPIs:
+    """
+    Same as GetKPIs, but returns an iterator of KPI batches read lazily from the repository.
+    The range is validated here, before anything is streamed, so a bad request can
+    still be answered with a 400.
+    """
+
+    output_repo: OutputRepository_Interface
+    batch_size: int = 1000
+
+    def execute(self, start: datetime, end: datetime) -> Iterator[list[DailyKPIsOutput]]:
+        if start > end:
+            raise ValueError("Start date must be before end date.")
+
+        return self.output_repo.iter_output(start.date(), end.date(), batch_size=self.batch_size)
+
+
+@dataclass(frozen=True)
+class KPIPage:
+    rows: list[DailyKPIsOutput]
+    next_after: Optional[date]  # date of the last row if there are more rows, else None
+
+
+@dataclass(frozen=True)
+class GetKPIPage:
+    """
+    Same as GetKPIs, one keyset page at a time: at most `limit` rows with date > `after`.
+    One extra row is read to know whether another page exists, so the last page
+    never ends with an empty request.
+    """
+
+    output_repo: OutputRepository_Interface
+
+    def execute(self, start: datetime, end: datetime, *, limit: int, after: Optional[date] = None) -> KPIPage:
+        if start > end:
+            raise ValueError("Start date must be before end date.")
+        if limit < 1:
+            raise ValueError("Page limit must be at least 1.")
+
+        rows = self.output_repo.get_output_page(start.date(), end.date(), after=after, limit=limit + 1)
+        if len(rows) > limit:
+            rows = rows[:limit]
+            return KPIPage(rows=rows, next_after=rows[-1].date.date())
+        return KPIPage(rows=rows, next_after=None)
+
+
+@dataclass(frozen=True)
+class GetKPISeries:
+    """Same as GetKPIs, but returns one columnar KPISeries (cheap for multi-year ranges)."""
+
+    output_repo: OutputRepository_Interface
+
+    def execute(self, start: datetime, end: datetime) -> KPISeries:
+        if start > end:
+            raise ValueError("Start date must be before end date.")
+
+        return self.output_repo.get_output_series(start.date(), end.date())
 """
 ========================
 LEARNING NOTES (FOR ME)
@@ -95,6 +180,15 @@ class IngestDailyCSV:
     parser: CSVParser_Interface
     
     steps_goal: int = 10000  #default target steps for KPI calculation
+
+    # Optional: enables the O(1) next-day path from a rolling-state checkpoint
+    checkpoint_repo: Optional[CheckpointRepository_Interface] = None
+
+    # Optional: keeps the prefix-sum table behind /api/stats/range up to date
+    cumulative_repo: Optional[CumulativeRepository_Interface] = None
+
+    # Optional: keeps the weekly / monthly rollups behind /api/kpis/rollup up to date
+    rollup_repo: Optional[RollupRepository_Interface] = None
     
     def execute(self, file_bytes: bytes, filename: str) -> IngestReport:
         """
@@ -102,7 +196,12 @@ class IngestDailyCSV:
         - Save the uploaded file using the file storage port
         - Parse the CSV and create DailyMetricsInput entities
         - Save inputs using the input repository port
-        - Compute KPIs and save them using the output repository port
+        - Compute KPIs and save them using the output repository port:
+            * next-day uploads are computed from the rolling-state checkpoint (if configured)
+            * anything else recomputes the uploaded days and every later day whose rolling
+              windows reach back into them, saving only the rows that changed
+        - Rebuild the running totals (if configured) from the earliest written day forward
+        - Recompute the weekly / monthly rollups (if configured) of the periods whose KPIs changed
         - Move the file to processed or unprocessable based on success/failure of all steps
         - Return an IngestReport entity summarizing the operation
         """
@@ -132,23 +231,31 @@ class IngestDailyCSV:
                     kpi_records_upserted=0,
                 )
             
-            # 3. Save inputs
-            self.input_repo.save_input(input_data=records)
+            # 3. Save inputs (read the checkpoint first: it is only valid while its day
+            # is the latest stored input day, which stops being true once we save)
+            checkpoint = self.checkpoint_repo.get_checkpoint() if self.checkpoint_repo is not None else None
+            affected_range = self.input_repo.save_input(input_data=records)
             
-            # 4) Compute KPI range from uploaded records
-            upload_start = min(r.date.date() for r in records)
-            upload_end = max(r.date.date() for r in records)
+            # 4-5) Compute + save KPIs
+            # Fast path: the upload only appends the days right after the checkpoint,
+            # so KPIs come from the checkpoint state + the new records (no context read).
+            kpis = self._append_from_checkpoint(checkpoint, records) if checkpoint is not None else None
 
-            # Fetch context (previous 6 days) for rolling windows
-            context_start = upload_start - timedelta(days=6)
-            context_records = self.input_repo.get_input(start=context_start, end=upload_end)
+            if kpis is None:
+                kpis = self._recompute_dirty_range(records, affected_range)
 
-            # Compute KPIs only for upload range, using context for rolling stats
-            kpis = compute_daily_kpis(context_records, start=upload_start, end=upload_end, target_steps=self.steps_goal)
-            
-            # 5. Save outputs
-            if kpis:
-                self.output_repo.save_output(output_data=kpis)         
+            # Running totals change from the earliest written day forward
+            if self.cumulative_repo is not None:
+                first_written = affected_range[0] if affected_range is not None else min(r.date.date() for r in records)
+                RefreshCumulativeStats(
+                    input_repo=self.input_repo, output_repo=self.output_repo, cumulative_repo=self.cumulative_repo
+                ).execute(from_day=first_written)
+
+            # Only the weeks / months containing a rewritten KPI day
+            if self.rollup_repo is not None and kpis:
+                RefreshKPIRollups(output_repo=self.output_repo, rollup_repo=self.rollup_repo).execute(
+                    days=[k.date.date() for k in kpis]
+                )
 
             # 6. Move file to processed
             self.file_storage.move_csv_to_processed(file_id=file_id)
@@ -180,4 +287,421 @@ class IngestDailyCSV:
             )
 
             
-  
\ No newline at end of file
+  
+
+    def _append_from_checkpoint(
+        self, checkpoint: RollingCheckpoint, records: list[DailyMetricsInput]
+    ) -> Optional[list[DailyKPIsOutput]]:
+        """
+        O(1)-per-day path for the common "one new day" upload.
+        Returns None when the upload is not a pure append (backdated, gap-filling,
+        re-upload) or the checkpoint can't be used, so the caller falls back.
+        """
+        by_day: dict[date, DailyMetricsInput] = {}
+        for r in records:
+            by_day[r.date.date()] = r  # last one wins, like the calculator
+
+        new_days = sorted(by_day)
+        expected_first = checkpoint.date.date() + timedelta(days=1)
+        consecutive = all(b - a == timedelta(days=1) for a, b in zip(new_days, new_days[1:]))
+        if new_days[0] != expected_first or not consecutive:
+            return None
+
+        try:
+            calculator = IncrementalKPICalculator.from_state(checkpoint.state, target_steps=self.steps_goal)
+        except (KeyError, TypeError, ValueError):
+            return None  # old/corrupted state: recompute the window instead
+
+        kpis = [calculator.push(by_day[d]) for d in new_days]
+
+        if kpis:
+            self.output_repo.save_output(output_data=kpis)
+        self._save_checkpoint(calculator)
+        return kpis
+
+    def _recompute_dirty_range(
+        self, records: list[DailyMetricsInput], affected_range: Optional[tuple[date, date]]
+    ) -> list[DailyKPIsOutput]:
+        """
+        Windowed recompute: the days that were written plus every later day whose
+        rolling windows reach back into them, from the minimum input context.
+        """
+        # Work out which days need new KPIs: the span the repository reports as written
+        # (or the uploaded records themselves), plus every later day whose windows reach back into it
+        if affected_range is not None:
+            changed_start, changed_end = affected_range
+        else:
+            changed_start = min(r.date.date() for r in records)
+            changed_end = max(r.date.date() for r in records)
+
+        context_start, dirty_start, dirty_end, context_end = kpi_dirty_range(changed_start, changed_end)
+
+        # Fetch the minimum input context (max KPI lookback before / look-ahead after the dirty range)
+        context_records = self.input_repo.get_input(start=context_start, end=context_end)
+
+        # Compute KPIs only for the dirty range, using context for rolling stats
+        kpis = compute_daily_kpis(context_records, start=dirty_start, end=dirty_end, target_steps=self.steps_goal)
+        
+        # Save only the KPI rows whose values actually changed
+        kpis = self._changed_kpis(kpis, dirty_start, dirty_end)
+        if kpis:
+            self.output_repo.save_output(output_data=kpis)
+
+        # Re-seed the checkpoint from the same context. If later input days exist the
+        # repository will report it as stale, so this is always safe.
+        if self.checkpoint_repo is not None and context_records:
+            calculator = IncrementalKPICalculator(target_steps=self.steps_goal)
+            by_day = {r.date.date(): r for r in context_records}
+            for d in sorted(by_day):
+                calculator.push(by_day[d], emit=False)
+            self._save_checkpoint(calculator)
+
+        return kpis
+
+    def _save_checkpoint(self, calculator: IncrementalKPICalculator) -> None:
+        if self.checkpoint_repo is None or calculator.last_day is None:
+            return
+        self.checkpoint_repo.save_checkpoint(
+            RollingCheckpoint(
+                date=datetime.combine(calculator.last_day, time.min, tzinfo=timezone.utc),
+                state=calculator.to_state(),
+            )
+        )
+
+    def _changed_kpis(self, kpis: list[DailyKPIsOutput], dirty_start: date, dirty_end: date) -> list[DailyKPIsOutput]:
+        """
+        Drop KPI rows identical to what is already stored, so re-uploads and
+        backfills only write the days that really moved.
+        """
+        if not kpis:
+            return []
+
+        stored = self.output_repo.get_output(
+            start=datetime.combine(dirty_start, time.min, tzinfo=timezone.utc),
+            end=datetime.combine(dirty_end, time.min, tzinfo=timezone.utc),
+        )
+        stored_by_day = {row.date.date(): row for row in stored}
+
+        changed: list[DailyKPIsOutput] = []
+        for kpi in kpis:
+            existing = stored_by_day.get(kpi.date.date())
+            if existing is None or not kpis_equal(existing, kpi):
+                changed.append(kpi)
+
+        return changed
+
+
+@dataclass(frozen=True)
+class RecomputeKPIs:
+    """
+    Recompute some stored KPIs over a date range, e.g. after the steps goal changed.
+
+    Only the requested KPIs (and their dependencies) are evaluated, only their input
+    columns are read, and only the rows whose values moved are written back.
+    Days without stored KPIs are left alone: a normal ingest owns those.
+    """
+
+    input_repo: InputRepository_Interface
+    output_repo: OutputRepository_Interface
+    steps_goal: int = 10000
+
+    def execute(
+        self,
+        start: date,
+        end: date,
+        *,
+        kpis: Optional[Iterable[str]] = None,
+        changed_params: Optional[Iterable[str]] = None,
+    ) -> list[DailyKPIsOutput]:
+        if start > end:
+            raise ValueError("Start date must be before end date.")
+
+        # Which KPIs: the explicit list, or whatever depends on the changed profile parameters
+        if kpis is None:
+            kpis = kpis_depending_on_params(changed_params) if changed_params is not None else KPI_FIELDS
+        names = tuple(dict.fromkeys(kpis))
+
+        not_persisted = [name for name in names if name not in KPI_FIELDS]
+        if not_persisted:
+            raise ValueError(f"Only persisted KPIs can be recomputed: {not_persisted}")
+        if not names:
+            return []
+
+        # KPIs of day D read inputs D-lookback .. D+lookahead
+        plan = resolve_kpis(names)
+        context_start = start - timedelta(days=plan_lookback_days(plan))
+        context_end = end + timedelta(days=plan_lookahead_days(plan))
+
+        # Projection: only the input columns the plan reads
+        context_records = self.input_repo.get_input(
+            start=context_start, end=context_end, columns=required_input_columns(plan)
+        )
+        fresh = compute_daily_kpis(
+            context_records, start=start, end=end, target_steps=self.steps_goal, kpis=names
+        )
+
+        stored = self.output_repo.get_output(
+            start=datetime.combine(start, time.min, tzinfo=timezone.utc),
+            end=datetime.combine(end, time.min, tzinfo=timezone.utc),
+        )
+        stored_by_day = {row.date.date(): row for row in stored}
+
+        # Merge the recomputed fields into the stored rows (the other KPIs keep their values)
+        changed: list[DailyKPIsOutput] = []
+        for kpi in fresh:
+            row = stored_by_day.get(kpi.date.date())
+            if row is None or kpis_equal(row, kpi, fields=names):
+                continue
+            for name in names:
+                setattr(row, name, getattr(kpi, name))
+            changed.append(row)
+
+        if changed:
+            self.output_repo.save_output(output_data=changed)
+
+        return changed
+
+
+@dataclass(frozen=True)
+class RebuildKPIs:
+    """
+    Recompute and save every KPI in a date range (the whole history by default),
+    e.g. after a calculator change or a bulk import.
+
+    Inputs are streamed from the repository and KPIs are saved chunk by chunk,
+    so memory stays flat however many years are rebuilt.
+    """
+
+    input_repo: InputRepository_Interface
+    output_repo: OutputRepository_Interface
+    steps_goal: int = 10000
+    chunk_size: int = DEFAULT_STREAM_CHUNK_SIZE
+
+    def execute(self, start: Optional[date] = None, end: Optional[date] = None) -> int:
+        """Returns how many KPI rows were saved."""
+        if start is not None and end is not None and start > end:
+            raise ValueError("Start date must be before end date.")
+
+        # Days before `start` are read only as rolling-window context
+        context_start = start - timedelta(days=kpi_max_lookback_days()) if start is not None else None
+
+        saved = 0
+        records = self.input_repo.iter_input(start=context_start, end=end, batch_size=self.chunk_size)
+        for chunk in iter_daily_kpis(
+            records, start=start, end=end, target_steps=self.steps_goal, chunk_size=self.chunk_size
+        ):
+            self.output_repo.save_output(output_data=chunk)
+            saved += len(chunk)
+
+        return saved
+
+
+@dataclass(frozen=True)
+class RebuildKPIsInDB:
+    """
+    RebuildKPIs pushed down to the database: the KPIs are computed and upserted by one SQL
+    statement (window functions), so no input or KPI row travels through the app.
+    Same results as RebuildKPIs; prefer it for full-history rebuilds on Postgres.
+    With a Parquet cold tier the engine only sees the hot inputs, so it skips the days whose
+    lookback was archived (see sql_kpi_engine.py); RebuildKPIs covers those.
+    """
+
+    kpi_engine: KPIEngine_Interface
+    steps_goal: int = 10000
+
+    def execute(self, start: Optional[date] = None, end: Optional[date] = None) -> int:
+        """Returns how many KPI rows were saved."""
+        if start is not None and end is not None and start > end:
+            raise ValueError("Start date must be before end date.")
+
+        return self.kpi_engine.rebuild_kpis(start, end, target_steps=self.steps_goal)
+
+
+@dataclass(frozen=True)
+class RefreshCumulativeStats:
+    """
+    Rebuild the running totals (daily_cumulative) from `from_day` forward, or all of them.
+
+    A day's totals only depend on the days before it, so rows before `from_day` are kept and
+    the rebuild continues from the last of them: a next-day upload rewrites one row, a backdated
+    one rewrites the tail after it. Without any earlier row it starts at the first input day.
+    """
+
+    input_repo: InputRepository_Interface
+    output_repo: OutputRepository_Interface
+    cumulative_repo: CumulativeRepository_Interface
+
+    def execute(self, from_day: Optional[date] = None) -> int:
+        """Returns how many daily_cumulative rows were written."""
+        previous = self.cumulative_repo.get_cumulative(from_day - timedelta(days=1)) if from_day is not None else None
+        # Continue right after the last kept row (days in between, if any, are rebuilt too)
+        start = previous.date.date() + timedelta(days=1) if previous is not None else None
+
+        inputs = list(self.input_repo.iter_input(start=start))
+        if not inputs:
+            return 0
+
+        first_day = start if start is not None else inputs[0].date.date()
+        last_day = inputs[-1].date.date()
+        kpis = self.output_repo.get_output(
+            start=datetime.combine(first_day, time.min, tzinfo=timezone.utc),
+            end=datetime.combine(last_day, time.min, tzinfo=timezone.utc),
+        )
+
+        rows = accumulate_totals(previous, inputs, kpis, start=first_day, end=last_day)
+        self.cumulative_repo.save_cumulative(rows)
+        return len(rows)
+
+
+@dataclass(frozen=True)
+class GetRangeStats:
+    """
+    Total, mean and coverage of any input / KPI column over [start, end], from two
+    daily_cumulative lookups (the cost does not depend on the range length).
+    """
+
+    cumulative_repo: CumulativeRepository_Interface
+
+    def execute(self, start: datetime, end: datetime, metrics: Optional[Iterable[str]] = None) -> RangeStats:
+        if start > end:
+            raise ValueError("Start date must be before end date.")
+
+        names = tuple(dict.fromkeys(metrics)) if metrics is not None else CUMULATIVE_COLUMNS
+        unknown = [name for name in names if name not in CUMULATIVE_COLUMNS]
+        if unknown:
+            raise ValueError(f"Unknown metrics: {unknown}")
+
+        start_day, end_day = start.date(), end.date()
+        upto = self.cumulative_repo.get_cumulative(end_day)
+        before = self.cumulative_repo.get_cumulative(start_day - timedelta(days=1))
+        return range_stats(before, upto, start=start_day, end=end_day, metrics=names)
+
+
+@dataclass(frozen=True)
+class RefreshKPIRollups:
+    """
+    Recompute the weekly and monthly rollups (kpi_rollups) of the periods containing `days`,
+    or of the whole history.
+
+    A period only depends on its own days, so a next-day upload rewrites one week and one
+    month. The KPIs are read once, over the span covering every touched period.
+    While kpi_rollups is still empty (first upload after the migration) everything is rebuilt.
+    """
+
+    output_repo: OutputRepository_Interface
+    rollup_repo: RollupRepository_Interface
+
+    def execute(self, days: Optional[Iterable[date]] = None) -> int:
+        """Returns how many kpi_rollups rows were written."""
+        days = set(days) if days is not None else None
+        if days is not None and not days:
+            return 0
+
+        if days is None or not self.rollup_repo.has_rollups():
+            kpis = [k for batch in self.output_repo.iter_output(date.min, date.max) for k in batch]
+            rows = [r for granularity in ROLLUP_GRANULARITIES for r in compute_rollups(kpis, granularity)]
+        else:
+            first = min(period_bounds(min(days), g)[0] for g in ROLLUP_GRANULARITIES)
+            last = max(period_bounds(max(days), g)[1] for g in ROLLUP_GRANULARITIES)
+            kpis = self.output_repo.get_output(
+                start=datetime.combine(first, time.min, tzinfo=timezone.utc),
+                end=datetime.combine(last, time.min, tzinfo=timezone.utc),
+            )
+            rows = [
+                r
+                for granularity in ROLLUP_GRANULARITIES
+                for r in compute_rollups(kpis, granularity, periods={period_bounds(d, granularity)[0] for d in days})
+            ]
+
+        self.rollup_repo.save_rollups(rows)
+        return len(rows)
+
+
+@dataclass(frozen=True)
+class GetKPIRollups:
+    """
+    Weekly or monthly KPI rollups of the periods overlapping [start, end] (whole periods,
+    so the first week / month may start before `start`).
+    """
+
+    rollup_repo: RollupRepository_Interface
+
+    def execute(self, granularity: str, start: datetime, end: datetime) -> list[KPIRollup]:
+        if granularity not in ROLLUP_GRANULARITIES:
+            raise ValueError(f"Unknown granularity: {granularity!r} (expected one of {ROLLUP_GRANULARITIES})")
+        if start > end:
+            raise ValueError("Start date must be before end date.")
+
+        first_period, _ = period_bounds(start.date(), granularity)
+        return self.rollup_repo.get_rollups(granularity, first_period, end.date())
+
+
+# ---------------------------------------------------------------------------
+# Async variants, for `async def` endpoints.
+# Rule: an async use case never runs blocking work on the event loop. DB waits are awaited
+# (async repository ports), CPU-heavy or sync-driver work goes to a worker thread.
+# ---------------------------------------------------------------------------
+
+@dataclass(frozen=True)
+class AsyncGetKPIs:
+    output_repo: AsyncOutputRepository_Interface
+
+    async def execute(self, start: datetime, end: datetime) -> list[DailyKPIsOutput]:
+        if start > end:
+            raise ValueError("Start date must be before end date.")
+
+        return await self.output_repo.get_output(start, end)
+
+
+@dataclass(frozen=True)
+class AsyncGetKPIPage:
+    """Async GetKPIPage (same limit + 1 trick to detect the last page)."""
+
+    output_repo: AsyncOutputRepository_Interface
+
+    async def execute(self, start: datetime, end: datetime, *, limit: int, after: Optional[date] = None) -> KPIPage:
+        if start > end:
+            raise ValueError("Start date must be before end date.")
+        if limit < 1:
+            raise ValueError("Page limit must be at least 1.")
+
+        rows = await self.output_repo.get_output_page(start.date(), end.date(), after=after, limit=limit + 1)
+        if len(rows) > limit:
+            rows = rows[:limit]
+            return KPIPage(rows=rows, next_after=rows[-1].date.date())
+        return KPIPage(rows=rows, next_after=None)
+
+
+@dataclass(frozen=True)
+class AsyncStreamKPIs:
+    """Async StreamKPIs: validated eagerly, then batches come from an async server-side cursor."""
+
+    output_repo: AsyncOutputRepository_Interface
+    batch_size: int = 1000
+
+    def execute(self, start: datetime, end: datetime) -> AsyncIterator[list[DailyKPIsOutput]]:
+        if start > end:
+            raise ValueError("Start date must be before end date.")
+
+        return self.output_repo.iter_output(start.date(), end.date(), batch_size=self.batch_size)
+
+
+@dataclass(frozen=True)
+class AsyncIngestDailyCSV:
+    """
+    IngestDailyCSV for async endpoints: the whole pipeline runs on a worker thread.
+
+    Why a thread and not async repositories here?
+    - An upload is mostly CPU (CSV parsing, KPI computation) with a few DB writes in between.
+      CPU work blocks the event loop whatever driver is used, so it has to leave the loop anyway.
+    - Running the existing IngestDailyCSV there keeps ONE implementation of the ingest rules
+      (checkpoint fast path, dirty-range recompute, changed-rows-only writes).
+    - Meanwhile the event loop keeps serving other requests (reads stay fast during an upload).
+
+    The wrapped use case must own its dependencies (its DB session is used from that thread only).
+    """
+
+    ingest: IngestDailyCSV
+
+    async def execute(self, file_bytes: bytes, filename: str) -> IngestReport:
+        return await asyncio.to_thread(self.ingest.execute, file_bytes=file_bytes, filename=filename)
@@ -24,8 +24,27 @@ def get_api_base_url() -> str:
 
 @st.cache_data(ttl=30)
 def fetch_kpis(api_base_url: str, start: date, end: date):
+    # Read page by page (keyset cursor in the X-Next-Cursor header): every request stays
+    # small and fast, whatever the selected range is
     url = f"{api_base_url}/api/kpis/"
-    params = {"start_date": start.isoformat(), "end_date": end.isoformat()}
+    params = {"start_date": start.isoformat(), "end_date": end.isoformat(), "limit": 1000}
+    rows = []
+    while True:
+        r = httpx.get(url, params=params, timeout=20.0)
+        r.raise_for_status()
+        rows.extend(r.json())
+        cursor = r.headers.get("X-Next-Cursor")
+        if cursor is None:
+            return rows
+        params["cursor"] = cursor
+
+
+@st.cache_data(ttl=30)
+def fetch_rollups(api_base_url: str, start: date, end: date, granularity: str):
+    # One row per week / month from the materialized rollups: a multi-year trend is a few
+    # hundred rows instead of every daily KPI
+    url = f"{api_base_url}/api/kpis/rollup"
+    params = {"granularity": granularity, "start_date": start.isoformat(), "end_date": end.isoformat()}
     r = httpx.get(url, params=params, timeout=20.0)
     r.raise_for_status()
     return r.json()
@@ -372,6 +391,46 @@ def render_dashboard_view(
             st.line_chart(df_plot[[kpi]], width="stretch")
 
 
+def build_rollup_dataframe(data: list[dict]) -> pd.DataFrame:
+    """One row per period (index = period start), one column per KPI mean + the adherence ratio."""
+    df = pd.DataFrame(
+        [
+            {
+                "period_start": pd.to_datetime(row["period_start"]).date(),
+                **{name: metric["mean"] for name, metric in row["metrics"].items() if name != "adherence_steps"},
+                "adherence_ratio": row["adherence_ratio"],
+            }
+            for row in data
+        ]
+    )
+    return df.set_index("period_start").apply(pd.to_numeric, errors="coerce")
+
+
+def render_trends_view(api_base_url: str, start: date, end: date, granularity: str):
+    try:
+        data = fetch_rollups(api_base_url, start, end, granularity)
+    except httpx.HTTPError as e:
+        st.error("Could not fetch KPI rollups from the API.")
+        st.write("Details:", str(e))
+        return
+
+    if not data:
+        st.info("No KPI data available for the selected date range.")
+        return
+
+    df_plot = build_rollup_dataframe(data)
+    st.subheader(f"{granularity.title()}ly trends")
+    st.caption(f"{len(df_plot)} {granularity}s — mean of the daily KPIs per {granularity}; adherence ratio = share of days meeting the steps goal.")
+
+    charts_per_row = st.select_slider("Charts per row", options=[2, 3, 4], value=3)
+    cols = st.columns(charts_per_row)
+
+    for i, kpi in enumerate(df_plot.columns):
+        with cols[i % charts_per_row]:
+            st.caption("Steps goal met (ratio)" if kpi == "adherence_ratio" else prettify_kpi_name(kpi))
+            st.line_chart(df_plot[[kpi]], width="stretch")
+
+
 def render_upload_view(api_base_url: str):
     st.subheader("Upload CSV")
     st.write(
@@ -415,6 +474,7 @@ def render_upload_view(api_base_url: str):
                 st.session_state["selected_view"] = "Upload CSV"
 
                 fetch_kpis.clear()
+                fetch_rollups.clear()
                 build_dataframe_cached.clear()
                 prepare_plot_df_cached.clear()
 
@@ -465,8 +525,11 @@ def main():
             st.error("Start date must be before end date.")
             st.stop()
 
+        resolution = st.radio("Chart resolution", options=["Daily", "Weekly", "Monthly"], horizontal=True)
+
         if st.button("Reload data", width="stretch"):
             fetch_kpis.clear()
+            fetch_rollups.clear()
             build_dataframe_cached.clear()
             prepare_plot_df_cached.clear()
 
@@ -486,6 +549,8 @@ def main():
 
     if selected == "Info":
         render_info_view(api_base_url)
+    elif selected == "Dashboard" and resolution != "Daily":
+        render_trends_view(api_base_url, start, end, granularity="week" if resolution == "Weekly" else "month")
     elif selected == "Dashboard":
         render_dashboard_view(
             api_base_url=api_base_url,
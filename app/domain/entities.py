@@ -1,8 +1,10 @@
 from datetime import datetime
-from dataclasses import dataclass
-from typing import Optional # for type hinting. Optional indicates that a field can be of a certain type or None.
+from dataclasses import dataclass, field
+from typing import Any, Optional # for type hinting. Optional indicates that a field can be of a certain type or None.
 
-@dataclass
+# slots=True: no per-instance __dict__, so every row read from the DB is ~2x smaller.
+# See app/domain/series.py for the columnar alternative used on long histories.
+@dataclass(slots=True)
 class DailyMetricsInput:
     date: datetime
 
@@ -20,7 +22,7 @@ class DailyMetricsInput:
     waist_cm: Optional[float] = None
 
 
-@dataclass
+@dataclass(slots=True)
 class DailyKPIsOutput:
     """
     Minimal KPI set (8 KPIs) focused on demonstrating architecture,
@@ -45,6 +47,72 @@ class DailyKPIsOutput:
     weight_7d_avg: Optional[float] = None
     waist_change_7d: Optional[float] = None
 
+    # Extra rolling windows requested at compute time, e.g. {"weight_28d_avg": 80.4}.
+    # Not persisted: only the fixed fields above are stored in daily_kpis.
+    rolling: dict[str, Optional[float]] = field(default_factory=dict)
+
+
+@dataclass
+class RollingCheckpoint:
+    """
+    Rolling-window state right after computing the KPIs of `date`, the latest stored input day.
+    `state` is an opaque JSON-friendly dict produced by the KPI calculator.
+    """
+    date: datetime
+    state: dict[str, Any]
+
+
+@dataclass
+class CumulativeTotals:
+    """
+    Running totals from the first stored day up to `date` (included), per input / KPI column:
+    the sum of its values and how many days had one (non-null count).
+    `input_days` counts the days that have an input row.
+    """
+    date: datetime
+    input_days: int
+    sums: dict[str, float]
+    counts: dict[str, int]
+
+
+@dataclass
+class MetricRangeStats:
+    total: float
+    count: int                # days of the range with a value
+    mean: Optional[float]     # None when no day has a value
+    coverage: float           # count / calendar days of the range (0.0 .. 1.0)
+
+
+@dataclass
+class RangeStats:
+    start: datetime
+    end: datetime
+    days: int                 # calendar days of [start, end]
+    input_days: int           # days of the range with an input row
+    metrics: dict[str, MetricRangeStats]
+
+
+@dataclass
+class MetricRollup:
+    mean: Optional[float]     # None when no day of the period has a value
+    min: Optional[float]
+    max: Optional[float]
+    count: int                # days of the period with a value
+
+
+@dataclass
+class KPIRollup:
+    """
+    Aggregates of the daily KPIs over one calendar period: an ISO week (Monday to Sunday)
+    or a calendar month.
+    """
+    granularity: str                   # "week" | "month"
+    period_start: datetime
+    period_end: datetime
+    days: int                          # KPI days stored in the period
+    adherence_ratio: Optional[float]   # share of those days meeting the steps goal (0.0 .. 1.0)
+    metrics: dict[str, MetricRollup]
+
 
 @dataclass
 class IngestReport:
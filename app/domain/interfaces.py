@@ -1,5 +1,7 @@
-from app.domain.entities import DailyMetricsInput, DailyKPIsOutput
-from datetime import datetime
+from app.domain.entities import CumulativeTotals, DailyMetricsInput, DailyKPIsOutput, KPIRollup, RollingCheckpoint
+from app.domain.series import KPISeries, MetricsSeries
+from datetime import date, datetime
+from typing import AsyncIterator, Iterator, Optional, Sequence
 
 #We use ABC module to create abstract base classes (interfaces)
 #abstractmethod decorator to define abstract methods that must be implemented by subclasses
@@ -16,11 +18,38 @@ class InputRepository_Interface(ABC):
         Port for saving -> and fetching <- DailyMetricsInput entities.
         """
         @abstractmethod
-        def save_input(self, input_data: list[DailyMetricsInput]) -> None :
+        def save_input(self, input_data: list[DailyMetricsInput]) -> Optional[tuple[date, date]] :
+            """
+            Upsert inputs by day. Returns the (first_day, last_day) range actually written,
+            so callers can recompute KPIs for exactly that span (None if nothing was written).
+            """
             raise NotImplementedError
         
         @abstractmethod
-        def get_input(self, start: datetime, end: datetime) -> list[DailyMetricsInput]:
+        def get_input(
+            self, start: datetime, end: datetime, columns: Optional[Sequence[str]] = None
+        ) -> list[DailyMetricsInput]:
+            """
+            Inputs in [start, end], ordered by date. If `columns` is given only those
+            DailyMetricsInput fields are loaded (the others are left None).
+            """
+            raise NotImplementedError
+
+        @abstractmethod
+        def iter_input(
+            self, start: Optional[date] = None, end: Optional[date] = None, batch_size: int = 1000
+        ) -> Iterator[DailyMetricsInput]:
+            """
+            Inputs in [start, end] (open-ended if None), ordered by date, streamed
+            `batch_size` rows at a time instead of loaded as one list.
+            """
+            raise NotImplementedError
+
+        @abstractmethod
+        def get_input_series(
+            self, start: date, end: date, columns: Optional[Sequence[str]] = None
+        ) -> MetricsSeries:
+            """Same as get_input, as one columnar MetricsSeries (no per-row objects)."""
             raise NotImplementedError
 
 
@@ -36,6 +65,153 @@ class OutputRepository_Interface(ABC):
         def get_output(self, start: datetime, end: datetime) -> list[DailyKPIsOutput]: #returns a list of domain entities
             raise NotImplementedError
 
+        @abstractmethod
+        def get_output_series(self, start: date, end: date) -> KPISeries:
+            """Same as get_output, as one columnar KPISeries (no per-row objects)."""
+            raise NotImplementedError
+
+        @abstractmethod
+        def get_output_page(
+            self, start: date, end: date, after: Optional[date] = None, limit: int = 100
+        ) -> list[DailyKPIsOutput]:
+            """
+            Keyset page: at most `limit` rows of [start, end] with date > `after`, ordered by date.
+            The next page starts after the last date returned.
+            """
+            raise NotImplementedError
+
+        @abstractmethod
+        def iter_output(self, start: date, end: date, batch_size: int = 1000) -> Iterator[list[DailyKPIsOutput]]:
+            """
+            Same rows as get_output, yielded in batches of at most `batch_size` as they come
+            from the DB, so memory does not grow with the range.
+            """
+            raise NotImplementedError
+
+
+class CheckpointRepository_Interface(ABC):
+        """
+        Port for the rolling-state checkpoint of the latest computed day.
+        """
+        @abstractmethod
+        def get_checkpoint(self) -> Optional[RollingCheckpoint]:
+            """
+            Return the checkpoint only while it is still usable, i.e. its day is the latest
+            stored input day. Otherwise (missing, stale) return None.
+            """
+            raise NotImplementedError
+
+        @abstractmethod
+        def save_checkpoint(self, checkpoint: RollingCheckpoint) -> None:
+            raise NotImplementedError
+
+
+class KPIEngine_Interface(ABC):
+        """
+        Port for computing + storing KPIs where the inputs live (inside the database),
+        instead of reading the inputs into the app and computing them in Python.
+        """
+        @abstractmethod
+        def rebuild_kpis(
+            self, start: Optional[date] = None, end: Optional[date] = None, *, target_steps: int = 10_000
+        ) -> int:
+            """
+            Compute the persisted KPIs of every input day in [start, end] (whole history if None)
+            and upsert them, with the same results as compute_daily_kpis.
+            Returns how many KPI rows were written.
+            """
+            raise NotImplementedError
+
+
+class CumulativeRepository_Interface(ABC):
+        """
+        Port for the per-day running totals (prefix sums) of the inputs and KPIs.
+        """
+        @abstractmethod
+        def get_cumulative(self, day: date) -> Optional[CumulativeTotals]:
+            """The latest row on or before `day` (None if there is none)."""
+            raise NotImplementedError
+
+        @abstractmethod
+        def save_cumulative(self, rows: list[CumulativeTotals]) -> None:
+            """Upsert rows by day."""
+            raise NotImplementedError
+
+
+class RollupRepository_Interface(ABC):
+        """
+        Port for the materialized weekly / monthly KPI rollups.
+        """
+        @abstractmethod
+        def get_rollups(self, granularity: str, start: date, end: date) -> list[KPIRollup]:
+            """Rollups of `granularity` whose period starts in [start, end], ordered by period."""
+            raise NotImplementedError
+
+        @abstractmethod
+        def has_rollups(self) -> bool:
+            """True if any rollup is stored (cheap existence check, nothing is loaded)."""
+            raise NotImplementedError
+
+        @abstractmethod
+        def save_rollups(self, rows: list[KPIRollup]) -> None:
+            """Upsert rows by (granularity, period_start)."""
+            raise NotImplementedError
+
+
+#-----------------------------------------------------------------------------------------
+#-------------------------------ASYNC REPOSITORY INTERFACES-------------------------------
+#-----------------------------------------------------------------------------------------
+# Same contracts as above, awaitable, for `async def` code (async endpoints/use cases).
+# Waiting on the DB then yields the event loop instead of blocking it.
+
+class AsyncInputRepository_Interface(ABC):
+        """
+        Async port for saving -> and fetching <- DailyMetricsInput entities.
+        """
+        @abstractmethod
+        async def save_input(self, input_data: list[DailyMetricsInput]) -> Optional[tuple[date, date]]:
+            raise NotImplementedError
+
+        @abstractmethod
+        async def get_input(
+            self, start: datetime, end: datetime, columns: Optional[Sequence[str]] = None
+        ) -> list[DailyMetricsInput]:
+            raise NotImplementedError
+
+        @abstractmethod
+        async def get_input_series(
+            self, start: date, end: date, columns: Optional[Sequence[str]] = None
+        ) -> MetricsSeries:
+            raise NotImplementedError
+
+
+class AsyncOutputRepository_Interface(ABC):
+        """
+        Async port for saving -> and fetching <- DailyKPIsOutput entities.
+        """
+        @abstractmethod
+        async def save_output(self, output_data: list[DailyKPIsOutput]) -> None:
+            raise NotImplementedError
+
+        @abstractmethod
+        async def get_output(self, start: datetime, end: datetime) -> list[DailyKPIsOutput]:
+            raise NotImplementedError
+
+        @abstractmethod
+        async def get_output_series(self, start: date, end: date) -> KPISeries:
+            raise NotImplementedError
+
+        @abstractmethod
+        async def get_output_page(
+            self, start: date, end: date, after: Optional[date] = None, limit: int = 100
+        ) -> list[DailyKPIsOutput]:
+            raise NotImplementedError
+
+        @abstractmethod
+        def iter_output(self, start: date, end: date, batch_size: int = 1000) -> AsyncIterator[list[DailyKPIsOutput]]:
+            """Async generator: `async for batch in repo.iter_output(...)`."""
+            raise NotImplementedError
+
 
 #-----------------------------------------------------------------------------------------
 #------------------------------------STORAGE INTERFACE------------------------------------
@@ -0,0 +1,229 @@
+"""
+Columnar (struct-of-arrays) containers for long histories.
+
+Why this file exists:
+- A list of DailyMetricsInput / DailyKPIsOutput costs one Python object per day, plus one
+  boxed int/float per field. For a 10-year history that is ~40k objects just to move data
+  from the repository to the calculator and on to the API.
+- Here a history is one date vector + one typed array per field (stdlib `array`, 8 bytes
+  per value) + one null mask per field (1 byte per value). No per-row objects at all.
+- Repositories can fill it straight from DB rows, the NumPy backend can read it without
+  copying value by value, and the API can serialize it column by column.
+
+Days are stored as proleptic ordinals (date.toordinal()), always midnight UTC like the
+rest of the domain. Missing values are 0 in the value array and 0 in the mask.
+"""
+
+from __future__ import annotations
+
+from array import array
+from bisect import bisect_left, bisect_right
+from dataclasses import fields
+from datetime import date, datetime, time, timezone
+from typing import Any, ClassVar, Iterable, Iterator, Mapping, Optional, Sequence
+
+from app.domain.entities import DailyKPIsOutput, DailyMetricsInput
+
+
+def _to_datetime(ordinal: int) -> datetime:
+    return datetime.combine(date.fromordinal(ordinal), time.min, tzinfo=timezone.utc)
+
+
+class _Series:
+    """
+    Shared implementation. Subclasses only declare ENTITY and TYPECODES
+    ("q" = int64 for integer fields, "d" = float64 for float fields).
+    """
+
+    ENTITY: ClassVar[type]
+    TYPECODES: ClassVar[dict[str, str]]
+
+    __slots__ = ("days", "_values", "_present")
+
+    def __init__(self, columns: Optional[Sequence[str]] = None):
+        """`columns` keeps only some fields (projection); the others read as None."""
+        columns = tuple(self.TYPECODES) if columns is None else tuple(columns)
+        unknown = [c for c in columns if c not in self.TYPECODES]
+        if unknown:
+            raise ValueError(f"Unknown {type(self).__name__} columns: {unknown}")
+
+        self.days = array("i")  # date ordinals, fits any date in int32
+        self._values: dict[str, array] = {c: array(self.TYPECODES[c]) for c in columns}
+        self._present: dict[str, bytearray] = {c: bytearray() for c in columns}
+
+    # ---- building ----
+
+    def append_row(self, day: date, values: Sequence[Any]) -> None:
+        """Append one day. `values` are in `self.columns` order (e.g. a DB row tuple)."""
+        self.days.append(day.toordinal())
+        for (name, column), value in zip(self._values.items(), values):
+            if value is None:
+                column.append(0)
+                self._present[name].append(0)
+            else:
+                column.append(int(value) if column.typecode == "q" else float(value))
+                self._present[name].append(1)
+
+    def extend_rows(self, rows: Iterable[Sequence[Any]]) -> None:
+        """
+        Append many (day, value, value, ...) rows at once (e.g. DB row tuples).
+        Rows are transposed first so every array is filled in one bulk extend,
+        which is much cheaper than append_row() per row.
+        """
+        rows = list(rows)
+        if not rows:
+            return
+
+        days, *values = zip(*rows)
+        self.days.extend(d.toordinal() for d in days)
+        for (name, column), column_values in zip(self._values.items(), values):
+            if column.typecode == "q":
+                column.extend(0 if v is None else int(v) for v in column_values)
+            else:
+                column.extend(0.0 if v is None else v for v in column_values)
+            self._present[name].extend(v is not None for v in column_values)
+
+    def extend(self, other: "_Series") -> None:
+        """Append all days of `other` (same columns, days after ours): bulk array extends."""
+        if other.columns != self.columns:
+            raise ValueError(f"Column mismatch: {other.columns} != {self.columns}")
+        self.days.extend(other.days)
+        for name in self._values:
+            self._values[name].extend(other._values[name])
+            self._present[name].extend(other._present[name])
+
+    def append(self, entity: Any) -> None:
+        self.append_row(entity.date.date(), [getattr(entity, name) for name in self._values])
+
+    @classmethod
+    def from_entities(cls, entities: Iterable[Any], columns: Optional[Sequence[str]] = None):
+        series = cls(columns)
+        for entity in entities:
+            series.append(entity)
+        return series
+
+    @classmethod
+    def from_numpy(cls, days: Any, columns: Mapping[str, Any]):
+        """
+        Build from NumPy arrays: `days` as ordinals, one float64 array per column with NaN
+        for missing values. Buffers are copied in bulk, never value by value.
+        """
+        import numpy as np  # optional dependency, only needed for this path
+
+        series = cls(tuple(columns))
+        series.days = array("i", np.asarray(days, dtype=np.int32).tobytes())
+        for name, values in columns.items():
+            values = np.asarray(values, dtype=np.float64)
+            present = ~np.isnan(values)
+            dtype = np.int64 if series.TYPECODES[name] == "q" else np.float64
+            series._values[name] = array(series.TYPECODES[name], np.where(present, values, 0).astype(dtype).tobytes())
+            series._present[name] = bytearray(present.astype(np.uint8).tobytes())
+        return series
+
+    def upsert(self, entity: Any) -> None:
+        """
+        Insert or replace one day, keeping days sorted (binary search for the position).
+        Appending after the last day is O(1); an earlier day shifts the arrays once.
+        """
+        ordinal = entity.date.date().toordinal()
+        i = bisect_left(self.days, ordinal)
+        exists = i < len(self.days) and self.days[i] == ordinal
+        if not exists:
+            self.days.insert(i, ordinal)
+
+        for name, column in self._values.items():
+            value = getattr(entity, name)
+            stored = 0 if value is None else (int(value) if column.typecode == "q" else float(value))
+            if exists:
+                column[i] = stored
+                self._present[name][i] = value is not None
+            else:
+                column.insert(i, stored)
+                self._present[name].insert(i, value is not None)
+
+    # ---- reading ----
+
+    def between(self, start: date, end: date, limit: Optional[int] = None):
+        """
+        Days in [start, end] (only the first `limit` ones if given) as a new series of the
+        same type. Requires sorted days (true for repository reads).
+        Two binary searches + bulk slices: no per-row work.
+        """
+        lo = bisect_left(self.days, start.toordinal())
+        hi = bisect_right(self.days, end.toordinal())
+        if limit is not None:
+            hi = min(hi, lo + limit)
+
+        part = type(self)(self.columns)
+        part.days = self.days[lo:hi]
+        for name in self._values:
+            part._values[name] = self._values[name][lo:hi]
+            part._present[name] = self._present[name][lo:hi]
+        return part
+
+    @property
+    def columns(self) -> tuple[str, ...]:
+        return tuple(self._values)
+
+    def __len__(self) -> int:
+        return len(self.days)
+
+    def dates(self) -> list[datetime]:
+        return [_to_datetime(o) for o in self.days]
+
+    def column(self, name: str) -> list[Optional[float]]:
+        """Values of one field as a list, None where missing (all None if not loaded)."""
+        if name not in self._values:
+            if name not in self.TYPECODES:
+                raise KeyError(name)
+            return [None] * len(self)
+        return [v if p else None for v, p in zip(self._values[name], self._present[name])]
+
+    def to_numpy(self, name: str) -> Any:
+        """One field as a float64 NumPy array with NaN where missing."""
+        import numpy as np
+
+        if name not in self._values:
+            if name not in self.TYPECODES:
+                raise KeyError(name)
+            return np.full(len(self), np.nan)
+        values = np.frombuffer(self._values[name], dtype=np.int64 if self.TYPECODES[name] == "q" else np.float64)
+        present = np.frombuffer(self._present[name], dtype=np.uint8).astype(bool)
+        return np.where(present, values.astype(np.float64), np.nan)
+
+    def __iter__(self) -> Iterator[Any]:
+        """Row view for code that still wants entities (created lazily, one at a time)."""
+        columns = {name: self.column(name) for name in self._values}
+        for i, ordinal in enumerate(self.days):
+            yield self.ENTITY(date=_to_datetime(ordinal), **{name: values[i] for name, values in columns.items()})
+
+    def to_entities(self) -> list[Any]:
+        return list(self)
+
+
+def _typecodes(entity: type, integer_fields: Iterable[str]) -> dict[str, str]:
+    integer_fields = set(integer_fields)
+    return {
+        f.name: "q" if f.name in integer_fields else "d"
+        for f in fields(entity)
+        if f.name not in ("date", "rolling")
+    }
+
+
+class MetricsSeries(_Series):
+    """Columnar DailyMetricsInput history."""
+
+    __slots__ = ()
+    ENTITY = DailyMetricsInput
+    TYPECODES = _typecodes(
+        DailyMetricsInput,
+        ("steps_n", "proteins_g", "kcal_in", "kcal_junk_in", "kcal_out_training", "stress_rel"),
+    )
+
+
+class KPISeries(_Series):
+    """Columnar DailyKPIsOutput history (persisted KPI fields only, no extra rolling windows)."""
+
+    __slots__ = ()
+    ENTITY = DailyKPIsOutput
+    TYPECODES = _typecodes(DailyKPIsOutput, ("adherence_steps",))
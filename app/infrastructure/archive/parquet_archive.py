@@ -0,0 +1,273 @@
+"""
+Parquet cold tier: closed years of daily_kpis / daily_inputs as one Parquet file per year.
+
+WHY THIS FILE EXISTS:
+- Rows older than a year are almost never updated, yet they keep growing the hot tables and
+  their indexes (every insert maintains them, every backup copies them).
+- archive_closed_years() moves each closed year out of Postgres into
+      <base>/<table>/<table>_<year>.parquet
+  (zstd, columnar) and drops that year's partition (or deletes its rows).
+- TieredOutputRepository / TieredInputRepository (tiered_repository.py) answer a range by
+  combining the Parquet files of archived years with Postgres for the rest.
+
+Reads:
+- Column projection: only the requested columns are decoded (Parquet is columnar).
+- Predicate pushdown: `date` filters are checked against each row group's min/max statistics.
+  Files are written in row groups of ~1 month, so a one-week read decodes one month, not a year.
+
+Writes hitting an archived year (late correction of an old day):
+- The year's file is read, the rows are merged (last one wins) and the file is rewritten
+  ATOMICALLY: written next to the target under a temporary name, fsync'ed, then os.replace()d.
+  A reader sees the old file or the new one, never a half-written one; a crash leaves the old file.
+- Rewrites are serialized per process (one lock). Run the archive job from one place only.
+
+Enabled by KPI_ARCHIVE_DIR (unset = no cold tier, everything stays in Postgres).
+Run the job from cron:  python -m app.infrastructure.archive.parquet_archive --keep-years 1
+"""
+
+from __future__ import annotations
+
+import argparse
+import logging
+import os
+import threading
+from datetime import date, datetime, timezone
+from pathlib import Path
+from typing import Iterable, Optional, Sequence
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+from sqlalchemy import Integer, delete, func, select
+from sqlalchemy.orm import Session
+
+from app.infrastructure.db.models import DailyInputORM, DailyKPIORM
+from app.infrastructure.db.partitions import drop_year_partition
+from app.infrastructure.db.rows import INPUT_ROW_FIELDS, KPI_ROW_FIELDS, select_range
+
+
+logger = logging.getLogger(__name__)
+
+# Archived tables -> value columns stored in the files (after "date"), in entity field order
+ARCHIVE_TABLES: dict[str, tuple[str, ...]] = {
+    "daily_kpis": KPI_ROW_FIELDS,
+    "daily_inputs": INPUT_ROW_FIELDS,
+}
+
+_ORM_TABLES = {"daily_kpis": DailyKPIORM.__table__, "daily_inputs": DailyInputORM.__table__}
+
+# Rows per row group: ~1 month, the granularity of predicate pushdown inside a yearly file
+DEFAULT_ROW_GROUP_DAYS = 31
+
+# Years kept in Postgres, the current one included (1 = archive every year before this one)
+DEFAULT_KEEP_YEARS = 1
+
+
+def _arrow_schema(table: str) -> pa.Schema:
+    columns = _ORM_TABLES[table].columns
+    return pa.schema(
+        [pa.field("date", pa.date32(), nullable=False)]
+        + [
+            pa.field(name, pa.int64() if isinstance(columns[name].type, Integer) else pa.float64())
+            for name in ARCHIVE_TABLES[table]
+        ]
+    )
+
+
+class ParquetArchive:
+    """
+    Per-year Parquet files of the archived tables. Rows go in and out as (date, value, value, ...)
+    tuples in ARCHIVE_TABLES column order: the same shape as the repositories' Core rows.
+    """
+
+    def __init__(
+        self,
+        base_path: str | Path,
+        *,
+        compression_level: Optional[int] = None,
+        row_group_days: int = DEFAULT_ROW_GROUP_DAYS,
+    ):
+        self._base_path = Path(base_path)
+        self._compression_level = compression_level
+        self._row_group_days = row_group_days
+        self._schemas = {table: _arrow_schema(table) for table in ARCHIVE_TABLES}
+        self._write_lock = threading.Lock()
+
+    def path(self, table: str, year: int) -> Path:
+        return self._base_path / table / f"{table}_{year}.parquet"
+
+    def years(self, table: str) -> set[int]:
+        """Archived years of `table` (one directory listing, no file is opened)."""
+        directory = self._base_path / table
+        if not directory.is_dir():
+            return set()
+        prefix = f"{table}_"
+        return {
+            int(entry.name[len(prefix):-len(".parquet")])
+            for entry in os.scandir(directory)
+            if entry.name.startswith(prefix) and entry.name.endswith(".parquet")
+        }
+
+    def version(self, table: str) -> tuple[int, Optional[datetime]]:
+        """(archived row count, latest file modification): changes whenever a file is rewritten."""
+        rows, latest = 0, None
+        for year in self.years(table):
+            path = self.path(table, year)
+            rows += pq.ParquetFile(path).metadata.num_rows
+            modified = datetime.fromtimestamp(path.stat().st_mtime, tz=timezone.utc)
+            latest = modified if latest is None else max(latest, modified)
+        return rows, latest
+
+    # ---- reading ----
+
+    def read_rows(
+        self, table: str, start: date, end: date, columns: Optional[Sequence[str]] = None
+    ) -> list[tuple]:
+        """
+        (date, *columns) tuples of [start, end] from the archived years, ordered by date.
+        Only the files of the years in range are opened, only `columns` are decoded, and
+        row groups outside [start, end] are skipped from their statistics.
+        """
+        columns = tuple(ARCHIVE_TABLES[table] if columns is None else columns)
+        rows: list[tuple] = []
+        for year in sorted(y for y in self.years(table) if start.year <= y <= end.year):
+            data = pq.read_table(
+                self.path(table, year),
+                columns=["date", *columns],
+                filters=[("date", ">=", start), ("date", "<=", end)],
+            )
+            rows.extend(zip(*(data.column(name).to_pylist() for name in data.column_names)))
+        return rows
+
+    # ---- writing ----
+
+    def write_year(self, table: str, year: int, rows: Iterable[Sequence]) -> int:
+        """Replace the file of `year` with `rows` (full (date, *values) tuples, sorted). Returns the row count."""
+        rows = list(rows)
+        schema = self._schemas[table]
+        data = pa.table(
+            [pa.array(list(values), type=field.type) for field, values in zip(schema, zip(*rows))]
+            if rows else [pa.array([], type=field.type) for field in schema],
+            schema=schema,
+        )
+
+        path = self.path(table, year)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        temporary = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        try:
+            pq.write_table(
+                data,
+                temporary,
+                compression="zstd",
+                compression_level=self._compression_level,
+                row_group_size=self._row_group_days,
+            )
+            # Data on disk before the rename, so a crash can't leave an empty file under the real name
+            with open(temporary, "rb") as f:
+                os.fsync(f.fileno())
+            os.replace(temporary, path)
+        finally:
+            if temporary.exists():
+                temporary.unlink()
+        return len(rows)
+
+    def upsert_rows(self, table: str, rows: Iterable[Sequence]) -> list[int]:
+        """
+        Merge full (date, *values) rows into their years' files (last one wins per day) and
+        rewrite each touched file atomically. Returns the years rewritten.
+        """
+        by_year: dict[int, dict[date, tuple]] = {}
+        for row in rows:
+            by_year.setdefault(row[0].year, {})[row[0]] = tuple(row)
+
+        with self._write_lock:
+            for year, new_rows in by_year.items():
+                merged = {}
+                if self.path(table, year).exists():
+                    merged = {row[0]: row for row in self.read_rows(table, date(year, 1, 1), date(year, 12, 31))}
+                merged.update(new_rows)
+                self.write_year(table, year, [merged[day] for day in sorted(merged)])
+        return sorted(by_year)
+
+
+def archive_closed_years(
+    session: Session,
+    archive: ParquetArchive,
+    *,
+    keep_years: int = DEFAULT_KEEP_YEARS,
+    today: Optional[date] = None,
+) -> list[tuple[str, int]]:
+    """
+    Move every closed year (older than the last `keep_years` years) of daily_kpis / daily_inputs
+    from Postgres to Parquet: write the file first, then drop the year's partition / delete its
+    rows, one commit per table-year. Re-running after a crash is safe: once a year's file exists
+    it is the source of truth (reads and late corrections go to it), so rows of that year still
+    in Postgres are leftovers of the interrupted run and are only deleted, never merged over it.
+    Returns the (table, year) pairs archived.
+    """
+    if keep_years < 1:
+        raise ValueError("keep_years must be at least 1 (the current year stays in Postgres).")
+    first_hot_year = (today or date.today()).year - keep_years + 1
+
+    archived: list[tuple[str, int]] = []
+    for name, columns in ARCHIVE_TABLES.items():
+        table = _ORM_TABLES[name]
+        first_day = session.execute(select(func.min(table.c.date))).scalar()
+        if first_day is None:
+            continue
+
+        for year in range(first_day.year, first_hot_year):
+            year_start, year_end = date(year, 1, 1), date(year, 12, 31)
+            rows = session.execute(select_range(table, columns, year_start, year_end)).all()
+            if not rows:
+                continue
+
+            try:
+                if not archive.path(name, year).exists():
+                    archive.upsert_rows(name, rows)
+                drop_year_partition(session.connection(), name, year)
+                # Rows of that year outside its partition (default partition, unpartitioned table)
+                session.execute(delete(table).where(table.c.date >= year_start, table.c.date <= year_end))
+                session.commit()
+            except Exception:
+                session.rollback()
+                raise
+            archived.append((name, year))
+            logger.info("Archived %s rows of %s %d to %s", len(rows), name, year, archive.path(name, year))
+
+    return archived
+
+
+_shared_archive: Optional[ParquetArchive] = None
+_shared_archive_lock = threading.Lock()
+
+
+def get_parquet_archive() -> Optional[ParquetArchive]:
+    """Process-wide archive under KPI_ARCHIVE_DIR, or None when the cold tier is disabled."""
+    global _shared_archive
+    base_path = os.getenv("KPI_ARCHIVE_DIR")
+    if not base_path:
+        return None
+    with _shared_archive_lock:
+        if _shared_archive is None:
+            _shared_archive = ParquetArchive(base_path)
+        return _shared_archive
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Move closed years of the daily tables to Parquet files.")
+    parser.add_argument("--keep-years", type=int, default=DEFAULT_KEEP_YEARS)
+    args = parser.parse_args(argv)
+
+    archive = get_parquet_archive()
+    if archive is None:
+        raise SystemExit("KPI_ARCHIVE_DIR is not set")
+
+    from app.infrastructure.db.engine import SessionLocal
+
+    with SessionLocal() as session:
+        archived = archive_closed_years(session, archive, keep_years=args.keep_years)
+    print("archived: " + (", ".join(f"{table} {year}" for table, year in archived) if archived else "nothing"))
+
+
+if __name__ == "__main__":
+    main()
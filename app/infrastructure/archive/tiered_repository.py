@@ -0,0 +1,345 @@
+"""
+Tier-aware repositories: archived years come from Parquet, the rest from Postgres.
+
+WHY THIS FILE EXISTS:
+- Once closed years are moved to Parquet (parquet_archive.py), a range like 2015..2026 lives
+  in two places. These decorators split every range by year into segments
+      [2015..2019 archived? -> Parquet file per year] [2020..2026 -> Postgres, one query]
+  and concatenate the results in date order, so callers (use cases, caches, the hot store)
+  don't know there are tiers.
+- Writes are split the same way: days of archived years rewrite their year's file
+  (atomically), the others go to Postgres as usual.
+
+For an archived year the file is the source of truth: Postgres rows of that year (left over
+by an interrupted archive run) are ignored here and deleted by the next archive run.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from datetime import date, datetime, timedelta
+from typing import AsyncIterator, Iterator, Optional, Sequence
+
+from app.domain.entities import DailyKPIsOutput, DailyMetricsInput
+from app.domain.interfaces import (
+    AsyncOutputRepository_Interface,
+    InputRepository_Interface,
+    KPIEngine_Interface,
+    OutputRepository_Interface,
+)
+from app.domain.series import KPISeries, MetricsSeries
+from sqlalchemy.orm import Session
+
+from app.infrastructure.archive.parquet_archive import ARCHIVE_TABLES, ParquetArchive, get_parquet_archive
+from app.infrastructure.db.repository_impl import (
+    DEFAULT_PAGE_SIZE,
+    DEFAULT_STREAM_BATCH_SIZE,
+    DI_Postgres_InputRepository,
+    DI_Postgres_OutputRepository,
+)
+from app.infrastructure.db.sql_kpi_engine import DI_Postgres_KPIEngine
+from app.infrastructure.db.rows import input_to_row, kpi_to_row, midnight_utc
+
+
+_KPIS = "daily_kpis"
+_INPUTS = "daily_inputs"
+
+
+def split_by_tier(start: date, end: date, archived_years: set[int]) -> list[tuple[bool, date, date]]:
+    """
+    Consecutive (archived, segment_start, segment_end) pieces covering [start, end]:
+    one per archived year in range, and one per run of non-archived days in between.
+    """
+    segments: list[tuple[bool, date, date]] = []
+    cursor: Optional[date] = start
+    for year in sorted(y for y in archived_years if start.year <= y <= end.year):
+        year_start, year_end = date(year, 1, 1), date(year, 12, 31)
+        if cursor < year_start:
+            segments.append((False, cursor, year_start - timedelta(days=1)))
+        segments.append((True, max(cursor, year_start), min(end, year_end)))
+        if year_end >= end:
+            cursor = None
+            break
+        cursor = year_end + timedelta(days=1)
+
+    if cursor is not None and cursor <= end:
+        segments.append((False, cursor, end))
+    return segments
+
+
+def _as_date(value: date | datetime) -> date:
+    return value.date() if isinstance(value, datetime) else value
+
+
+def _kpi_tuple(kpi: DailyKPIsOutput) -> tuple:
+    row = kpi_to_row(kpi, computed_at=None)
+    return (row["date"], *(row[name] for name in ARCHIVE_TABLES[_KPIS]))
+
+
+def _read_archived_kpis(archive: ParquetArchive, start: date, end: date) -> list[DailyKPIsOutput]:
+    return [DailyKPIsOutput(midnight_utc(row[0]), *row[1:]) for row in archive.read_rows(_KPIS, start, end)]
+
+
+def _input_tuple(record: DailyMetricsInput) -> tuple:
+    row = input_to_row(record)
+    return (row["date"], *(row[name] for name in ARCHIVE_TABLES[_INPUTS]))
+
+
+class TieredOutputRepository(OutputRepository_Interface):
+    """OutputRepository over Parquet (archived years) + `hot` (Postgres repository) for the rest."""
+
+    def __init__(self, hot: OutputRepository_Interface, archive: ParquetArchive):
+        self._hot = hot
+        self._archive = archive
+
+    def _segments(self, start: date, end: date) -> list[tuple[bool, date, date]]:
+        return split_by_tier(start, end, self._archive.years(_KPIS))
+
+    def save_output(self, output_data: list[DailyKPIsOutput]) -> None:
+        archived_years = self._archive.years(_KPIS)
+        cold = [kpi for kpi in output_data if kpi.date.year in archived_years]
+        hot = [kpi for kpi in output_data if kpi.date.year not in archived_years]
+
+        if cold:
+            self._archive.upsert_rows(_KPIS, [_kpi_tuple(kpi) for kpi in cold])
+        if hot:
+            self._hot.save_output(hot)
+
+    def get_output(self, start: datetime, end: datetime) -> list[DailyKPIsOutput]:
+        rows: list[DailyKPIsOutput] = []
+        for archived, s, e in self._segments(start.date(), end.date()):
+            if archived:
+                rows.extend(_read_archived_kpis(self._archive, s, e))
+            else:
+                rows.extend(self._hot.get_output(midnight_utc(s), midnight_utc(e)))
+        return rows
+
+    def get_output_series(self, start: date, end: date) -> KPISeries:
+        if start > end:
+            raise ValueError("Start date must be before end date.")
+
+        series = KPISeries()
+        for archived, s, e in self._segments(start, end):
+            if archived:
+                series.extend_rows(self._archive.read_rows(_KPIS, s, e, series.columns))
+            else:
+                series.extend(self._hot.get_output_series(s, e))
+        return series
+
+    def get_output_page(
+        self, start: date, end: date, after: Optional[date] = None, limit: int = DEFAULT_PAGE_SIZE
+    ) -> list[DailyKPIsOutput]:
+        if after is not None and after >= end:
+            return []  # nothing left (and after + 1 day would overflow for date.max)
+        lower = start if after is None else max(start, after + timedelta(days=1))
+        rows: list[DailyKPIsOutput] = []
+        for archived, s, e in self._segments(lower, end) if lower <= end else []:
+            remaining = limit - len(rows)
+            if remaining <= 0:
+                break
+            if archived:
+                rows.extend(_read_archived_kpis(self._archive, s, e)[:remaining])
+            else:
+                rows.extend(self._hot.get_output_page(s, e, limit=remaining))
+        return rows
+
+    def iter_output(
+        self, start: date, end: date, batch_size: int = DEFAULT_STREAM_BATCH_SIZE
+    ) -> Iterator[list[DailyKPIsOutput]]:
+        if start > end:
+            raise ValueError("Start date must be before end date.")
+
+        for archived, s, e in self._segments(start, end):
+            if archived:
+                # One archived year is at most 366 rows: read it whole, hand it out in batches
+                rows = _read_archived_kpis(self._archive, s, e)
+                for i in range(0, len(rows), batch_size):
+                    yield rows[i:i + batch_size]
+            else:
+                yield from self._hot.iter_output(s, e, batch_size=batch_size)
+
+    def get_output_version(self) -> tuple[int, Optional[datetime]]:
+        """Fingerprint of both tiers (see DI_Postgres_OutputRepository.get_output_version)."""
+        count, latest = self._hot.get_output_version()
+        archived_count, archived_latest = self._archive.version(_KPIS)
+        if latest is None or (archived_latest is not None and archived_latest > latest):
+            latest = archived_latest
+        return count + archived_count, latest
+
+
+class TieredInputRepository(InputRepository_Interface):
+    """InputRepository over Parquet (archived years) + `hot` (Postgres repository) for the rest."""
+
+    def __init__(self, hot: InputRepository_Interface, archive: ParquetArchive):
+        self._hot = hot
+        self._archive = archive
+
+    def _segments(self, start: date, end: date) -> list[tuple[bool, date, date]]:
+        return split_by_tier(start, end, self._archive.years(_INPUTS))
+
+    def save_input(self, input_data: list[DailyMetricsInput]) -> Optional[tuple[date, date]]:
+        if not input_data:
+            return None
+
+        archived_years = self._archive.years(_INPUTS)
+        cold = [r for r in input_data if r.date.year in archived_years]
+        hot = [r for r in input_data if r.date.year not in archived_years]
+
+        if cold:
+            self._archive.upsert_rows(_INPUTS, [_input_tuple(r) for r in cold])
+        if hot:
+            self._hot.save_input(hot)
+
+        days = [r.date.date() for r in input_data]
+        return min(days), max(days)
+
+    def get_input(
+        self, start: datetime, end: datetime, columns: Optional[Sequence[str]] = None
+    ) -> list[DailyMetricsInput]:
+        start_day, end_day = _as_date(start), _as_date(end)
+        if start_day > end_day:
+            raise ValueError("Start date must be before end date.")
+
+        names = tuple(ARCHIVE_TABLES[_INPUTS] if columns is None else columns)
+        unknown = [c for c in names if c not in ARCHIVE_TABLES[_INPUTS]]
+        if unknown:
+            raise ValueError(f"Unknown input columns: {unknown}")
+
+        records: list[DailyMetricsInput] = []
+        for archived, s, e in self._segments(start_day, end_day):
+            if archived:
+                records.extend(
+                    DailyMetricsInput(midnight_utc(row[0]), **dict(zip(names, row[1:])))
+                    for row in self._archive.read_rows(_INPUTS, s, e, names)
+                )
+            else:
+                records.extend(self._hot.get_input(s, e, columns=columns))
+        return records
+
+    def iter_input(
+        self, start: Optional[date] = None, end: Optional[date] = None, batch_size: int = 1000
+    ) -> Iterator[DailyMetricsInput]:
+        for archived, s, e in self._segments(start or date.min, end or date.max):
+            if archived:
+                for row in self._archive.read_rows(_INPUTS, s, e):
+                    yield DailyMetricsInput(midnight_utc(row[0]), *row[1:])
+            else:
+                # Open ends stay open for Postgres
+                yield from self._hot.iter_input(
+                    start=s if s != date.min else None, end=e if e != date.max else None, batch_size=batch_size
+                )
+
+    def get_input_series(
+        self, start: date, end: date, columns: Optional[Sequence[str]] = None
+    ) -> MetricsSeries:
+        if start > end:
+            raise ValueError("Start date must be before end date.")
+
+        series = MetricsSeries(columns)
+        for archived, s, e in self._segments(start, end):
+            if archived:
+                series.extend_rows(self._archive.read_rows(_INPUTS, s, e, series.columns))
+            else:
+                series.extend(self._hot.get_input_series(s, e, columns=series.columns))
+        return series
+
+
+class AsyncTieredOutputRepository(AsyncOutputRepository_Interface):
+    """
+    Async twin of TieredOutputRepository for the `async def` endpoints.
+    Parquet reads/writes are blocking file I/O + decoding, so they run on a worker thread.
+    """
+
+    def __init__(self, hot: AsyncOutputRepository_Interface, archive: ParquetArchive):
+        self._hot = hot
+        self._archive = archive
+
+    def _segments(self, start: date, end: date) -> list[tuple[bool, date, date]]:
+        return split_by_tier(start, end, self._archive.years(_KPIS))
+
+    async def save_output(self, output_data: list[DailyKPIsOutput]) -> None:
+        archived_years = await asyncio.to_thread(self._archive.years, _KPIS)
+        cold = [kpi for kpi in output_data if kpi.date.year in archived_years]
+        hot = [kpi for kpi in output_data if kpi.date.year not in archived_years]
+
+        if cold:
+            await asyncio.to_thread(self._archive.upsert_rows, _KPIS, [_kpi_tuple(kpi) for kpi in cold])
+        if hot:
+            await self._hot.save_output(hot)
+
+    async def get_output(self, start: datetime, end: datetime) -> list[DailyKPIsOutput]:
+        rows: list[DailyKPIsOutput] = []
+        for archived, s, e in self._segments(start.date(), end.date()):
+            if archived:
+                rows.extend(await asyncio.to_thread(_read_archived_kpis, self._archive, s, e))
+            else:
+                rows.extend(await self._hot.get_output(midnight_utc(s), midnight_utc(e)))
+        return rows
+
+    async def get_output_series(self, start: date, end: date) -> KPISeries:
+        if start > end:
+            raise ValueError("Start date must be before end date.")
+
+        series = KPISeries()
+        for archived, s, e in self._segments(start, end):
+            if archived:
+                series.extend_rows(await asyncio.to_thread(self._archive.read_rows, _KPIS, s, e, series.columns))
+            else:
+                series.extend(await self._hot.get_output_series(s, e))
+        return series
+
+    async def get_output_page(
+        self, start: date, end: date, after: Optional[date] = None, limit: int = DEFAULT_PAGE_SIZE
+    ) -> list[DailyKPIsOutput]:
+        if after is not None and after >= end:
+            return []  # nothing left (and after + 1 day would overflow for date.max)
+        lower = start if after is None else max(start, after + timedelta(days=1))
+        rows: list[DailyKPIsOutput] = []
+        for archived, s, e in self._segments(lower, end) if lower <= end else []:
+            remaining = limit - len(rows)
+            if remaining <= 0:
+                break
+            if archived:
+                rows.extend((await asyncio.to_thread(_read_archived_kpis, self._archive, s, e))[:remaining])
+            else:
+                rows.extend(await self._hot.get_output_page(s, e, limit=remaining))
+        return rows
+
+    async def iter_output(
+        self, start: date, end: date, batch_size: int = DEFAULT_STREAM_BATCH_SIZE
+    ) -> AsyncIterator[list[DailyKPIsOutput]]:
+        for archived, s, e in self._segments(start, end):
+            if archived:
+                rows = await asyncio.to_thread(_read_archived_kpis, self._archive, s, e)
+                for i in range(0, len(rows), batch_size):
+                    yield rows[i:i + batch_size]
+            else:
+                async for batch in self._hot.iter_output(s, e, batch_size=batch_size):
+                    yield batch
+
+
+def build_output_repository(db_session: Session) -> OutputRepository_Interface:
+    """Postgres KPI repository, behind the Parquet tier when KPI_ARCHIVE_DIR is set."""
+    repo = DI_Postgres_OutputRepository(db_session=db_session)
+    archive = get_parquet_archive()
+    return TieredOutputRepository(repo, archive) if archive is not None else repo
+
+
+def build_input_repository(db_session: Session) -> InputRepository_Interface:
+    """Postgres input repository, behind the Parquet tier when KPI_ARCHIVE_DIR is set."""
+    repo = DI_Postgres_InputRepository(db_session=db_session)
+    archive = get_parquet_archive()
+    return TieredInputRepository(repo, archive) if archive is not None else repo
+
+
+def first_hot_day(archive: ParquetArchive) -> Optional[date]:
+    """First day of daily_inputs still in Postgres: Jan 1st after the last archived year (None if none)."""
+    years = archive.years(_INPUTS)
+    return date(max(years) + 1, 1, 1) if years else None
+
+
+def build_kpi_engine(db_session: Session) -> KPIEngine_Interface:
+    """SQL KPI engine, kept off the days whose lookback was archived when KPI_ARCHIVE_DIR is set."""
+    archive = get_parquet_archive()
+    hot_from = first_hot_day(archive) if archive is not None else None
+    return DI_Postgres_KPIEngine(db_session, hot_from=hot_from)
@@ -0,0 +1,223 @@
+"""
+In-process copy of the whole daily_kpis table, served without a DB round trip.
+
+WHY THIS FILE EXISTS:
+- Daily data is tiny (~365 rows per year): 20 years of KPIs fit in ~0.7 MiB as a KPISeries.
+- Yet every KPI read paid a round trip + row mapping. Here the full history is loaded once
+  (at startup) into a date-sorted KPISeries, and a range query is two binary searches
+  plus bulk array slices: no SQL, no per-row objects (get_output_series).
+- The ingest path applies its own writes to the store right after a successful save_output,
+  so this process never serves its own stale data.
+
+Staleness from OTHER processes (another API worker, a manual SQL fix, a migration):
+- At load the store records the table fingerprint (row count, max computed_at).
+- At most every `check_interval` seconds a read re-checks the fingerprint (one tiny query).
+  On a mismatch the read falls back to Postgres and the store reloads.
+- Cold store (not loaded yet, DB was down at startup, disabled): reads go to Postgres.
+- So with several API workers, a write through another worker can be served stale for up to
+  `check_interval` seconds (KPI_HOT_STORE_CHECK_SECONDS, default 30). Lower it, or set
+  KPI_HOT_STORE=0, where that matters.
+
+On by default (KPI_HOT_STORE=1), and then the only in-process read layer: the range cache
+(kpi_cache.py) is used instead of it when KPI_HOT_STORE=0, never stacked under it.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import threading
+import time
+from datetime import date, datetime, timedelta
+from typing import Any, Callable, Iterator, Optional
+
+from sqlalchemy.orm import Session
+
+from app.domain.entities import DailyKPIsOutput
+from app.domain.interfaces import OutputRepository_Interface
+from app.domain.series import KPISeries
+from app.infrastructure.db.repository_impl import DI_Postgres_OutputRepository
+
+
+logger = logging.getLogger(__name__)
+
+# Seconds between two fingerprint checks against Postgres
+DEFAULT_CHECK_INTERVAL = 30.0
+
+
+class HotSeriesStore:
+    def __init__(
+        self,
+        session_factory: Callable[[], Session],
+        *,
+        check_interval: float = DEFAULT_CHECK_INTERVAL,
+        clock: Callable[[], float] = time.monotonic,
+        repo_factory: Callable[[Session], Any] = DI_Postgres_OutputRepository,
+    ):
+        self._session_factory = session_factory
+        # Builds the repository the history / fingerprint are read from (must have get_output_version)
+        self._repo_factory = repo_factory
+        self._check_interval = check_interval
+        self._clock = clock
+        self._lock = threading.Lock()
+
+        self._series: Optional[KPISeries] = None          # None = cold
+        self._version: Optional[tuple[int, Optional[datetime]]] = None
+        self._checked_at = 0.0
+
+    @property
+    def loaded(self) -> bool:
+        return self._series is not None
+
+    def load(self) -> bool:
+        """(Re)load the full history. Returns False (and stays cold) if the DB can't be read."""
+        try:
+            with self._session_factory() as session:
+                repo = self._repo_factory(session)
+                version = repo.get_output_version()
+                series = repo.get_output_series(date.min, date.max)
+        except Exception:
+            logger.exception("Hot KPI store: load failed, reads fall back to Postgres")
+            self.invalidate()
+            return False
+
+        with self._lock:
+            self._series, self._version, self._checked_at = series, version, self._clock()
+        return True
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._series, self._version = None, None
+
+    def is_fresh(self) -> bool:
+        """True if reads can be served from memory (re-checks the fingerprint every check_interval)."""
+        if self._series is None:
+            return False
+        if self._clock() - self._checked_at < self._check_interval:
+            return True
+
+        try:
+            with self._session_factory() as session:
+                version = self._repo_factory(session).get_output_version()
+        except Exception:
+            logger.exception("Hot KPI store: version check failed")
+            return False
+
+        with self._lock:
+            if version != self._version:
+                self._series, self._version = None, None
+                return False
+            self._checked_at = self._clock()
+        return True
+
+    def get_series(self, start: date, end: date, limit: Optional[int] = None) -> Optional[KPISeries]:
+        """Rows of [start, end] (first `limit` only) as a new KPISeries (bisect + slices), or None if cold."""
+        with self._lock:
+            if self._series is None:
+                return None
+            return self._series.between(start, end, limit=limit)
+
+    def apply(self, kpis: list[DailyKPIsOutput]) -> None:
+        """
+        Apply rows this process just saved. The fingerprint is read again right after,
+        so our own write isn't mistaken for someone else's. (A write from another process
+        landing in that same instant is absorbed too; it shows up at the next reload.)
+        """
+        with self._lock:
+            if self._series is None:
+                return
+            for kpi in kpis:
+                self._series.upsert(kpi)
+
+        try:
+            with self._session_factory() as session:
+                version = self._repo_factory(session).get_output_version()
+        except Exception:
+            logger.exception("Hot KPI store: version refresh failed")
+            self.invalidate()
+            return
+
+        with self._lock:
+            if self._series is not None:
+                self._version, self._checked_at = version, self._clock()
+
+
+class HotSeriesOutputRepository(OutputRepository_Interface):
+    """
+    OutputRepository decorator: range reads from the HotSeriesStore when it is fresh,
+    otherwise from `inner` (and the store is reloaded for the next request).
+    Writes go to `inner`, then to the store.
+    """
+
+    def __init__(self, inner: OutputRepository_Interface, store: HotSeriesStore):
+        self._inner = inner
+        self._store = store
+
+    def _hot_series(self, start: date, end: date) -> Optional[KPISeries]:
+        if self._store.is_fresh():
+            return self._store.get_series(start, end)
+        return None
+
+    def _reload_if_cold(self) -> None:
+        if not self._store.loaded:
+            self._store.load()
+
+    def get_output_series(self, start: date, end: date) -> KPISeries:
+        series = self._hot_series(start, end)
+        if series is not None:
+            return series
+        series = self._inner.get_output_series(start, end)
+        self._reload_if_cold()
+        return series
+
+    def get_output(self, start: datetime, end: datetime) -> list[DailyKPIsOutput]:
+        series = self._hot_series(start.date(), end.date())
+        if series is not None:
+            return series.to_entities()
+        rows = self._inner.get_output(start, end)
+        self._reload_if_cold()
+        return rows
+
+    def get_output_page(
+        self, start: date, end: date, after: Optional[date] = None, limit: int = 100
+    ) -> list[DailyKPIsOutput]:
+        if after is not None and after >= end:
+            return []  # nothing left (and after + 1 day would overflow for date.max)
+        lower = start if after is None else max(start, after + timedelta(days=1))
+        if self._store.is_fresh():
+            series = self._store.get_series(lower, end, limit=limit)
+            if series is not None:
+                return series.to_entities()
+        return self._inner.get_output_page(start, end, after=after, limit=limit)
+
+    def iter_output(self, start: date, end: date, batch_size: int = 1000) -> Iterator[list[DailyKPIsOutput]]:
+        return self._inner.iter_output(start, end, batch_size=batch_size)
+
+    def save_output(self, output_data: list[DailyKPIsOutput]) -> None:
+        self._inner.save_output(output_data)
+        self._store.apply(output_data)
+
+
+_shared_store: Optional[HotSeriesStore] = None
+_shared_store_lock = threading.Lock()
+
+
+def hot_store_enabled() -> bool:
+    """On unless KPI_HOT_STORE=0 (then the range cache of kpi_cache.py serves the reads instead)."""
+    return os.getenv("KPI_HOT_STORE", "1") != "0"
+
+
+def get_hot_series_store() -> HotSeriesStore:
+    """Process-wide store. Check interval from KPI_HOT_STORE_CHECK_SECONDS."""
+    global _shared_store
+    with _shared_store_lock:
+        if _shared_store is None:
+            from app.infrastructure.archive.tiered_repository import build_output_repository
+            from app.infrastructure.db.engine import SessionLocal
+
+            _shared_store = HotSeriesStore(
+                SessionLocal,
+                repo_factory=build_output_repository,  # archived years included when the Parquet tier is on
+                check_interval=float(os.getenv("KPI_HOT_STORE_CHECK_SECONDS", DEFAULT_CHECK_INTERVAL)),
+            )
+        return _shared_store
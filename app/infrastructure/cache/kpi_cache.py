@@ -0,0 +1,235 @@
+"""
+Read-through cache for KPI range reads.
+
+WHY THIS FILE EXISTS:
+- Dashboards ask for overlapping ranges over and over (last 30 days, last 90 days, ...).
+  Without a cache every call goes to Postgres for rows it just read.
+- The cache stores KPI rows BY DAY, so any range can be answered from cached pieces:
+  only the sub-ranges that are not cached yet are read from the DB.
+- Days with no KPI row are cached too (as "known empty"), otherwise gaps in the data
+  would be a miss on every call.
+
+Two pieces:
+- KPIRangeCache: process-wide store (one per API process), LRU-bounded by number of days,
+  thread-safe (sync FastAPI endpoints run in a thread pool), with hit/miss/eviction counters.
+- CachedOutputRepository: OutputRepository_Interface decorator. Reads go through the cache,
+  save_output() invalidates exactly the days it writes.
+
+Limitation: the cache lives in one process. With several API workers, a write through one
+worker doesn't invalidate the others; set KPI_CACHE_MAX_DAYS=0 to disable it there.
+
+Only used when the hot series store is disabled (KPI_HOT_STORE=0, see hot_series.py): a warm
+store answers every range read, so the two layers are never stacked.
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+from collections import OrderedDict
+from dataclasses import replace
+from datetime import date, datetime, timedelta
+from typing import Iterable, Iterator, Optional
+
+from app.domain.entities import DailyKPIsOutput
+from app.domain.interfaces import OutputRepository_Interface
+from app.domain.series import KPISeries
+from app.infrastructure.db.rows import midnight_utc
+
+
+# Default bound: ~55 years of days. One entry is one DailyKPIsOutput (~0.5 KiB with its values),
+# so the cache stays well under 10 MiB.
+DEFAULT_CACHE_MAX_DAYS = 20_000
+
+_ONE_DAY = timedelta(days=1)
+
+
+def _each_day(start: date, end: date) -> Iterator[date]:
+    """Days of [start, end] by ordinal (a `day += 1 day` loop overflows past date.max)."""
+    return map(date.fromordinal, range(start.toordinal(), end.toordinal() + 1))
+
+
+class KPIRangeCache:
+    def __init__(self, max_days: int = DEFAULT_CACHE_MAX_DAYS):
+        self.max_days = max_days
+        # day -> KPI row, or None when the DB has no row for that day. Order = LRU order.
+        self._days: OrderedDict[date, Optional[DailyKPIsOutput]] = OrderedDict()
+        self._lock = threading.Lock()
+
+        # Bumped by every invalidation: a DB read that started before a write
+        # must not put its (now stale) rows in the cache
+        self._version = 0
+
+        self.hits = 0           # days answered from the cache
+        self.misses = 0         # days that had to be read from the DB
+        self.evictions = 0      # days dropped by the LRU bound
+        self.invalidations = 0  # days dropped because they were written
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_days > 0
+
+    @property
+    def version(self) -> int:
+        return self._version
+
+    def missing_ranges(self, start: date, end: date) -> list[tuple[date, date]]:
+        """Maximal runs of days in [start, end] that are not cached, in date order."""
+        missing: list[tuple[date, date]] = []
+        run_start: Optional[date] = None
+
+        with self._lock:
+            for day in _each_day(start, end):
+                if day in self._days:
+                    if run_start is not None:
+                        missing.append((run_start, day - _ONE_DAY))
+                        run_start = None
+                elif run_start is None:
+                    run_start = day
+
+        if run_start is not None:
+            missing.append((run_start, end))
+        return missing
+
+    def put_range(self, start: date, end: date, rows: Iterable[DailyKPIsOutput], *, version: int) -> None:
+        """
+        Record what the DB returned for [start, end]: the rows, and every other day as empty.
+        Skipped if something was invalidated since `version` was read.
+        """
+        by_day = {row.date.date(): row for row in rows}
+
+        with self._lock:
+            if version != self._version:
+                return
+
+            for day in _each_day(start, end):
+                self._days[day] = by_day.get(day)
+                self._days.move_to_end(day)
+
+            while len(self._days) > self.max_days:
+                self._days.popitem(last=False)
+                self.evictions += 1
+
+    def get_range(self, start: date, end: date, *, misses: int = 0) -> Optional[list[DailyKPIsOutput]]:
+        """
+        Rows of [start, end] if every day is cached (copies, callers may mutate them), else None.
+        `misses`: how many of these days were just read from the DB (the rest count as hits).
+        """
+        rows: list[DailyKPIsOutput] = []
+
+        with self._lock:
+            days = list(_each_day(start, end))
+            if not all(day in self._days for day in days):
+                return None
+
+            for day in days:
+                self._days.move_to_end(day)
+                row = self._days[day]
+                if row is not None:
+                    rows.append(row)
+            self.hits += (end - start).days + 1 - misses
+            self.misses += misses
+
+        return [replace(row) for row in rows]
+
+    def invalidate(self, days: Iterable[date]) -> None:
+        with self._lock:
+            self._version += 1
+            for day in days:
+                if self._days.pop(day, _MISSING) is not _MISSING:
+                    self.invalidations += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._version += 1
+            self._days.clear()
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {
+                "cached_days": len(self._days),
+                "max_days": self.max_days,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+            }
+
+
+_MISSING = object()
+
+
+class CachedOutputRepository(OutputRepository_Interface):
+    """
+    Wraps another OutputRepository (normally DI_Postgres_OutputRepository).
+    - get_output: answered from the cache; only the missing sub-ranges hit the DB.
+      Ranges longer than the cache (max_days) go straight to the DB: caching them would
+      walk every calendar day under the lock and evict everything else.
+    - save_output: delegated, then the written days are invalidated
+    - series / streaming / paged reads: delegated as they are (series and streams exist
+      for huge ranges, which would only flush the cache; pages are small keyset reads)
+    """
+
+    def __init__(self, inner: OutputRepository_Interface, cache: KPIRangeCache):
+        self._inner = inner
+        self._cache = cache
+
+    def save_output(self, output_data: list[DailyKPIsOutput]) -> None:
+        try:
+            self._inner.save_output(output_data)
+        finally:
+            # Even if the write failed half-way, the cached copies of these days can't be trusted
+            self._cache.invalidate({kpi.date.date() for kpi in output_data})
+
+    def get_output(self, start: datetime, end: datetime) -> list[DailyKPIsOutput]:
+        if not self._cache.enabled:
+            return self._inner.get_output(start, end)
+
+        start_day, end_day = start.date(), end.date()
+        if start_day > end_day:
+            return []
+        if (end_day - start_day).days + 1 > self._cache.max_days:
+            return self._inner.get_output(start, end)
+
+        # Read the version BEFORE going to the DB (see KPIRangeCache._version)
+        version = self._cache.version
+        missed = 0
+        for lo, hi in self._cache.missing_ranges(start_day, end_day):
+            rows = self._inner.get_output(midnight_utc(lo), midnight_utc(hi))
+            self._cache.put_range(lo, hi, rows, version=version)
+            missed += (hi - lo).days + 1
+
+        rows = self._cache.get_range(start_day, end_day, misses=missed)
+        if rows is None:
+            # Evicted or invalidated while we were filling it (range bigger than the cache,
+            # or a concurrent write): just read the DB
+            return self._inner.get_output(start, end)
+        return rows
+
+    def get_output_series(self, start: date, end: date) -> KPISeries:
+        return self._inner.get_output_series(start, end)
+
+    def get_output_page(
+        self, start: date, end: date, after: Optional[date] = None, limit: int = 100
+    ) -> list[DailyKPIsOutput]:
+        return self._inner.get_output_page(start, end, after=after, limit=limit)
+
+    def iter_output(self, start: date, end: date, batch_size: int = 1000) -> Iterator[list[DailyKPIsOutput]]:
+        return self._inner.iter_output(start, end, batch_size=batch_size)
+
+
+
+_shared_cache: Optional[KPIRangeCache] = None
+_shared_cache_lock = threading.Lock()
+
+
+def get_kpi_cache() -> KPIRangeCache:
+    """
+    The process-wide cache shared by every request.
+    Size from KPI_CACHE_MAX_DAYS (0 disables caching).
+    """
+    global _shared_cache
+    with _shared_cache_lock:
+        if _shared_cache is None:
+            _shared_cache = KPIRangeCache(int(os.getenv("KPI_CACHE_MAX_DAYS", DEFAULT_CACHE_MAX_DAYS)))
+        return _shared_cache
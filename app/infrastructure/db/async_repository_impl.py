@@ -0,0 +1,96 @@
+from __future__ import annotations
+
+from datetime import date, datetime
+from typing import AsyncIterator, Optional, Sequence
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.domain.entities import DailyKPIsOutput, DailyMetricsInput
+from app.domain.interfaces import AsyncInputRepository_Interface, AsyncOutputRepository_Interface
+from app.domain.series import KPISeries, MetricsSeries
+from app.infrastructure.db.models import DailyKPIORM
+from app.infrastructure.db.repository_impl import (
+    DEFAULT_PAGE_SIZE,
+    DEFAULT_STREAM_BATCH_SIZE,
+    DI_Postgres_InputRepository,
+    DI_Postgres_OutputRepository,
+)
+from app.infrastructure.db.rows import KPI_ROW_FIELDS, midnight_utc, select_range
+
+
+"""
+Async repository implementations (Infrastructure layer), on SQLAlchemy AsyncSession
+(psycopg 3 in async mode on Postgres).
+
+Key idea:
+- Most methods run the SYNC repository code through AsyncSession.run_sync():
+  SQLAlchemy hands it a regular Session bound to the async connection, and every DB wait
+  inside it is awaited on the event loop (greenlet bridge). So:
+    * the SQL (bulk upserts, Core reads, keyset pages) exists once, in repository_impl.py
+    * the event loop is never blocked by the DB, which is the whole point
+- iter_output is native async (AsyncSession.stream): a server-side cursor read batch by
+  batch with `async for`, so a long stream holds no thread.
+- The COPY loader of save_input is psycopg-sync only; under the async driver big imports
+  use the same staging table filled with executemany (see load_input_staged).
+"""
+
+
+class DI_AsyncPostgres_OutputRepository(AsyncOutputRepository_Interface):
+    def __init__(self, db_session: AsyncSession):
+        self._db = db_session
+
+    async def save_output(self, output_data: list[DailyKPIsOutput]) -> None:
+        await self._db.run_sync(lambda session: DI_Postgres_OutputRepository(session).save_output(output_data))
+
+    async def get_output(self, start: datetime, end: datetime) -> list[DailyKPIsOutput]:
+        return await self._db.run_sync(lambda session: DI_Postgres_OutputRepository(session).get_output(start, end))
+
+    async def get_output_series(self, start: date, end: date) -> KPISeries:
+        return await self._db.run_sync(
+            lambda session: DI_Postgres_OutputRepository(session).get_output_series(start, end)
+        )
+
+    async def get_output_page(
+        self, start: date, end: date, after: Optional[date] = None, limit: int = DEFAULT_PAGE_SIZE
+    ) -> list[DailyKPIsOutput]:
+        return await self._db.run_sync(
+            lambda session: DI_Postgres_OutputRepository(session).get_output_page(start, end, after=after, limit=limit)
+        )
+
+    async def iter_output(
+        self, start: date, end: date, batch_size: int = DEFAULT_STREAM_BATCH_SIZE
+    ) -> AsyncIterator[list[DailyKPIsOutput]]:
+        """Async twin of DI_Postgres_OutputRepository.iter_output (same batches, same order)."""
+        if start > end:
+            raise ValueError("Start date must be before end date.")
+
+        stmt = select_range(DailyKPIORM.__table__, KPI_ROW_FIELDS, start, end).execution_options(yield_per=batch_size)
+        result = await self._db.stream(stmt)
+        try:
+            async for rows in result.partitions():
+                yield [DailyKPIsOutput(midnight_utc(row[0]), *row[1:]) for row in rows]
+        finally:
+            # Releases the server-side cursor even if the client disconnects mid-stream
+            await result.close()
+
+
+class DI_AsyncPostgres_InputRepository(AsyncInputRepository_Interface):
+    def __init__(self, db_session: AsyncSession):
+        self._db = db_session
+
+    async def save_input(self, input_data: list[DailyMetricsInput]) -> Optional[tuple[date, date]]:
+        return await self._db.run_sync(lambda session: DI_Postgres_InputRepository(session).save_input(input_data))
+
+    async def get_input(
+        self, start: datetime, end: datetime, columns: Optional[Sequence[str]] = None
+    ) -> list[DailyMetricsInput]:
+        return await self._db.run_sync(
+            lambda session: DI_Postgres_InputRepository(session).get_input(start, end, columns=columns)
+        )
+
+    async def get_input_series(
+        self, start: date, end: date, columns: Optional[Sequence[str]] = None
+    ) -> MetricsSeries:
+        return await self._db.run_sync(
+            lambda session: DI_Postgres_InputRepository(session).get_input_series(start, end, columns=columns)
+        )
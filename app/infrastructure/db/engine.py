@@ -12,9 +12,20 @@ This file must live in Infrastructure because:
 
 import os
 
+from typing import AsyncIterator, Optional
+
 from sqlalchemy import create_engine
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
 
+from app.infrastructure.db.pool_metrics import (
+    InstrumentedAsyncAdaptedQueuePool,
+    InstrumentedQueuePool,
+    instrument_engine,
+)
+from app.infrastructure.db.session_router import DEFAULT_READ_YOUR_WRITES_SECONDS, SessionRouter
+
 from dotenv import load_dotenv
 load_dotenv()
 
@@ -48,12 +59,74 @@ def _build_database_url() -> str:
 
 DATABASE_URL: str = get_database_url()
 
+def _env_int(name: str, default: int) -> int:
+    value = os.getenv(name)
+    return default if value is None or value.strip() == "" else int(value)
+
+
+def _env_float(name: str, default: float) -> float:
+    # Same rule as _env_int: "NAME=" (e.g. copied from .env.example) means "use the default"
+    value = os.getenv(name)
+    return default if value is None or value.strip() == "" else float(value)
+
+
+def pool_settings_from_env() -> dict:
+    """
+    Pool sizing from the environment (defaults = SQLAlchemy's, except recycle):
+    - DB_POOL_SIZE (5):            connections kept open
+    - DB_MAX_OVERFLOW (10):        extra connections allowed during bursts
+    - DB_POOL_TIMEOUT (30):        seconds a request waits for a connection before failing
+    - DB_POOL_RECYCLE (1800):      seconds before a connection is replaced (-1 = never);
+                                   avoids connections silently dropped by proxies / the server
+    - DB_STATEMENT_TIMEOUT_MS (0): Postgres statement_timeout set on every connection (0 = none),
+                                   so one runaway query can't hold a pool connection forever
+
+    Watch GET /api/metrics/pool (waits, timeouts, wait_ms) before changing them.
+    """
+    return {
+        "pool_size": _env_int("DB_POOL_SIZE", 5),
+        "max_overflow": _env_int("DB_MAX_OVERFLOW", 10),
+        "pool_timeout": _env_int("DB_POOL_TIMEOUT", 30),
+        "pool_recycle": _env_int("DB_POOL_RECYCLE", 1800),
+        "statement_timeout_ms": _env_int("DB_STATEMENT_TIMEOUT_MS", 0),
+    }
+
+
+def engine_options(url: str, *, is_async: bool = False) -> dict:
+    """
+    create_engine / create_async_engine keyword arguments for `url`.
+    SQLite (tests, local scripts) keeps SQLAlchemy's own pool: the settings above are server pool settings.
+    """
+    options: dict = {
+        "echo": False,          # set True only while debugging SQL output
+        "pool_pre_ping": True,  # avoids stale connections in long-running apps
+    }
+    if make_url(url).get_backend_name() == "sqlite":
+        return options
+
+    settings = pool_settings_from_env()
+    options.update(
+        poolclass=InstrumentedAsyncAdaptedQueuePool if is_async else InstrumentedQueuePool,
+        pool_size=settings["pool_size"],
+        max_overflow=settings["max_overflow"],
+        pool_timeout=settings["pool_timeout"],
+        pool_recycle=settings["pool_recycle"],
+    )
+    if settings["statement_timeout_ms"] > 0:
+        # libpq startup option: applied by the server to every session of this connection
+        options["connect_args"] = {"options": f"-c statement_timeout={settings['statement_timeout_ms']}"}
+    return options
+
+
+def _instrument(engine: Engine) -> Engine:
+    # Pool events -> PoolMetrics (only for the Instrumented* pools, i.e. not SQLite)
+    if hasattr(engine.pool, "metrics"):
+        instrument_engine(engine)
+    return engine
+
+
 # Long-lived engine (connection pool manager)
-engine = create_engine(
-    DATABASE_URL,
-    echo=False,        # set True only while debugging SQL output
-    pool_pre_ping=True # avoids stale connections in long-running apps
-)
+engine = _instrument(create_engine(DATABASE_URL, **engine_options(DATABASE_URL)))
 
 # Session factory (create short-lived sessions)
 SessionLocal = sessionmaker(
@@ -78,3 +151,120 @@ def get_db_session():
     finally:
         db.close()
 
+
+# Optional read replica (READ_DATABASE_URL): read-only endpoints take their sessions from it,
+# writes stay on the primary. See session_router.py for the read-your-writes window.
+READ_DATABASE_URL: Optional[str] = os.getenv("READ_DATABASE_URL") or None
+
+read_engine: Optional[Engine] = (
+    _instrument(create_engine(READ_DATABASE_URL, **engine_options(READ_DATABASE_URL))) if READ_DATABASE_URL else None
+)
+
+ReadSessionLocal: Optional[sessionmaker] = (
+    sessionmaker(bind=read_engine, autoflush=False, autocommit=False) if read_engine is not None else None
+)
+
+session_router: SessionRouter[sessionmaker] = SessionRouter(
+    SessionLocal,
+    ReadSessionLocal,
+    read_your_writes_seconds=_env_float("READ_YOUR_WRITES_SECONDS", DEFAULT_READ_YOUR_WRITES_SECONDS),
+)
+
+
+def get_read_db_session():
+    """
+    Same as get_db_session, for read-only endpoints: the session comes from the replica
+    (if configured and no write happened in the read-your-writes window), else from the primary.
+    """
+    db = session_router.read_factory()()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+
+# ---------------------------------------------------------------------------
+# Async stack (AsyncEngine / AsyncSession)
+#
+# Why a second engine?
+# - An `async def` endpoint must never wait on a sync DB driver: the wait blocks the event loop
+#   and every other request on the worker stalls with it.
+# - postgresql+psycopg is also psycopg 3's async driver, so the same DATABASE_URL works here.
+# - Created lazily: importing this module (tests, scripts, alembic) must not require an async
+#   driver, and the sync engine above stays the default for everything else.
+# ---------------------------------------------------------------------------
+
+_async_engine: Optional[AsyncEngine] = None
+_async_session_factory: Optional[async_sessionmaker[AsyncSession]] = None
+
+
+def get_async_engine() -> AsyncEngine:
+    global _async_engine
+    if _async_engine is None:
+        _async_engine = create_async_engine(DATABASE_URL, **engine_options(DATABASE_URL, is_async=True))
+        _instrument(_async_engine.sync_engine)
+    return _async_engine
+
+
+def get_async_session_factory() -> async_sessionmaker[AsyncSession]:
+    global _async_session_factory
+    if _async_session_factory is None:
+        # expire_on_commit=False: entities are copied out of rows anyway, and expiring would
+        # trigger implicit (sync-style) refreshes that AsyncSession can't do
+        _async_session_factory = async_sessionmaker(
+            bind=get_async_engine(), autoflush=False, expire_on_commit=False
+        )
+    return _async_session_factory
+
+
+async def get_async_db_session() -> AsyncIterator[AsyncSession]:
+    """Async twin of get_db_session, for `async def` endpoints (Depends(get_async_db_session))."""
+    async with get_async_session_factory()() as session:
+        yield session
+
+
+_async_read_engine: Optional[AsyncEngine] = None
+_async_read_session_factory: Optional[async_sessionmaker[AsyncSession]] = None
+
+
+def get_async_read_session_factory() -> Optional[async_sessionmaker[AsyncSession]]:
+    """Async sessions on the read replica, or None without READ_DATABASE_URL."""
+    global _async_read_engine, _async_read_session_factory
+    if READ_DATABASE_URL is None:
+        return None
+    if _async_read_session_factory is None:
+        _async_read_engine = create_async_engine(READ_DATABASE_URL, **engine_options(READ_DATABASE_URL, is_async=True))
+        _instrument(_async_read_engine.sync_engine)
+        _async_read_session_factory = async_sessionmaker(
+            bind=_async_read_engine, autoflush=False, expire_on_commit=False
+        )
+    return _async_read_session_factory
+
+
+async def get_async_read_db_session() -> AsyncIterator[AsyncSession]:
+    """Async twin of get_read_db_session (same router decision: replica unless a recent write)."""
+    read_factory = get_async_read_session_factory()
+    factory = get_async_session_factory() if read_factory is None or session_router.reads_use_primary() else read_factory
+    async with factory() as session:
+        yield session
+
+
+def async_engine_if_created() -> Optional[AsyncEngine]:
+    """The async engine, or None if nothing has used it yet (monitoring must not create it)."""
+    return _async_engine
+
+
+def async_read_engine_if_created() -> Optional[AsyncEngine]:
+    return _async_read_engine
+
+
+async def dispose_async_engine() -> None:
+    """Close the async pools (app shutdown). No-op for the ones never used."""
+    global _async_engine, _async_session_factory, _async_read_engine, _async_read_session_factory
+    if _async_engine is not None:
+        await _async_engine.dispose()
+        _async_engine, _async_session_factory = None, None
+    if _async_read_engine is not None:
+        await _async_read_engine.dispose()
+        _async_read_engine, _async_read_session_factory = None, None
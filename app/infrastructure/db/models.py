@@ -11,12 +11,14 @@ from __future__ import annotations
 from datetime import date
 from typing import Optional
 
-from sqlalchemy import Date, Integer, Float, String, UniqueConstraint
+from sqlalchemy import Column, Date, Integer, Float, JSON, String, Table, UniqueConstraint
 from sqlalchemy import DateTime, func
 from sqlalchemy.orm import Mapped, mapped_column
 
 from datetime import datetime
 
+from app.business.range_stats import CUMULATIVE_COLUMNS
+from app.business.rollups import ROLLUP_COLUMNS
 from app.infrastructure.db.base import Base
 
 #nullable=True means that the column can be left empty (NULL) in the DB
@@ -51,8 +53,17 @@ class DailyKPIORM(Base):
         nullable=False,
     )
 
+    # On Postgres the table is partitioned by year and this unique index covers the KPI columns,
+    # so range reads are index-only (migration d4e8f2a1c6b9, partitions.py). Callers are unaffected.
     __table_args__ = (
-        UniqueConstraint("date", name="uq_daily_kpis_date"),
+        UniqueConstraint(
+            "date",
+            name="uq_daily_kpis_date",
+            postgresql_include=[
+                "kcal_out_total", "balance_kcal", "balance_7d_average", "protein_per_kg",
+                "healthy_food_pct", "adherence_steps", "weight_7d_avg", "waist_change_7d",
+            ],
+        ),
     )   
 
 
@@ -78,6 +89,74 @@ class DailyInputORM(Base):
 
     source: Mapped[Optional[str]] = mapped_column(String(50), nullable=True)
 
+    # Partitioned by year + covering unique index on Postgres too (see DailyKPIORM)
     __table_args__ = (
-        UniqueConstraint("date", name="uq_daily_inputs_date"),
+        UniqueConstraint(
+            "date",
+            name="uq_daily_inputs_date",
+            postgresql_include=[
+                "steps_n", "proteins_g", "kcal_in", "kcal_junk_in", "kcal_out_training",
+                "sleep_hours", "stress_rel", "weight_kg", "waist_cm",
+            ],
+        ),
     )
+
+
+class KPICheckpointORM(Base):
+    """
+    Single-row table (id = 1) holding the rolling-window state of the latest computed day.
+    Lets a next-day upload compute its KPIs without reading any input history.
+    """
+    __tablename__ = "kpi_checkpoints"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    date: Mapped[date] = mapped_column(Date, nullable=False)
+    state: Mapped[dict] = mapped_column(JSON, nullable=False)
+
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        server_default=func.now(),
+        nullable=False,
+    )
+
+
+# Prefix sums for O(1) range statistics (app/business/range_stats.py): one row per calendar day
+# from the first to the last input day, with <column>_sum and <column>_n (non-null count) of every
+# input and KPI column up to that day. Declared as a Core Table because its columns are generated
+# from CUMULATIVE_COLUMNS; the primary key on date doubles as the ON CONFLICT (date) target.
+daily_cumulative = Table(
+    "daily_cumulative",
+    Base.metadata,
+    Column("date", Date, primary_key=True),
+    Column("input_days", Integer, nullable=False),
+    *[
+        column
+        for name in CUMULATIVE_COLUMNS
+        for column in (Column(f"{name}_sum", Float, nullable=False), Column(f"{name}_n", Integer, nullable=False))
+    ],
+)
+
+
+# Weekly / monthly KPI rollups (app/business/rollups.py) behind /api/kpis/rollup: one row per
+# (granularity, period_start) with <kpi>_mean / _min / _max / _n of every persisted KPI.
+# Core Table for the same reason as daily_cumulative (columns generated from ROLLUP_COLUMNS);
+# the composite primary key is the ON CONFLICT target and serves the range reads.
+kpi_rollups = Table(
+    "kpi_rollups",
+    Base.metadata,
+    Column("granularity", String(8), primary_key=True),
+    Column("period_start", Date, primary_key=True),
+    Column("period_end", Date, nullable=False),
+    Column("days", Integer, nullable=False),
+    Column("adherence_ratio", Float, nullable=True),
+    *[
+        column
+        for name in ROLLUP_COLUMNS
+        for column in (
+            Column(f"{name}_mean", Float, nullable=True),
+            Column(f"{name}_min", Float, nullable=True),
+            Column(f"{name}_max", Float, nullable=True),
+            Column(f"{name}_n", Integer, nullable=False),
+        )
+    ],
+)
@@ -0,0 +1,144 @@
+"""
+Yearly partitions of daily_inputs / daily_kpis (PostgreSQL declarative partitioning).
+
+WHY THIS FILE EXISTS:
+- Since migration d4e8f2a1c6b9 both tables are PARTITION BY RANGE (date), one partition per
+  calendar year (<table>_y2026 holds 2026-01-01 .. 2026-12-31) plus a DEFAULT partition.
+- A row whose year has no partition lands in the DEFAULT partition: inserts never fail,
+  but those rows lose partition pruning. So partitions are created AHEAD of time:
+    * at API startup (lifespan), for the current year + `years_ahead`
+    * or from cron / a deploy step:  python -m app.infrastructure.db.partitions --years-ahead 2
+- Creating a partition for a year that already has rows in DEFAULT would fail, so those
+  rows are moved first (same transaction): create table -> move rows -> ATTACH PARTITION.
+
+Anything that is not PostgreSQL, or a table that is not partitioned (before the migration),
+is left alone: ensure_partitions() is then a no-op.
+"""
+
+from __future__ import annotations
+
+import argparse
+import logging
+from datetime import date
+from typing import Optional
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection, Engine
+
+
+logger = logging.getLogger(__name__)
+
+PARTITIONED_TABLES = ("daily_inputs", "daily_kpis")
+
+# Years created after the current one
+DEFAULT_YEARS_AHEAD = 2
+
+
+def partition_name(table: str, year: int) -> str:
+    return f"{table}_y{year}"
+
+
+def default_partition_name(table: str) -> str:
+    return f"{table}_default"
+
+
+def partition_bounds(year: int) -> tuple[str, str]:
+    """FROM (inclusive) / TO (exclusive) bounds of one yearly partition."""
+    return date(year, 1, 1).isoformat(), date(year + 1, 1, 1).isoformat()
+
+
+def create_partition_sql(table: str, year: int) -> list[str]:
+    """
+    Statements creating `table`'s partition for `year` (the caller checked it doesn't exist).
+    Rows of that year sitting in the DEFAULT partition are moved into it before it is attached.
+    """
+    name, default = partition_name(table, year), default_partition_name(table)
+    start, end = partition_bounds(year)
+    return [
+        f"CREATE TABLE {name} (LIKE {table} INCLUDING DEFAULTS)",
+        f"WITH moved AS (DELETE FROM {default} WHERE date >= '{start}' AND date < '{end}' RETURNING *) "
+        f"INSERT INTO {name} SELECT * FROM moved",
+        f"ALTER TABLE {table} ATTACH PARTITION {name} FOR VALUES FROM ('{start}') TO ('{end}')",
+    ]
+
+
+def _is_partitioned(conn: Connection, table: str) -> bool:
+    return bool(
+        conn.execute(
+            text("SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass(:table)"), {"table": table}
+        ).first()
+    )
+
+
+def _existing_partitions(conn: Connection, table: str) -> set[str]:
+    rows = conn.execute(
+        text("SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid WHERE i.inhparent = to_regclass(:table)"),
+        {"table": table},
+    )
+    return {row[0] for row in rows}
+
+
+def ensure_partitions(
+    conn: Connection, *, first_year: Optional[int] = None, years_ahead: int = DEFAULT_YEARS_AHEAD, today: Optional[date] = None
+) -> list[str]:
+    """
+    Create the missing yearly partitions from `first_year` (default: this year) to this year + `years_ahead`,
+    for every partitioned table. Returns the names of the partitions created. Does not commit.
+    """
+    if conn.dialect.name != "postgresql":
+        return []
+
+    this_year = (today or date.today()).year
+    years = range(first_year if first_year is not None else this_year, this_year + years_ahead + 1)
+
+    created: list[str] = []
+    for table in PARTITIONED_TABLES:
+        if not _is_partitioned(conn, table):
+            continue
+        existing = _existing_partitions(conn, table)
+        for year in years:
+            if partition_name(table, year) in existing:
+                continue
+            for statement in create_partition_sql(table, year):
+                conn.execute(text(statement))
+            created.append(partition_name(table, year))
+    return created
+
+
+def drop_year_partition(conn: Connection, table: str, year: int) -> bool:
+    """
+    Drop `table`'s partition for `year` (its rows and indexes go at once, no VACUUM needed).
+    Used once a year is archived to Parquet. Returns False when there is no such partition
+    (not PostgreSQL, table not partitioned, or that year was never created). Does not commit.
+    """
+    if conn.dialect.name != "postgresql" or not _is_partitioned(conn, table):
+        return False
+    name = partition_name(table, year)
+    if name not in _existing_partitions(conn, table):
+        return False
+    conn.execute(text(f"DROP TABLE {name}"))
+    return True
+
+
+def ensure_future_partitions(engine: Engine, years_ahead: int = DEFAULT_YEARS_AHEAD) -> list[str]:
+    """ensure_partitions() in its own transaction (startup / cron entry point)."""
+    with engine.begin() as conn:
+        created = ensure_partitions(conn, years_ahead=years_ahead)
+    if created:
+        logger.info("Created partitions: %s", ", ".join(created))
+    return created
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Create the yearly partitions of the daily tables ahead of time.")
+    parser.add_argument("--years-ahead", type=int, default=DEFAULT_YEARS_AHEAD)
+    args = parser.parse_args(argv)
+
+    from app.infrastructure.db.engine import engine
+
+    created = ensure_future_partitions(engine, years_ahead=args.years_ahead)
+    print("created: " + (", ".join(created) if created else "nothing (all partitions exist)"))
+
+
+if __name__ == "__main__":
+    main()
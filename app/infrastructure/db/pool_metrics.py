@@ -0,0 +1,156 @@
+"""
+Connection pool instrumentation.
+
+WHY THIS FILE EXISTS:
+- Under bursts, requests queue for a pool connection and eventually fail with
+  "QueuePool limit of size X overflow Y reached". Nothing told us how close we were.
+- Here every engine pool records:
+    * checkout latency: time to get a usable connection (queue wait + connect + pre-ping)
+    * waits: checkouts that found the pool exhausted and had to queue, with their wait time
+    * timeouts: checkouts that gave up (pool_timeout)
+    * connects / checkouts / checkins / invalidations: SQLAlchemy pool events
+    * in use / overflow / idle: live gauges read from the pool at snapshot time
+- GET /api/metrics/pool returns the snapshot, so pool_size / max_overflow can be sized
+  from data (see DB_POOL_* in engine.py).
+
+Latency percentiles are computed over the last `samples` checkouts (a bounded deque),
+so memory stays constant.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from collections import deque
+from typing import Any
+
+from sqlalchemy import event, exc
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, Pool, QueuePool
+
+
+DEFAULT_LATENCY_SAMPLES = 1000
+
+
+class PoolMetrics:
+    def __init__(self, samples: int = DEFAULT_LATENCY_SAMPLES):
+        self._lock = threading.Lock()
+        self._checkout_ms: deque[float] = deque(maxlen=samples)
+        self._wait_ms: deque[float] = deque(maxlen=samples)
+
+        self.connects = 0       # new DBAPI connections opened
+        self.checkouts = 0      # connections handed to the app
+        self.checkins = 0       # connections returned to the pool
+        self.invalidations = 0  # connections thrown away (errors, failed pre-ping)
+        self.waits = 0          # checkouts that found the pool exhausted
+        self.timeouts = 0       # checkouts that failed after pool_timeout
+
+    def count(self, name: str) -> None:
+        with self._lock:
+            setattr(self, name, getattr(self, name) + 1)
+
+    def record_checkout(self, seconds: float, *, waited: bool, timed_out: bool = False) -> None:
+        ms = seconds * 1000
+        with self._lock:
+            if waited:
+                self.waits += 1
+                self._wait_ms.append(ms)
+            if timed_out:
+                self.timeouts += 1
+            else:
+                self._checkout_ms.append(ms)
+
+    def snapshot(self, pool: Pool) -> dict[str, Any]:
+        with self._lock:
+            checkout_ms = sorted(self._checkout_ms)
+            wait_ms = sorted(self._wait_ms)
+            counters = {
+                "connects": self.connects,
+                "checkouts": self.checkouts,
+                "checkins": self.checkins,
+                "invalidations": self.invalidations,
+                "waits": self.waits,
+                "timeouts": self.timeouts,
+            }
+
+        gauges: dict[str, Any] = {"pool_class": type(pool).__name__}
+        if isinstance(pool, QueuePool):
+            gauges.update(
+                size=pool.size(),
+                max_overflow=pool._max_overflow,
+                timeout_s=pool.timeout(),
+                in_use=pool.checkedout(),
+                idle=pool.checkedin(),
+                # QueuePool counts overflow from -pool_size; only the part above the pool size matters
+                overflow_in_use=max(pool.overflow(), 0),
+            )
+
+        return {
+            **gauges,
+            **counters,
+            "checkout_ms": _latency_summary(checkout_ms),
+            "wait_ms": _latency_summary(wait_ms),
+        }
+
+
+def _latency_summary(sorted_ms: list[float]) -> dict[str, float]:
+    if not sorted_ms:
+        return {"samples": 0, "p50": 0.0, "p95": 0.0, "p99": 0.0, "max": 0.0}
+
+    def pct(p: float) -> float:
+        return round(sorted_ms[min(len(sorted_ms) - 1, int(len(sorted_ms) * p))], 3)
+
+    return {"samples": len(sorted_ms), "p50": pct(0.50), "p95": pct(0.95), "p99": pct(0.99), "max": round(sorted_ms[-1], 3)}
+
+
+class _InstrumentedPoolMixin:
+    """
+    Times pool.connect() (the whole checkout). A checkout "waited" when it started with every
+    connection of the pool (size + overflow) already in use.
+    """
+
+    metrics: PoolMetrics
+
+    def __init__(self, *args: Any, **kwargs: Any):
+        super().__init__(*args, **kwargs)
+        self.metrics = PoolMetrics()
+
+    def recreate(self):
+        # engine.dispose() swaps in a new pool: keep counting in the same PoolMetrics
+        pool = super().recreate()
+        pool.metrics = self.metrics
+        return pool
+
+    def connect(self):
+        exhausted = self._max_overflow > -1 and self.checkedout() >= self.size() + self._max_overflow
+        t0 = time.perf_counter()
+        try:
+            connection = super().connect()
+        except exc.TimeoutError:
+            self.metrics.record_checkout(time.perf_counter() - t0, waited=exhausted, timed_out=True)
+            raise
+        self.metrics.record_checkout(time.perf_counter() - t0, waited=exhausted)
+        return connection
+
+
+class InstrumentedQueuePool(_InstrumentedPoolMixin, QueuePool):
+    """QueuePool (the default for sync engines) with PoolMetrics."""
+
+
+class InstrumentedAsyncAdaptedQueuePool(_InstrumentedPoolMixin, AsyncAdaptedQueuePool):
+    """AsyncAdaptedQueuePool (the default for async engines) with PoolMetrics."""
+
+
+def instrument_engine(engine: Engine) -> PoolMetrics:
+    """
+    Count pool events of `engine` (sync Engine, or AsyncEngine.sync_engine) into its pool's
+    PoolMetrics. The engine must use one of the Instrumented* pool classes.
+    Listeners are registered on the engine, so they survive pool recreation.
+    """
+    metrics = engine.pool.metrics
+
+    event.listen(engine, "connect", lambda *args: metrics.count("connects"))
+    event.listen(engine, "checkout", lambda *args: metrics.count("checkouts"))
+    event.listen(engine, "checkin", lambda *args: metrics.count("checkins"))
+    event.listen(engine, "invalidate", lambda *args: metrics.count("invalidations"))
+    return metrics
@@ -1,10 +1,16 @@
 from __future__ import annotations
-from app.domain.interfaces import OutputRepository_Interface, InputRepository_Interface
-from app.domain.entities import DailyKPIsOutput, DailyMetricsInput
-from app.infrastructure.db.models import DailyKPIORM, DailyInputORM
-
-from datetime import datetime, timezone, time
-from sqlalchemy import select
+from app.business.range_stats import CUMULATIVE_COLUMNS
+from app.business.rollups import ROLLUP_COLUMNS
+from app.domain.interfaces import OutputRepository_Interface, InputRepository_Interface, CheckpointRepository_Interface, CumulativeRepository_Interface, RollupRepository_Interface
+from app.domain.entities import CumulativeTotals, DailyKPIsOutput, DailyMetricsInput, KPIRollup, MetricRollup, RollingCheckpoint
+from app.domain.series import KPISeries, MetricsSeries
+from app.infrastructure.db.models import DailyKPIORM, DailyInputORM, KPICheckpointORM, daily_cumulative, kpi_rollups
+from app.infrastructure.db.rows import INPUT_ROW_FIELDS, KPI_ROW_FIELDS, input_to_row, kpi_to_row, midnight_utc, select_range
+
+from datetime import date, datetime, timezone, time
+from typing import Any, Iterator, Optional, Sequence
+from sqlalchemy import Column, Integer, MetaData, Table, func, insert as core_insert, literal, select
+from sqlalchemy.dialects import postgresql, sqlite
 from sqlalchemy.orm import Session
 
 
@@ -19,6 +25,109 @@ Key idea:
 """
 
 
+# Rows sent per INSERT ... ON CONFLICT statement in bulk mode
+DEFAULT_UPSERT_BATCH_SIZE = 1000
+
+# SQLite refuses statements with more bound parameters than this (999 on older builds)
+_SQLITE_MAX_VARIABLES = 999
+
+# Default page size of get_output_page
+DEFAULT_PAGE_SIZE = 100
+
+# Rows per batch fetched from the server-side cursor by iter_output
+DEFAULT_STREAM_BATCH_SIZE = 1000
+
+# save_input switches to the staging-table loader at this many rows
+DEFAULT_COPY_THRESHOLD = 5000
+
+# Value columns of daily_inputs written by the app ("id" and "source" are left alone)
+_INPUT_COLUMNS = (
+    "date",
+    "steps_n",
+    "proteins_g",
+    "kcal_in",
+    "kcal_junk_in",
+    "kcal_out_training",
+    "sleep_hours",
+    "stress_rel",
+    "weight_kg",
+    "waist_cm",
+)
+
+# Session-local scratch table used by the large-import path. It lives in its own
+# MetaData so Base.metadata.create_all / Alembic autogenerate never see it.
+# "seq" keeps the file order so duplicated days can be resolved as last-one-wins.
+_daily_inputs_staging = Table(
+    "daily_inputs_staging",
+    MetaData(),
+    Column("seq", Integer, nullable=False),
+    *[Column(c.name, c.type, nullable=c.nullable) for c in DailyInputORM.__table__.columns if c.name in _INPUT_COLUMNS],
+    prefixes=["TEMPORARY"],
+    postgresql_on_commit="DROP",
+)
+
+
+def _supports_bulk_upsert(db: Session) -> bool:
+    """
+    Only PostgreSQL and SQLite give us INSERT ... ON CONFLICT DO UPDATE.
+    Any other backend falls back to the row-by-row ORM upsert.
+    """
+    return db.get_bind().dialect.name in ("postgresql", "sqlite")
+
+
+def _bulk_upsert(
+    db: Session,
+    table: Table,
+    rows: list[dict[str, Any]],
+    *,
+    batch_size: int,
+    key: Sequence[str] = ("date",),
+) -> int:
+    """
+    Upsert rows keyed by "date" with one INSERT ... ON CONFLICT (date) DO UPDATE per chunk
+    (`key` names other conflict columns, e.g. the composite key of kpi_rollups).
+
+    - Duplicated keys are collapsed first (last one wins), because Postgres refuses
+      to update the same row twice inside a single statement.
+    - The conflict target is the column list ON CONFLICT (date): Postgres infers the unique index
+      on date from it, which also works once the tables are partitioned by year (a partitioned
+      unique index is only reachable by inference, not by constraint name).
+    - SQLite chunks are shrunk so every statement stays under its bound-parameter limit.
+    - Does NOT commit: the caller owns the transaction.
+
+    Returns the number of statements sent (one DB round trip each).
+    """
+    if not rows:
+        return 0
+
+    rows_by_key = {tuple(row[c] for c in key): row for row in rows}
+    unique_rows = list(rows_by_key.values())
+
+    dialect = db.get_bind().dialect.name
+    columns = list(unique_rows[0].keys())
+    update_columns = [c for c in columns if c not in key]
+
+    if dialect == "postgresql":
+        insert = postgresql.insert
+    else:
+        insert = sqlite.insert
+        batch_size = min(batch_size, _SQLITE_MAX_VARIABLES // len(columns))
+
+    batch_size = max(1, batch_size)
+    statements = 0
+
+    for i in range(0, len(unique_rows), batch_size):
+        chunk = unique_rows[i:i + batch_size]
+        stmt = insert(table).values(chunk)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=list(key),
+            set_={c: stmt.excluded[c] for c in update_columns},
+        )
+        db.execute(stmt)
+        statements += 1
+
+    return statements
+
 class DI_Postgres_OutputRepository(OutputRepository_Interface):
     """
     PostgreSQL implementation of OutputRepository_Interface.
@@ -26,8 +135,16 @@ class DI_Postgres_OutputRepository(OutputRepository_Interface):
     The router (API layer) is the "composition root":
         Router -> Build DB session -> Build Repo(session) -> Build Use Case(repo) -> Execute use case
     """
-    def __init__(self, db_session: Session):
+    def __init__(
+        self,
+        db_session: Session,
+        *,
+        bulk_upsert: bool = True,
+        batch_size: int = DEFAULT_UPSERT_BATCH_SIZE,
+    ):
         self._db = db_session #Injected SQLAlchemy session
+        self._bulk_upsert = bulk_upsert
+        self._batch_size = batch_size
 
     def save_output(self, output_data: list[DailyKPIsOutput]) -> None:
         """
@@ -39,6 +156,32 @@ class DI_Postgres_OutputRepository(OutputRepository_Interface):
         Why commit once?
         - Better performance (one transaction)
         - Easier rollback semantics ("all or nothing")
+
+        Bulk mode (default on Postgres/SQLite) sends chunks of rows as a single
+        INSERT ... ON CONFLICT (date) DO UPDATE against uq_daily_kpis_date,
+        instead of one SELECT + INSERT/UPDATE per day.
+        """
+        if self._bulk_upsert and _supports_bulk_upsert(self._db):
+            try:
+                computed_at = datetime.now(timezone.utc)
+                _bulk_upsert(
+                    self._db,
+                    DailyKPIORM.__table__,
+                    [kpi_to_row(kpi, computed_at) for kpi in output_data],
+                    batch_size=self._batch_size,
+                )
+                self._db.commit()
+            except Exception:
+                self._db.rollback()
+                raise
+            return
+
+        self._save_output_rowwise(output_data)
+
+    def _save_output_rowwise(self, output_data: list[DailyKPIsOutput]) -> None:
+        """
+        Portable fallback: SELECT each day, then INSERT or mutate the ORM row.
+        One round trip per day, so only used when bulk upsert is off/unsupported.
         """
         try:
             for kpi in output_data:
@@ -97,47 +240,209 @@ class DI_Postgres_OutputRepository(OutputRepository_Interface):
         Important notes:
         - This method is READ-ONLY, so we do NOT commit/rollback here.
         - Session lifecycle (close) is handled outside by FastAPI dependency injection.
-        - We map ORM objects -> DOMAIN entities (DailyKPIsOutput).
+        - Maps DB rows -> DOMAIN entities (DailyKPIsOutput).
+
+        Why Core rows instead of ORM objects?
+        - A read never modifies rows, so it doesn't need identity-map bookkeeping,
+          attribute instrumentation or one DailyKPIORM instance per row.
+        - Plain tuples come back in the entity's field order and are passed positionally,
+          so each row costs one tuple + one domain object.
+        """
+        stmt = select_range(DailyKPIORM.__table__, KPI_ROW_FIELDS, start.date(), end.date())
+        return [DailyKPIsOutput(midnight_utc(row[0]), *row[1:]) for row in self._db.execute(stmt)]
+
+    def get_output_series(self, start: date, end: date) -> KPISeries:
+        """
+        Columnar read: plain Core row tuples go straight into the KPISeries arrays,
+        no ORM instances and no DailyKPIsOutput objects.
+        """
+        if start > end:
+            raise ValueError("Start date must be before end date.")
+
+        series = KPISeries()
+        series.extend_rows(self._db.execute(select_range(DailyKPIORM.__table__, series.columns, start, end)))
+        return series
+
+    def get_output_page(
+        self, start: date, end: date, after: Optional[date] = None, limit: int = DEFAULT_PAGE_SIZE
+    ) -> list[DailyKPIsOutput]:
+        """
+        Keyset pagination: WHERE date > :after ... ORDER BY date LIMIT :limit.
+
+        Why keyset and not OFFSET?
+        - OFFSET n makes the DB walk and discard n rows, so deep pages get slower.
+        - "date > last seen date" is an index range scan on uq_daily_kpis_date:
+          every page costs the same, however deep it is.
+        - Rows inserted/updated between two pages can't shift the pages.
+        """
+        table = DailyKPIORM.__table__
+        stmt = select_range(table, KPI_ROW_FIELDS, start, end)
+        if after is not None:
+            stmt = stmt.where(table.c.date > after)
+        stmt = stmt.limit(limit)
+        return [DailyKPIsOutput(midnight_utc(row[0]), *row[1:]) for row in self._db.execute(stmt)]
+
+    def get_output_version(self) -> tuple[int, Optional[datetime]]:
         """
-        # 1) Query ORM rows in range
-        stmt = (
-            select(DailyKPIORM)
-            .where(DailyKPIORM.date >= start.date(), DailyKPIORM.date <= end.date())
-            .order_by(DailyKPIORM.date.asc())
+        Cheap fingerprint of daily_kpis: (row count, latest computed_at).
+        Every write stamps computed_at, so any insert/update by any process changes it.
+        Used by in-memory copies of the table to know when they are stale.
+        """
+        count, latest = self._db.execute(
+            select(func.count(), func.max(DailyKPIORM.computed_at)).select_from(DailyKPIORM)
+        ).one()
+        return int(count), latest
+
+    def iter_output(
+        self, start: date, end: date, batch_size: int = DEFAULT_STREAM_BATCH_SIZE
+    ) -> Iterator[list[DailyKPIsOutput]]:
+        """
+        Stream KPI rows in [start, end] as batches of domain entities.
+
+        Why stream_results + yield_per?
+        - stream_results asks the driver for a server-side cursor (psycopg named cursor on
+          Postgres), so rows are fetched from the DB batch by batch, not all at once.
+        - yield_per sets the batch size; partitions() hands out one batch at a time.
+        - Only the current batch is alive: memory is the same for 1 week or 20 years.
+
+        The session must stay open while the generator is consumed (true for a
+        StreamingResponse: FastAPI closes yield-dependencies after the response is sent).
+        """
+        if start > end:
+            raise ValueError("Start date must be before end date.")
+
+        stmt = select_range(DailyKPIORM.__table__, KPI_ROW_FIELDS, start, end).execution_options(
+            stream_results=True, yield_per=batch_size
         )
-        orm_rows = self._db.execute(stmt).scalars().all()
-        # scalars(): return ORM objects directly (not full result tuples)
-        # all(): fetch everything into a list (can be empty; that's fine)
-
-        # 2) Map ORM -> Domain
-        domain_entities: list[DailyKPIsOutput] = []
-
-        for row in orm_rows:
-            domain_entities.append(
-                DailyKPIsOutput(
-                    # ORM stores date (no time). Convert to a timezone-aware datetime.
-                    date=datetime.combine(row.date, time.min, tzinfo=timezone.utc),
-
-                    # Reduced KPI set (8)
-                    kcal_out_total=row.kcal_out_total,
-                    balance_kcal=row.balance_kcal,
-                    balance_7d_average=row.balance_7d_average,
-                    protein_per_kg=row.protein_per_kg,
-                    healthy_food_pct=row.healthy_food_pct,
-                    adherence_steps=row.adherence_steps,
-                    weight_7d_avg=row.weight_7d_avg,
-                    waist_change_7d=row.waist_change_7d,
+        result = self._db.execute(stmt)
+        try:
+            for rows in result.partitions():
+                yield [DailyKPIsOutput(midnight_utc(row[0]), *row[1:]) for row in rows]
+        finally:
+            # Releases the server-side cursor even if the client disconnects mid-stream
+            result.close()
+
+
+class DI_Postgres_InputRepository(InputRepository_Interface):
+    def __init__(
+        self,
+        db_session: Session,
+        *,
+        bulk_upsert: bool = True,
+        batch_size: int = DEFAULT_UPSERT_BATCH_SIZE,
+        copy_threshold: int = DEFAULT_COPY_THRESHOLD,
+    ):
+        self._db = db_session
+        self._bulk_upsert = bulk_upsert
+        self._batch_size = batch_size
+        self._copy_threshold = copy_threshold
+
+    def save_input(self, input_data: list[DailyMetricsInput]) -> Optional[tuple[date, date]] :
+        """
+        Upsert input rows by day and commit once.
+        Returns the (first_day, last_day) range that was written, or None if nothing was.
+
+        Three strategies, picked by size and dialect:
+        - >= copy_threshold rows: staging-table loader (COPY on Postgres), see load_input_staged()
+        - bulk mode: INSERT ... ON CONFLICT (date) DO UPDATE against uq_daily_inputs_date
+        - fallback: row-by-row ORM upsert
+        """
+        if not input_data:
+            return None
+
+        if self._bulk_upsert and _supports_bulk_upsert(self._db):
+            if len(input_data) >= self._copy_threshold:
+                return self.load_input_staged(input_data)
+
+            try:
+                _bulk_upsert(
+                    self._db,
+                    DailyInputORM.__table__,
+                    [input_to_row(r) for r in input_data],
+                    batch_size=self._batch_size,
                 )
+                self._db.commit()
+            except Exception:
+                self._db.rollback()
+                raise
+        else:
+            self._save_input_rowwise(input_data)
+
+        days = [r.date.date() for r in input_data]
+        return min(days), max(days)
+
+    def load_input_staged(self, input_data: list[DailyMetricsInput]) -> Optional[tuple[date, date]]:
+        """
+        Large-import path: stream rows into a temporary staging table, then merge them
+        into daily_inputs with ONE set-based INSERT ... SELECT ... ON CONFLICT statement.
+
+        - Postgres + psycopg: rows are streamed with COPY ... FROM STDIN (no per-row statements)
+        - SQLite / other drivers: rows go into the staging table with executemany
+          (same merge statement, so the SQL path is testable without Postgres)
+
+        Duplicated days keep the last row in file order (same rule as the KPI calculator).
+        Returns the (first_day, last_day) range that was merged, or None if nothing was.
+        """
+        if not input_data:
+            return None
+
+        staging = _daily_inputs_staging
+        target = DailyInputORM.__table__
+        dialect = self._db.get_bind().dialect
+
+        try:
+            conn = self._db.connection()
+            staging.drop(conn, checkfirst=True)  # SQLite keeps temp tables until the connection closes
+            staging.create(conn)
+
+            # 1) Load the staging table
+            if dialect.name == "postgresql" and dialect.driver == "psycopg":
+                self._copy_into_staging(conn, input_data)
+            else:
+                rows = [{"seq": i, **input_to_row(r)} for i, r in enumerate(input_data)]
+                for i in range(0, len(rows), self._batch_size):
+                    conn.execute(core_insert(staging), rows[i:i + self._batch_size])
+
+            # 2) Affected range, read before the staging table goes away
+            first_day, last_day = conn.execute(
+                select(func.min(staging.c.date), func.max(staging.c.date))
+            ).one()
+
+            # 3) Set-based merge: latest row per day, upserted in a single statement
+            latest_per_day = select(func.max(staging.c.seq)).group_by(staging.c.date)
+            source = select(*[staging.c[c] for c in _INPUT_COLUMNS]).where(staging.c.seq.in_(latest_per_day))
+
+            insert = postgresql.insert if dialect.name == "postgresql" else sqlite.insert
+            merge = insert(target).from_select(list(_INPUT_COLUMNS), source)
+            merge = merge.on_conflict_do_update(
+                index_elements=["date"],
+                set_={c: merge.excluded[c] for c in _INPUT_COLUMNS if c != "date"},
             )
+            conn.execute(merge)
+
+            staging.drop(conn)
+            self._db.commit()
+        except Exception:
+            self._db.rollback()
+            raise
 
-        return domain_entities
+        return first_day, last_day
 
+    def _copy_into_staging(self, conn, input_data: list[DailyMetricsInput]) -> None:
+        """
+        Stream rows through psycopg's COPY protocol on the session's own DBAPI connection,
+        so the load happens inside the same transaction as the merge.
+        """
+        columns = ", ".join(("seq",) + _INPUT_COLUMNS)
+        raw_connection = conn.connection.driver_connection
 
-class DI_Postgres_InputRepository(InputRepository_Interface):
-    def __init__(self, db_session: Session):
-        self._db = db_session
+        with raw_connection.cursor() as cursor:
+            with cursor.copy(f"COPY {_daily_inputs_staging.name} ({columns}) FROM STDIN") as copy:
+                for i, r in enumerate(input_data):
+                    row = input_to_row(r)
+                    copy.write_row((i, *(row[c] for c in _INPUT_COLUMNS)))
 
-    def save_input(self, input_data: list[DailyMetricsInput]) -> None :
+    def _save_input_rowwise(self, input_data: list[DailyMetricsInput]) -> None :
         try:            
             for input_record in input_data:
                 date_to_check = input_record.date.date()
@@ -177,46 +482,236 @@ class DI_Postgres_InputRepository(InputRepository_Interface):
             self._db.rollback() 
             raise
 
-    def get_input(self, start: datetime, end: datetime) -> list[DailyMetricsInput]:
+    def get_input(
+        self, start: datetime, end: datetime, columns: Optional[Sequence[str]] = None
+    ) -> list[DailyMetricsInput]:
         """
         Read input rows in the date range [start, end], ordered by date.
 
         Notes:
         - READ-ONLY: no commit/rollback.
         - Session lifecycle is managed outside (FastAPI dependency).
-        - Maps ORM rows -> domain entities (DailyMetricsInput).
+        - Core row tuples -> domain entities (DailyMetricsInput), see get_output.
+        - `columns` (projection): only those columns are selected, e.g. when a recompute
+          only needs steps_n. Fields not selected stay None.
         """
         if start > end:
             raise ValueError("Start date must be before end date.")
 
-        # 1) Query ORM rows in range (inclusive)
-        stmt = (
-            select(DailyInputORM)
-            .where(DailyInputORM.date >= start, DailyInputORM.date <= end)
-            .order_by(DailyInputORM.date.asc())
+        if columns is None:
+            stmt = select_range(DailyInputORM.__table__, INPUT_ROW_FIELDS, start, end)
+            return [DailyMetricsInput(midnight_utc(row[0]), *row[1:]) for row in self._db.execute(stmt)]
+
+        unknown = [c for c in columns if c not in INPUT_ROW_FIELDS]
+        if unknown:
+            raise ValueError(f"Unknown input columns: {unknown}")
+
+        stmt = select_range(DailyInputORM.__table__, columns, start, end)
+        return [
+            DailyMetricsInput(midnight_utc(row[0]), **dict(zip(columns, row[1:])))
+            for row in self._db.execute(stmt)
+        ]
+
+
+    def iter_input(
+        self, start: Optional[date] = None, end: Optional[date] = None, batch_size: int = 1000
+    ) -> Iterator[DailyMetricsInput]:
+        """
+        Stream input rows ordered by date (full history if start / end are None).
+
+        Why yield_per?
+        - Rows are fetched `batch_size` at a time (server-side cursor on Postgres),
+          so a full-history rebuild never holds the whole table in memory.
+        - Core tuples are not tracked by the session, so consumed rows are freed
+          as soon as the caller drops them.
+        """
+        table = DailyInputORM.__table__
+        stmt = select(table.c.date, *[table.c[c] for c in INPUT_ROW_FIELDS]).order_by(table.c.date.asc())
+        if start is not None:
+            stmt = stmt.where(table.c.date >= start)
+        if end is not None:
+            stmt = stmt.where(table.c.date <= end)
+
+        for row in self._db.execute(stmt.execution_options(yield_per=batch_size)):
+            yield DailyMetricsInput(midnight_utc(row[0]), *row[1:])
+
+    def get_input_series(
+        self, start: date, end: date, columns: Optional[Sequence[str]] = None
+    ) -> MetricsSeries:
+        """Columnar read (see DI_Postgres_OutputRepository.get_output_series), with optional projection."""
+        if start > end:
+            raise ValueError("Start date must be before end date.")
+
+        series = MetricsSeries(columns)
+        series.extend_rows(self._db.execute(select_range(DailyInputORM.__table__, series.columns, start, end)))
+        return series
+
+
+
+class DI_Postgres_CheckpointRepository(CheckpointRepository_Interface):
+    """
+    Stores the rolling-state checkpoint in the single-row kpi_checkpoints table.
+    """
+    _ROW_ID = 1
+
+    def __init__(self, db_session: Session):
+        self._db = db_session
+
+    def get_checkpoint(self) -> Optional[RollingCheckpoint]:
+        """
+        Return the checkpoint only if its day is still the latest day in daily_inputs.
+        If anything was written after it (or it never existed) the caller must fall back
+        to a windowed recompute. max(date) is answered from the unique index on date.
+        """
+        row = self._db.get(KPICheckpointORM, self._ROW_ID)
+        if row is None:
+            return None
+
+        latest_input_day = self._db.execute(select(func.max(DailyInputORM.date))).scalar_one_or_none()
+        if latest_input_day != row.date:
+            return None
+
+        return RollingCheckpoint(
+            date=datetime.combine(row.date, time.min, tzinfo=timezone.utc),
+            state=row.state,
         )
-        orm_rows = self._db.execute(stmt).scalars().all()
-
-        # 2) Map ORM -> Domain
-        domain_entities: list[DailyMetricsInput] = []
-
-        for row in orm_rows:
-            domain_entities.append(
-                DailyMetricsInput(
-                    # ORM stores a DATE. Convert to timezone-aware datetime at midnight UTC.
-                    date=datetime.combine(row.date, time.min, tzinfo=timezone.utc),
-                     
-                    steps_n=row.steps_n,
-                    proteins_g=row.proteins_g,
-                    kcal_in=row.kcal_in,
-                    kcal_junk_in=row.kcal_junk_in,
-                    kcal_out_training=row.kcal_out_training,
-                    sleep_hours=row.sleep_hours,
-                    stress_rel=row.stress_rel,
-                    weight_kg=row.weight_kg,
-                    waist_cm=row.waist_cm,
+
+    def save_checkpoint(self, checkpoint: RollingCheckpoint) -> None:
+        try:
+            self._db.merge(
+                KPICheckpointORM(
+                    id=self._ROW_ID,
+                    date=checkpoint.date.date(),
+                    state=checkpoint.state,
+                    updated_at=datetime.now(timezone.utc),
                 )
             )
+            self._db.commit()
+        except Exception:
+            self._db.rollback()
+            raise
+
+
+class DI_Postgres_CumulativeRepository(CumulativeRepository_Interface):
+    """
+    Stores CumulativeTotals in daily_cumulative (one row per calendar day, <column>_sum / <column>_n).
+    """
+
+    def __init__(self, db_session: Session, *, batch_size: int = DEFAULT_UPSERT_BATCH_SIZE):
+        self._db = db_session
+        self._batch_size = batch_size
+
+    def get_cumulative(self, day: date) -> Optional[CumulativeTotals]:
+        """
+        Latest row on or before `day`: ORDER BY date DESC LIMIT 1 is a single backward
+        seek on the primary key, so a range query costs two index lookups.
+        """
+        table = daily_cumulative
+        row = self._db.execute(
+            select(table).where(table.c.date <= day).order_by(table.c.date.desc()).limit(1)
+        ).mappings().first()
+        if row is None:
+            return None
+
+        return CumulativeTotals(
+            date=midnight_utc(row["date"]),
+            input_days=row["input_days"],
+            sums={name: row[f"{name}_sum"] for name in CUMULATIVE_COLUMNS},
+            counts={name: row[f"{name}_n"] for name in CUMULATIVE_COLUMNS},
+        )
+
+    def save_cumulative(self, rows: list[CumulativeTotals]) -> None:
+        if not rows:
+            return
+        try:
+            _bulk_upsert(
+                self._db,
+                daily_cumulative,
+                [_cumulative_to_row(r) for r in rows],
+                batch_size=self._batch_size,
+            )
+            self._db.commit()
+        except Exception:
+            self._db.rollback()
+            raise
+
+
+def _cumulative_to_row(totals: CumulativeTotals) -> dict[str, Any]:
+    row: dict[str, Any] = {"date": totals.date.date(), "input_days": totals.input_days}
+    for name in CUMULATIVE_COLUMNS:
+        row[f"{name}_sum"] = totals.sums[name]
+        row[f"{name}_n"] = totals.counts[name]
+    return row
+
+
+class DI_Postgres_RollupRepository(RollupRepository_Interface):
+    """
+    Stores KPIRollup rows in kpi_rollups (one row per granularity + period, <kpi>_mean / _min / _max / _n).
+    """
+
+    def __init__(self, db_session: Session, *, batch_size: int = DEFAULT_UPSERT_BATCH_SIZE):
+        self._db = db_session
+        self._batch_size = batch_size
+
+    def get_rollups(self, granularity: str, start: date, end: date) -> list[KPIRollup]:
+        """Periods starting in [start, end]: one range scan on the (granularity, period_start) primary key."""
+        table = kpi_rollups
+        rows = self._db.execute(
+            select(table)
+            .where(table.c.granularity == granularity, table.c.period_start >= start, table.c.period_start <= end)
+            .order_by(table.c.period_start.asc())
+        ).mappings()
+
+        return [
+            KPIRollup(
+                granularity=row["granularity"],
+                period_start=midnight_utc(row["period_start"]),
+                period_end=midnight_utc(row["period_end"]),
+                days=row["days"],
+                adherence_ratio=row["adherence_ratio"],
+                metrics={
+                    name: MetricRollup(
+                        mean=row[f"{name}_mean"], min=row[f"{name}_min"], max=row[f"{name}_max"], count=row[f"{name}_n"]
+                    )
+                    for name in ROLLUP_COLUMNS
+                },
+            )
+            for row in rows
+        ]
+
+    def has_rollups(self) -> bool:
+        """SELECT 1 ... LIMIT 1: answered from the primary key, whatever the table size."""
+        return self._db.execute(select(literal(1)).select_from(kpi_rollups).limit(1)).first() is not None
+
+    def save_rollups(self, rows: list[KPIRollup]) -> None:
+        if not rows:
+            return
+        try:
+            _bulk_upsert(
+                self._db,
+                kpi_rollups,
+                [_rollup_to_row(r) for r in rows],
+                batch_size=self._batch_size,
+                key=("granularity", "period_start"),
+            )
+            self._db.commit()
+        except Exception:
+            self._db.rollback()
+            raise
+
 
-        return domain_entities
-       
+def _rollup_to_row(rollup: KPIRollup) -> dict[str, Any]:
+    row: dict[str, Any] = {
+        "granularity": rollup.granularity,
+        "period_start": rollup.period_start.date(),
+        "period_end": rollup.period_end.date(),
+        "days": rollup.days,
+        "adherence_ratio": rollup.adherence_ratio,
+    }
+    for name in ROLLUP_COLUMNS:
+        metric = rollup.metrics[name]
+        row[f"{name}_mean"] = metric.mean
+        row[f"{name}_min"] = metric.min
+        row[f"{name}_max"] = metric.max
+        row[f"{name}_n"] = metric.count
+    return row
@@ -0,0 +1,67 @@
+"""
+Row <-> entity helpers shared by the SQL repositories and the Parquet archive.
+
+The daily tables and the archive files hold the same columns in the same order:
+"date", then the entity fields. Reads select in that order so each row tuple can be
+passed to the entity positionally; writes go through kpi_to_row / input_to_row.
+"""
+
+from __future__ import annotations
+
+from dataclasses import fields
+from datetime import date, datetime, time, timezone
+from typing import Any, Sequence
+
+from sqlalchemy import Table, select
+
+from app.domain.entities import DailyKPIsOutput, DailyMetricsInput
+
+
+# Field order of the domain entities (after "date"). Read queries select columns in this
+# order so each row tuple can be passed to the entity positionally.
+KPI_ROW_FIELDS = tuple(f.name for f in fields(DailyKPIsOutput) if f.name not in ("date", "rolling"))
+INPUT_ROW_FIELDS = tuple(f.name for f in fields(DailyMetricsInput) if f.name != "date")
+
+
+def midnight_utc(day: date) -> datetime:
+    # DB stores a DATE; the domain uses timezone-aware datetimes at midnight UTC
+    return datetime.combine(day, time.min, tzinfo=timezone.utc)
+
+
+def select_range(table: Table, columns: Sequence[str], start: date, end: date):
+    """SELECT date, <columns> FROM table WHERE date BETWEEN start AND end ORDER BY date."""
+    return (
+        select(table.c.date, *[table.c[c] for c in columns])
+        .where(table.c.date >= start, table.c.date <= end)
+        .order_by(table.c.date.asc())
+    )
+
+
+def kpi_to_row(kpi: DailyKPIsOutput, computed_at: datetime) -> dict[str, Any]:
+    return {
+        "date": kpi.date.date(),
+        "kcal_out_total": kpi.kcal_out_total,
+        "balance_kcal": kpi.balance_kcal,
+        "balance_7d_average": kpi.balance_7d_average,
+        "protein_per_kg": kpi.protein_per_kg,
+        "healthy_food_pct": kpi.healthy_food_pct,
+        "adherence_steps": kpi.adherence_steps,
+        "weight_7d_avg": kpi.weight_7d_avg,
+        "waist_change_7d": kpi.waist_change_7d,
+        "computed_at": computed_at,
+    }
+
+
+def input_to_row(input_record: DailyMetricsInput) -> dict[str, Any]:
+    return {
+        "date": input_record.date.date(),
+        "steps_n": input_record.steps_n,
+        "proteins_g": input_record.proteins_g,
+        "kcal_in": input_record.kcal_in,
+        "kcal_junk_in": input_record.kcal_junk_in,
+        "kcal_out_training": input_record.kcal_out_training,
+        "sleep_hours": input_record.sleep_hours,
+        "stress_rel": input_record.stress_rel,
+        "weight_kg": input_record.weight_kg,
+        "waist_cm": input_record.waist_cm,
+    }
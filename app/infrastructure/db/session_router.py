@@ -0,0 +1,67 @@
+"""
+Read/write session routing (primary + optional read replica).
+
+WHY THIS FILE EXISTS:
+- Dashboard reads and CSV ingestion used the same engine, so reads competed with ingest
+  writes for the primary's connections and CPU.
+- With READ_DATABASE_URL set, read-only endpoints get their sessions from the replica and
+  only writes (uploads) use the primary.
+
+Read-your-writes:
+- A replica lags the primary a little. Right after an upload the user expects to see the new
+  KPIs, so for `read_your_writes_seconds` after a write, reads go to the primary too.
+- The window should be longer than the usual replica lag (check pg_stat_replication).
+- The window is per process. With several API workers, a write through one worker doesn't
+  move the others' reads to the primary (the same limitation as the in-process KPI cache).
+
+Without a replica every session comes from the primary and nothing changes.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from typing import Callable, Generic, Optional, TypeVar
+
+
+F = TypeVar("F")  # session factory type (sessionmaker / async_sessionmaker)
+
+DEFAULT_READ_YOUR_WRITES_SECONDS = 5.0
+
+
+class SessionRouter(Generic[F]):
+    def __init__(
+        self,
+        write_factory: F,
+        read_factory: Optional[F] = None,
+        *,
+        read_your_writes_seconds: float = DEFAULT_READ_YOUR_WRITES_SECONDS,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self._write_factory = write_factory
+        self._read_factory = read_factory
+        self._window = read_your_writes_seconds
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._last_write: Optional[float] = None
+
+    @property
+    def has_replica(self) -> bool:
+        return self._read_factory is not None
+
+    def mark_write(self) -> None:
+        """Call after a successful write: reads stay on the primary for the read-your-writes window."""
+        with self._lock:
+            self._last_write = self._clock()
+
+    def reads_use_primary(self) -> bool:
+        if self._read_factory is None:
+            return True
+        with self._lock:
+            return self._last_write is not None and self._clock() - self._last_write < self._window
+
+    def write_factory(self) -> F:
+        return self._write_factory
+
+    def read_factory(self) -> F:
+        return self._write_factory if self.reads_use_primary() else self._read_factory
@@ -0,0 +1,179 @@
+from __future__ import annotations
+
+from datetime import date, datetime, timedelta, timezone
+from typing import Optional
+
+from sqlalchemy import Date, DateTime, Integer, bindparam, func, select, text
+from sqlalchemy.orm import Session
+
+from app.business.kpi_calculator import kpi_max_lookback_days
+from app.business.kpi_registry import DEFAULT_WINDOW_DAYS, KPI_FIELDS, WAIST_CHANGE_LAG_DAYS
+from app.domain.interfaces import KPIEngine_Interface
+from app.infrastructure.db.models import DailyInputORM
+
+
+"""
+SQL push-down KPI engine (Infrastructure layer).
+
+WHY THIS FILE EXISTS:
+- A full-history rebuild through Python (RebuildKPIs) streams every daily_inputs row into the
+  app, computes the KPIs, and sends every KPI row back: two full copies of the table over the wire.
+- Here the database does it in ONE statement, INSERT INTO daily_kpis ... SELECT ... ON CONFLICT:
+    * per-day KPIs are plain column expressions (CASE for the same None rules as the registry)
+    * 7-day averages are window functions: AVG(...) OVER (ORDER BY date RANGE BETWEEN
+      INTERVAL '6 days' PRECEDING AND CURRENT ROW). RANGE counts calendar days, not rows,
+      and AVG skips NULLs: the "average of the available values" rule of RollingWindow.
+    * waist_change_7d is LAG(waist_cm, 7) over a dense calendar (generate_series LEFT JOIN inputs):
+      every day has a row, so 7 rows back is exactly D-7, like LagBuffer, even with gaps.
+    * the upsert is part of the same statement, so no row ever leaves the server.
+- Results equal compute_daily_kpis (checked by tests/infrastructure/test_sql_kpi_engine.py).
+  Keep the two in sync when a KPI definition changes in kpi_registry.py.
+
+Only the 8 persisted KPIs with their default windows are computed (what daily_kpis stores).
+SQLite gets the same statement with a recursive CTE calendar and julianday() window ordering
+(needs SQLite >= 3.28), so the SQL path is testable without a Postgres server.
+
+Cold tier (KPI_ARCHIVE_DIR): the statement only reads daily_inputs, so once closed years are
+archived to Parquet the first 7 days of the first hot year have lost their lookback context.
+Built with `hot_from` (see build_kpi_engine in archive/tiered_repository.py), the engine never
+rebuilds those days: their stored KPIs were computed before archiving, with the full context.
+Use RebuildKPIs (Python, tier-aware input repository) to recompute them.
+"""
+
+
+# Dialect-specific pieces of the statement
+_CALENDAR = {
+    "postgresql": (
+        "WITH calendar AS (\n"
+        "    SELECT CAST(day AS date) AS date\n"
+        "    FROM generate_series(CAST(:context_start AS date), CAST(:end AS date), INTERVAL '1 day') AS day\n"
+        ")"
+    ),
+    "sqlite": (
+        "WITH RECURSIVE calendar(date) AS (\n"
+        "    SELECT :context_start\n"
+        "    UNION ALL\n"
+        "    SELECT date(date, '+1 day') FROM calendar WHERE date < :end\n"
+        ")"
+    ),
+}
+
+_FLOAT = {"postgresql": "double precision", "sqlite": "REAL"}
+
+# ORDER BY key + RANGE offset of the rolling window frame (SQLite only has numeric offsets)
+_WINDOW_FRAME = {
+    "postgresql": "ORDER BY date RANGE BETWEEN INTERVAL '{preceding} days' PRECEDING AND CURRENT ROW",
+    "sqlite": "ORDER BY julianday(date) RANGE BETWEEN {preceding} PRECEDING AND CURRENT ROW",
+}
+
+# The statement starts with INSERT (the CTEs belong to its SELECT): drivers only report a
+# rowcount for statements that start with INSERT / UPDATE / DELETE (sqlite3 does not for WITH ...)
+_REBUILD_SQL = """\
+INSERT INTO daily_kpis (date, {kpi_columns}, computed_at)
+{calendar},
+daily AS (
+    SELECT c.date,
+           i.date IS NOT NULL AS has_input,
+           CAST(i.kcal_out_training AS {float}) AS kcal_out_total,
+           CAST(i.kcal_in AS {float}) - i.kcal_out_training AS balance_kcal,
+           CASE WHEN i.weight_kg > 0 THEN CAST(i.proteins_g AS {float}) / i.weight_kg END AS protein_per_kg,
+           CASE WHEN i.kcal_in > 0 THEN 100.0 * (1.0 - CAST(i.kcal_junk_in AS {float}) / i.kcal_in) END AS healthy_food_pct,
+           CASE WHEN i.steps_n >= :target_steps THEN 1 WHEN i.steps_n IS NOT NULL THEN 0 END AS adherence_steps,
+           CAST(i.weight_kg AS {float}) AS weight_kg,
+           CAST(i.waist_cm AS {float}) AS waist_cm
+    FROM calendar c
+    LEFT JOIN daily_inputs i ON i.date = c.date
+),
+kpis AS (
+    SELECT daily.*,
+           AVG(balance_kcal) OVER rolling_window AS balance_7d_average,
+           AVG(weight_kg) OVER rolling_window AS weight_7d_avg,
+           waist_cm - LAG(waist_cm, {waist_lag}) OVER (ORDER BY date) AS waist_change_7d
+    FROM daily
+    WINDOW rolling_window AS ({window_frame})
+)
+SELECT date, {kpi_columns}, :computed_at
+FROM kpis
+WHERE has_input AND date >= :start AND date <= :end
+ON CONFLICT (date) DO UPDATE SET {update_set}, computed_at = excluded.computed_at
+"""
+
+
+def rebuild_kpis_sql(dialect: str) -> str:
+    """The INSERT ... SELECT ... ON CONFLICT statement for `dialect` ("postgresql" or "sqlite")."""
+    if dialect not in _CALENDAR:
+        raise NotImplementedError(f"SQL KPI engine is not available on {dialect!r}")
+
+    return _REBUILD_SQL.format(
+        calendar=_CALENDAR[dialect],
+        float=_FLOAT[dialect],
+        window_frame=_WINDOW_FRAME[dialect].format(preceding=DEFAULT_WINDOW_DAYS - 1),
+        waist_lag=WAIST_CHANGE_LAG_DAYS,
+        kpi_columns=", ".join(KPI_FIELDS),
+        update_set=", ".join(f"{c} = excluded.{c}" for c in KPI_FIELDS),
+    )
+
+
+class DI_Postgres_KPIEngine(KPIEngine_Interface):
+    """
+    Computes and upserts KPIs inside the database with one statement (see module docstring).
+    Commits once, like the repositories' writes.
+
+    `hot_from`: first day whose inputs are still in the database (earlier days are archived).
+    The rebuild then starts no earlier than hot_from + 7 days, the first day with a full lookback.
+    """
+
+    def __init__(self, db_session: Session, *, hot_from: Optional[date] = None):
+        self._db = db_session
+        self._hot_from = hot_from
+
+    def rebuild_kpis(
+        self, start: Optional[date] = None, end: Optional[date] = None, *, target_steps: int = 10_000
+    ) -> int:
+        if start is not None and end is not None and start > end:
+            raise ValueError("Start date must be before end date.")
+
+        # Open ends default to the stored input range (answered from the unique index on date)
+        if start is None or end is None:
+            first_day, last_day = self._db.execute(
+                select(func.min(DailyInputORM.date), func.max(DailyInputORM.date))
+            ).one()
+            if first_day is None:
+                return 0
+            start = start if start is not None else first_day
+            end = end if end is not None else last_day
+            if start > end:
+                return 0
+
+        # Days whose windows / lag reach into archived years would be computed without that context
+        if self._hot_from is not None:
+            start = max(start, self._hot_from + timedelta(days=kpi_max_lookback_days()))
+            if start > end:
+                return 0
+
+        stmt = text(rebuild_kpis_sql(self._db.get_bind().dialect.name)).bindparams(
+            bindparam("context_start", type_=Date),
+            bindparam("start", type_=Date),
+            bindparam("end", type_=Date),
+            bindparam("target_steps", type_=Integer),
+            bindparam("computed_at", type_=DateTime(timezone=True)),
+        )
+
+        try:
+            result = self._db.execute(
+                stmt,
+                {
+                    # Days before `start` only feed the 7-day windows and the waist lag
+                    "context_start": start - timedelta(days=kpi_max_lookback_days()),
+                    "start": start,
+                    "end": end,
+                    "target_steps": target_steps,
+                    "computed_at": datetime.now(timezone.utc),
+                },
+            )
+            self._db.commit()
+        except Exception:
+            self._db.rollback()
+            raise
+
+        return result.rowcount
@@ -49,7 +49,10 @@ def _to_float(s: Optional[str]) -> Optional[float]:
 
 
 def _parse_date(s: Optional[str]) -> datetime:
-    s = _clean(s)
+    return _parse_clean_date(_clean(s))
+
+
+def _parse_clean_date(s: Optional[str]) -> datetime:
     if s is None:
         raise ValueError("Missing required field: 'date'")
 
@@ -89,19 +92,25 @@ def _is_effectively_empty_row(row: dict) -> bool:
     return True
 
 
+def _decode_and_sniff(file_bytes: bytes) -> tuple[str, str]:
+    """UTF-8 text (BOM dropped) and its delimiter, sniffed from the first 4 KB (";" if unsure)."""
+    try:
+        decoded = file_bytes.decode("utf-8-sig")
+    except UnicodeDecodeError as e:
+        raise ValueError("CSV must be UTF-8 encoded.") from e
+
+    sample = decoded[:4096]
+    try:
+        dialect = csv.Sniffer().sniff(sample, delimiters=";,")
+        delimiter = dialect.delimiter
+    except Exception:
+        delimiter = ";"
+    return decoded, delimiter
+
+
 class DI_CsvParserV1(CSVParser_Interface):
     def parse(self, file_bytes: bytes) -> list[DailyMetricsInput]:
-        try:
-            decoded = file_bytes.decode("utf-8-sig")
-        except UnicodeDecodeError as e:
-            raise ValueError("CSV must be UTF-8 encoded.") from e
-
-        sample = decoded[:4096]
-        try:
-            dialect = csv.Sniffer().sniff(sample, delimiters=";,")
-            delimiter = dialect.delimiter
-        except Exception:
-            delimiter = ";"
+        decoded, delimiter = _decode_and_sniff(file_bytes)
 
         reader = csv.DictReader(StringIO(decoded), delimiter=delimiter)
 
@@ -141,4 +150,228 @@ class DI_CsvParserV1(CSVParser_Interface):
 
             parsed.append(entity)
 
-        return parsed
\ No newline at end of file
+        return parsed
+
+
+# ---------------------------------------------------------------------------
+# V2: same output and errors as V1, without the per-row overhead.
+# ---------------------------------------------------------------------------
+
+# The invisible characters removed by _clean, as one translate table (a single pass over the string)
+_INVISIBLE_CHARS = str.maketrans({
+    "\ufeff": None,   # BOM
+    "\u00a0": " ",    # non-breaking space
+    "\u200b": None,   # zero-width space
+    "\u200c": None,   # zero-width non-joiner
+    "\u200d": None,   # zero-width joiner
+    "\u2060": None,   # word joiner
+})
+
+
+def _clean_cell(s: str) -> Optional[str]:
+    """_clean for a cell read by csv.reader (always a str). ASCII cells (nearly all) skip the translate."""
+    s = s.strip() if s.isascii() else s.translate(_INVISIBLE_CHARS).strip()
+    return s or None
+
+
+def _cell_to_int(s: str) -> Optional[int]:
+    s = s.strip() if s.isascii() else s.translate(_INVISIBLE_CHARS).strip()
+    if not s:
+        return None
+    try:
+        return int(s)
+    except ValueError as e:
+        raise ValueError(f"Invalid int value: {s!r}") from e
+
+
+def _cell_to_float(s: str) -> Optional[float]:
+    s = s.strip() if s.isascii() else s.translate(_INVISIBLE_CHARS).strip()
+    if not s:
+        return None
+    s = s.replace(",", ".")
+    try:
+        return float(s)
+    except ValueError as e:
+        raise ValueError(f"Invalid float value: {s!r}") from e
+
+
+def _iso_date(s: str) -> datetime:
+    """YYYY-MM-DD only (datetime.fromisoformat alone would also take other ISO forms)."""
+    if len(s) != 10 or s[4] != "-" or s[7] != "-":
+        raise ValueError(s)
+    return datetime.fromisoformat(s)
+
+
+def _dmy_date(s: str) -> datetime:
+    """DD/MM/YYYY by slicing: no format string to interpret, no regex."""
+    day, month, year = s[:2], s[3:5], s[6:]
+    # strict digits: int() would also take "+1" or "1 ", which strptime rejects
+    if len(s) != 10 or s[2] != "/" or s[5] != "/" or not s.isascii() or not (day + month + year).isdigit():
+        raise ValueError(s)
+    return datetime(int(year), int(month), int(day))
+
+
+# Fast parsers of the formats _parse_clean_date accepts, by name
+_DATE_FAST_PATHS = {"YYYY-MM-DD": _iso_date, "DD/MM/YYYY": _dmy_date}
+
+# Dates used to pick a file's format
+DATE_DETECTION_ROWS = 20
+
+# Parsed date strings remembered per file (re-exports and duplicated days repeat them)
+DATE_MEMO_SIZE = 512
+
+
+class _DateConverter:
+    """
+    Date cell converter of one file. The format is detected once, from the first
+    DATE_DETECTION_ROWS dates (the fast path that parses most of them wins); after that every
+    date goes through that fast path only. A date it can't parse falls back to
+    _parse_clean_date (V1's strptime loop), so results and error messages never change.
+    Recently parsed strings are memoized.
+    """
+
+    __slots__ = ("format", "_fast", "_votes", "_seen", "_memo")
+
+    def __init__(self):
+        self.format: Optional[str] = None
+        self._fast = None
+        self._votes = dict.fromkeys(_DATE_FAST_PATHS, 0)
+        self._seen = 0
+        self._memo: dict[str, datetime] = {}
+
+    def __call__(self, cell: str) -> datetime:
+        s = _clean_cell(cell)
+        parsed = self._memo.get(s)
+        if parsed is not None:
+            return parsed
+
+        parsed = None
+        if self._fast is not None:
+            try:
+                parsed = self._fast(s)
+            except (TypeError, ValueError):
+                pass
+        else:
+            parsed = self._detect(s)
+        if parsed is None:
+            parsed = _parse_clean_date(s)  # per-row fallback: both formats, V1 errors
+
+        if len(self._memo) >= DATE_MEMO_SIZE:
+            self._memo.clear()
+        self._memo[s] = parsed
+        return parsed
+
+    def _detect(self, s: Optional[str]) -> Optional[datetime]:
+        parsed = None
+        for name, fast in _DATE_FAST_PATHS.items():
+            try:
+                parsed = fast(s)
+            except (TypeError, ValueError):
+                continue
+            self._votes[name] += 1
+            break
+
+        self._seen += 1
+        if self._seen >= DATE_DETECTION_ROWS:
+            self.format = max(self._votes, key=self._votes.get)
+            self._fast = _DATE_FAST_PATHS[self.format]
+        return parsed
+
+
+def _absent(s: str) -> None:
+    return None
+
+
+# DailyMetricsInput fields in constructor order, with their cell converter
+# (None for the date: a _DateConverter is made per file)
+_FIELD_CONVERTERS = (
+    ("date", None),
+    ("steps_n", _cell_to_int),
+    ("proteins_g", _cell_to_int),
+    ("kcal_in", _cell_to_int),
+    ("kcal_junk_in", _cell_to_int),
+    ("kcal_out_training", _cell_to_int),
+    ("sleep_hours", _cell_to_float),
+    ("stress_rel", _cell_to_int),
+    ("weight_kg", _cell_to_float),
+    ("waist_cm", _cell_to_float),
+)
+
+
+def _column_positions(header: list[str]) -> dict[str, int]:
+    """
+    Normalized column name -> position of the cell V1 ends up reading for it. Mirrors the
+    DictReader dict + key_map remap, so duplicated (or duplicated-once-normalized) headers
+    resolve to the same cell as in V1.
+    """
+    last_position: dict[str, int] = {}
+    for i, name in enumerate(header):
+        last_position[name] = i  # same key order / values as dict(zip(fieldnames, row))
+    return {_normalize_header(name): i for name, i in last_position.items()}
+
+
+class DI_CsvParserV2(CSVParser_Interface):
+    """
+    Fast path of DI_CsvParserV1, same entities and same error messages (row numbers included).
+
+    Where V1 pays per row, V2 pays once per file:
+    - header positions are resolved once; rows are csv.reader lists, no dict per row, no remap
+    - one converter per DailyMetricsInput field is compiled into a (position, converter) tuple
+      (a missing column becomes a converter that returns None)
+    - invisible characters go in one str.translate, skipped for pure-ASCII cells
+    - blank-row check stops at the first non-empty cell (normally the date)
+    - the date format is detected once per file, then dates are parsed by slicing /
+      fromisoformat instead of trying strptime formats (see _DateConverter)
+    """
+
+    def parse(self, file_bytes: bytes) -> list[DailyMetricsInput]:
+        decoded, delimiter = _decode_and_sniff(file_bytes)
+
+        reader = csv.reader(StringIO(decoded), delimiter=delimiter)
+        header = next(reader, None)
+        if header is None:
+            raise ValueError("CSV appears to have no header row.")
+
+        positions = _column_positions(header)
+        if "date" not in positions:
+            raise ValueError("CSV header must include required column: 'date'")
+
+        parse_date = _DateConverter()
+        converters = tuple(
+            (positions[name], convert or parse_date) if name in positions else (0, _absent)
+            for name, convert in _FIELD_CONVERTERS
+        )
+        # Cells V1 looks at to detect blank rows: every cell, unless duplicated headers hide some
+        header_len = len(header)
+        checked_positions = None if len(positions) == header_len else sorted(positions.values())
+
+        parsed: list[DailyMetricsInput] = []
+        append = parsed.append
+        row_idx = 1
+
+        for cells in reader:
+            if not cells:
+                continue  # DictReader drops these lines without counting them
+            row_idx += 1
+            n = len(cells)
+
+            # Skip rows that are effectively blank
+            if checked_positions is None:
+                candidates = cells
+            else:
+                candidates = [cells[i] for i in checked_positions if i < n] + cells[header_len:]
+            for cell in candidates:
+                if _clean_cell(cell) is not None:
+                    break
+            else:
+                continue
+
+            try:
+                # a short row reads "" past its end (None for a value, "missing" for the date, like V1)
+                entity = DailyMetricsInput(*[convert(cells[i] if i < n else "") for i, convert in converters])
+            except Exception as e:
+                raise ValueError(f"CSV parse error on row {row_idx}: {e}") from e
+
+            append(entity)
+
+        return parsed
@@ -0,0 +1,159 @@
+'''
+Benchmark: /api/kpis read latency while a large CSV upload is being ingested.
+
+Two upload endpoints run the same IngestDailyCSV pipeline:
+    - blocking:  the sync pipeline called directly inside `async def` (the old upload endpoint):
+                 the event loop is stuck until the whole file is parsed, computed and written
+    - offloaded: AsyncIngestDailyCSV (pipeline on a worker thread, the current endpoint)
+
+For each one, a client keeps reading a 30-day KPI range every few ms while one upload runs,
+and the read latencies (p50 / p95 / max) are compared with an idle baseline.
+Everything runs in-process over ASGI (httpx.ASGITransport), against a temporary SQLite file.
+
+Run:
+    python -m benchmarks.bench_concurrency
+    python -m benchmarks.bench_concurrency --upload-days 7300 --interval-ms 5
+'''
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import statistics
+import tempfile
+import time
+from pathlib import Path
+from typing import Optional
+
+import httpx
+from fastapi import Depends, FastAPI, UploadFile, File
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.api.routers import kpis
+from app.business.use_cases import AsyncIngestDailyCSV, IngestDailyCSV
+from app.infrastructure.db.base import Base
+from app.infrastructure.db.repository_impl import (
+    DI_Postgres_CheckpointRepository,
+    DI_Postgres_InputRepository,
+    DI_Postgres_OutputRepository,
+)
+from app.infrastructure.parser.parser_impls import DI_CsvParserV2
+from app.infrastructure.storage.storage_impl import DI_LocalFileStorage
+from benchmarks.bench_kpi_calculator import synthetic_history
+from benchmarks.bench_upsert import make_outputs
+
+_CSV_FIELDS = (
+    "date", "steps_n", "proteins_g", "kcal_in", "kcal_junk_in", "kcal_out_training",
+    "sleep_hours", "stress_rel", "weight_kg", "waist_cm",
+)
+
+
+def make_csv(days: int) -> bytes:
+    lines = [";".join(_CSV_FIELDS)]
+    for r in synthetic_history(days, duplicate_rate=0.0, seed=7):
+        values = [r.date.date().isoformat()] + ["" if getattr(r, f) is None else str(getattr(r, f)) for f in _CSV_FIELDS[1:]]
+        lines.append(";".join(values))
+    return ("\n".join(lines) + "\n").encode()
+
+
+def build_app(session_factory: sessionmaker, storage_dir: Path) -> FastAPI:
+    app = FastAPI()
+    app.include_router(kpis.router, prefix="/api")
+
+    def get_session():
+        with session_factory() as session:
+            yield session
+
+    # Plain Postgres repository: measure the DB read path, not the in-process caches
+    app.dependency_overrides[kpis.get_output_repo] = lambda db=Depends(get_session): DI_Postgres_OutputRepository(db)
+
+    def ingest_use_case(db: Session) -> IngestDailyCSV:
+        return IngestDailyCSV(
+            input_repo=DI_Postgres_InputRepository(db),
+            output_repo=DI_Postgres_OutputRepository(db),
+            file_storage=DI_LocalFileStorage(base_path=str(storage_dir)),
+            parser=DI_CsvParserV2(),
+            checkpoint_repo=DI_Postgres_CheckpointRepository(db),
+        )
+
+    @app.post("/upload-blocking")
+    async def upload_blocking(file: UploadFile = File(...), db: Session = Depends(get_session)):
+        report = ingest_use_case(db).execute(file_bytes=await file.read(), filename="blocking.csv")
+        return {"status": report.status}
+
+    @app.post("/upload-offloaded")
+    async def upload_offloaded(file: UploadFile = File(...), db: Session = Depends(get_session)):
+        use_case = AsyncIngestDailyCSV(ingest=ingest_use_case(db))
+        report = await use_case.execute(file_bytes=await file.read(), filename="offloaded.csv")
+        return {"status": report.status}
+
+    return app
+
+
+async def read_latencies(
+    client: httpx.AsyncClient, until: asyncio.Future, interval: float, params: dict, max_reads: Optional[int] = None
+) -> list[float]:
+    latencies: list[float] = []
+    while not until.done() and (max_reads is None or len(latencies) < max_reads):
+        t0 = time.perf_counter()
+        response = await client.get("/api/kpis/", params=params)
+        response.raise_for_status()
+        latencies.append(time.perf_counter() - t0)
+        await asyncio.sleep(interval)
+    return latencies
+
+
+def summarize(label: str, latencies: list[float], upload_s: Optional[float] = None) -> None:
+    ms = sorted(x * 1000 for x in latencies)
+    p95 = ms[min(len(ms) - 1, int(len(ms) * 0.95))]
+    upload = f"{upload_s * 1000:>10.0f}" if upload_s is not None else f"{'-':>10}"
+    print(f"{label:<10} {upload} {len(ms):>6} {statistics.median(ms):>8.2f} {p95:>8.2f} {ms[-1]:>9.2f}")
+
+
+async def run(args: argparse.Namespace) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{tmp}/bench.db", connect_args={"check_same_thread": False, "timeout": 30})
+        Base.metadata.create_all(engine)
+        session_factory = sessionmaker(bind=engine, autoflush=False, autocommit=False)
+        with session_factory() as session:
+            DI_Postgres_OutputRepository(session).save_output(make_outputs(365))
+
+        # Read range: 30 days inside the seeded KPI year (2000-01-01 onwards)
+        params = {"start_date": "2000-06-01", "end_date": "2000-06-30"}
+        csv_bytes = make_csv(args.upload_days)
+        interval = args.interval_ms / 1000
+
+        app = build_app(session_factory, Path(tmp) / "storage")
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+            print(f"upload: {args.upload_days} days ({len(csv_bytes) / 1024:.0f} KiB CSV), reads every {args.interval_ms} ms")
+            print(f"{'mode':<10} {'upload ms':>10} {'reads':>6} {'p50 ms':>8} {'p95 ms':>8} {'max ms':>9}")
+
+            idle = asyncio.get_running_loop().create_future()
+            summarize("idle", await read_latencies(client, idle, interval, params, max_reads=args.idle_reads))
+
+            for mode in ("blocking", "offloaded"):
+                async def upload() -> float:
+                    t0 = time.perf_counter()
+                    response = await client.post(f"/upload-{mode}", files={"file": ("big.csv", csv_bytes, "text/csv")})
+                    response.raise_for_status()
+                    return time.perf_counter() - t0
+
+                upload_task = asyncio.ensure_future(upload())
+                latencies = await read_latencies(client, upload_task, interval, params)
+                summarize(mode, latencies, await upload_task)
+
+        engine.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--upload-days", type=int, default=5 * 365)
+    parser.add_argument("--interval-ms", type=float, default=5.0)
+    parser.add_argument("--idle-reads", type=int, default=50)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+'''
+Benchmark: CSV parsing throughput, DI_CsvParserV1 vs DI_CsvParserV2.
+
+Parses one synthetic export in the sample format (";" delimiter, DD/MM/YYYY dates,
+decimal commas, BOM, ~10% empty cells, a few blank lines) of --rows rows, --repeat times
+per parser, and reports the best wall time and rows/s. Both parsers must return the same
+entities, otherwise the benchmark fails.
+
+Run:
+    python -m benchmarks.bench_csv_parser                  # 100k rows
+    python -m benchmarks.bench_csv_parser --rows 20000 --iso-dates
+'''
+
+from __future__ import annotations
+
+import argparse
+import random
+import time
+from datetime import date, timedelta
+
+from app.infrastructure.parser.parser_impls import DI_CsvParserV1, DI_CsvParserV2
+
+HEADER = "date;steps_n;proteins_g;kcal_in;kcal_junk_in;kcal_out_training;sleep_hours;stress_rel;weight_kg;waist_cm"
+
+
+def make_csv(rows: int, *, iso_dates: bool = False, seed: int = 7) -> bytes:
+    rng = random.Random(seed)
+
+    def maybe(value: str) -> str:
+        return "" if rng.random() < 0.1 else value
+
+    lines = ["﻿" + HEADER]
+    day = date(1900, 1, 1)
+    for i in range(rows):
+        if i % 1000 == 999:
+            lines.append("")
+        stamp = day.isoformat() if iso_dates else day.strftime("%d/%m/%Y")
+        lines.append(";".join((
+            stamp,
+            maybe(str(rng.randint(2_000, 20_000))),
+            maybe(str(rng.randint(60, 200))),
+            maybe(str(rng.randint(1_500, 3_200))),
+            maybe(str(rng.randint(0, 800))),
+            maybe(str(rng.randint(0, 900))),
+            maybe(f"{rng.uniform(4, 9):.1f}".replace(".", ",")),
+            maybe(str(rng.randint(1, 10))),
+            maybe(f"{rng.uniform(70, 90):.1f}".replace(".", ",")),
+            maybe(f"{rng.uniform(80, 100):.1f}".replace(".", ",")),
+        )))
+        day += timedelta(days=1)
+    return "\n".join(lines).encode("utf-8")
+
+
+def best_time(parse, file_bytes: bytes, repeat: int) -> tuple[float, list]:
+    best, result = float("inf"), []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        result = parse(file_bytes)
+        best = min(best, time.perf_counter() - t0)
+    return best, result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--iso-dates", action="store_true", help="YYYY-MM-DD dates instead of DD/MM/YYYY")
+    args = parser.parse_args()
+
+    file_bytes = make_csv(args.rows, iso_dates=args.iso_dates)
+    print(f"rows: {args.rows}  size: {len(file_bytes) / 1e6:.1f} MB  dates: {'ISO' if args.iso_dates else 'DD/MM/YYYY'}")
+    print(f"{'parser':<16} {'best s':>8} {'rows/s':>12} {'speedup':>8}")
+
+    baseline, reference = None, None
+    for name, impl in (("DI_CsvParserV1", DI_CsvParserV1()), ("DI_CsvParserV2", DI_CsvParserV2())):
+        seconds, parsed = best_time(impl.parse, file_bytes, args.repeat)
+        if reference is None:
+            baseline, reference = seconds, parsed
+        elif parsed != reference:
+            raise SystemExit(f"{name} output differs from DI_CsvParserV1")
+        print(f"{name:<16} {seconds:>8.3f} {len(parsed) / seconds:>12,.0f} {baseline / seconds:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
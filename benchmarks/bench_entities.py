@@ -0,0 +1,93 @@
+'''
+Benchmark: memory / allocations of a 10-year history in each in-memory representation.
+
+    - dict:   plain dataclasses with a per-instance __dict__ (what the entities used to be)
+    - slots:  the current slotted DailyMetricsInput / DailyKPIsOutput
+    - series: MetricsSeries / KPISeries (one typed array + null mask per field)
+
+For each one: bytes still allocated once the history is built, number of live memory
+blocks (≈ Python objects) and build time, measured with tracemalloc.
+Entity rows share their field values with the source rows, so their numbers are a lower
+bound: rows read from the DB also pay for one boxed int/float per field.
+
+Run:
+    python -m benchmarks.bench_entities
+    python -m benchmarks.bench_entities --years 20
+'''
+
+from __future__ import annotations
+
+import argparse
+import gc
+import time
+import tracemalloc
+from dataclasses import field, fields, make_dataclass
+from typing import Any, Callable
+
+from app.domain.entities import DailyKPIsOutput, DailyMetricsInput
+from app.domain.series import KPISeries, MetricsSeries
+from benchmarks.bench_upsert import make_inputs, make_outputs
+
+
+def _dict_twin(entity: type) -> type:
+    """Same fields as `entity`, but a regular (non-slotted) dataclass."""
+    return make_dataclass(
+        f"{entity.__name__}Dict",
+        [(f.name, f.type, field(default=f.default, default_factory=f.default_factory)) for f in fields(entity)],
+    )
+
+
+DictMetricsInput = _dict_twin(DailyMetricsInput)
+DictKPIsOutput = _dict_twin(DailyKPIsOutput)
+
+
+def measure(build: Callable[[], Any]) -> tuple[int, int, float]:
+    """(bytes, blocks, ms) retained by whatever build() returns."""
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+
+    t0 = time.perf_counter()
+    result = build()
+    elapsed_ms = (time.perf_counter() - t0) * 1000
+
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+
+    stats = after.compare_to(before, "filename")
+    size = sum(s.size_diff for s in stats)
+    blocks = sum(s.count_diff for s in stats)
+    del result
+    return size, blocks, elapsed_ms
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--years", type=int, default=10)
+    args = parser.parse_args()
+
+    days = args.years * 365
+    inputs = make_inputs(days)
+    outputs = make_outputs(days)
+
+    def as_dict(entity: type, rows: list) -> list:
+        return [entity(**{f.name: getattr(r, f.name) for f in fields(r)}) for r in rows]
+
+    cases = [
+        ("inputs", "dict", lambda: as_dict(DictMetricsInput, inputs)),
+        ("inputs", "slots", lambda: as_dict(DailyMetricsInput, inputs)),
+        ("inputs", "series", lambda: MetricsSeries.from_entities(inputs)),
+        ("kpis", "dict", lambda: as_dict(DictKPIsOutput, outputs)),
+        ("kpis", "slots", lambda: as_dict(DailyKPIsOutput, outputs)),
+        ("kpis", "series", lambda: KPISeries.from_entities(outputs)),
+    ]
+
+    print(f"{days} days ({args.years} years)")
+    print(f"{'data':<7} {'repr':<7} {'KiB':>9} {'bytes/day':>10} {'blocks':>9} {'build ms':>9}")
+    for kind, name, build in cases:
+        size, blocks, ms = measure(build)
+        print(f"{kind:<7} {name:<7} {size / 1024:>9.1f} {size / days:>10.1f} {blocks:>9} {ms:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,413 @@
+'''
+Benchmark suite: compute_daily_kpis (every backend) on synthetic multi-year histories.
+
+Each case is a deterministic synthetic history (same seed -> same records) from 30 days
+to 20 years, with configurable gap / duplicate / missing-value rates. For every
+(case, backend) pair it measures:
+    - time_ms:    median wall time over --repeat runs (min_ms: the best one)
+    - noise:      run-to-run spread of those runs, (q3 - q1) / median
+    - peak_kib:   peak traced memory during one run (tracemalloc)
+    - blocks:     memory blocks still held by the result (≈ Python objects allocated for it)
+
+Results are written as JSON. A later run can be compared with a saved baseline and the
+process exits with status 1 when a case got slower / bigger than the allowed ratio,
+so it can gate a CI job. Pure stdlib (+ NumPy for the numpy backends), runs offline.
+
+The time gate compares medians, not best runs (one lucky baseline run made unchanged code
+fail by x1.4-1.8), and widens each case's ratio by the noise measured in both runs.
+A flagged case is re-measured (--confirm times) and only reported if it stays slower:
+a load spike on a shared box hits one measurement, a real regression hits all of them.
+--self-check runs the suite twice and compares the second run with the first: on unchanged
+code it must pass, otherwise the gate is too noisy on this machine (raise --repeat).
+
+Run:
+    python -m benchmarks.bench_kpi_calculator                                   # print only
+    python -m benchmarks.bench_kpi_calculator --save benchmarks/results/baseline.json
+    python -m benchmarks.bench_kpi_calculator --baseline benchmarks/results/baseline.json
+    python -m benchmarks.bench_kpi_calculator --quick --backends python,numpy --gap-rate 0.2
+    python -m benchmarks.bench_kpi_calculator --self-check
+
+Baselines are machine-specific: save and compare on the same box.
+'''
+
+from __future__ import annotations
+
+import argparse
+import gc
+import json
+import platform
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Callable, Optional
+
+from app.business.kpi_calculator import compute_daily_kpis, compute_kpi_series
+from app.domain.entities import DailyMetricsInput
+from app.domain.series import MetricsSeries
+
+
+@dataclass(frozen=True)
+class Case:
+    name: str
+    days: int
+
+
+CASES = (
+    Case("30d", 30),
+    Case("1y", 365),
+    Case("5y", 5 * 365),
+    Case("20y", 20 * 365),
+)
+
+QUICK_CASES = ("30d", "1y")
+
+# Default regression gates: fail if time / peak memory grow past these ratios
+DEFAULT_MAX_SLOWDOWN = 1.25
+DEFAULT_MAX_MEMORY_GROWTH = 1.25
+
+# Cases faster than this are dominated by timer / scheduler noise: never gated on time
+MIN_GATED_TIME_MS = 5.0
+
+DEFAULT_REPEAT = 15
+
+# The allowed slowdown of a case grows by this many times its measured noise
+NOISE_TOLERANCE_FACTOR = 3.0
+
+# Re-measurements of a flagged case before it is reported (its fastest median is kept)
+DEFAULT_CONFIRM_ATTEMPTS = 2
+
+
+def synthetic_history(
+    days: int,
+    *,
+    gap_rate: float = 0.05,
+    duplicate_rate: float = 0.01,
+    missing_rate: float = 0.10,
+    seed: int = 42,
+) -> list[DailyMetricsInput]:
+    """
+    Deterministic daily history spanning `days` calendar days, sorted by date.
+    - gap_rate:       share of days with no record at all
+    - duplicate_rate: share of recorded days uploaded twice (the second one wins)
+    - missing_rate:   share of individual values left as None
+    """
+    rng = random.Random(seed)
+    first = datetime(2000, 1, 1, tzinfo=timezone.utc)
+
+    def maybe(value):
+        return None if rng.random() < missing_rate else value
+
+    weight, waist = 85.0, 95.0
+    records: list[DailyMetricsInput] = []
+    for i in range(days):
+        weight += rng.uniform(-0.3, 0.28)
+        waist += rng.uniform(-0.2, 0.19)
+        if rng.random() < gap_rate:
+            continue
+
+        copies = 2 if rng.random() < duplicate_rate else 1
+        for _ in range(copies):
+            records.append(
+                DailyMetricsInput(
+                    date=first + timedelta(days=i),
+                    steps_n=maybe(rng.randint(2_000, 18_000)),
+                    proteins_g=maybe(rng.randint(60, 200)),
+                    kcal_in=maybe(rng.randint(1_400, 3_200)),
+                    kcal_junk_in=maybe(rng.randint(0, 800)),
+                    kcal_out_training=maybe(rng.randint(0, 900)),
+                    sleep_hours=maybe(round(rng.uniform(5, 9), 1)),
+                    stress_rel=maybe(rng.randint(1, 10)),
+                    weight_kg=maybe(round(weight, 1)),
+                    waist_cm=maybe(round(waist, 1)),
+                )
+            )
+    return records
+
+
+def _series_backend(records: list[DailyMetricsInput], start: date, end: date) -> Any:
+    return compute_kpi_series(MetricsSeries.from_entities(records), start=start, end=end)
+
+
+# Backend name -> callable(records, start, end). New backends only need an entry here.
+BACKENDS: dict[str, Callable[[list[DailyMetricsInput], date, date], Any]] = {
+    "python": lambda records, start, end: compute_daily_kpis(records, start=start, end=end, backend="python"),
+    "numpy": lambda records, start, end: compute_daily_kpis(records, start=start, end=end, backend="numpy"),
+    "python+windows": lambda records, start, end: compute_daily_kpis(
+        records, start=start, end=end, windows=(14, 28, 90), backend="python"
+    ),
+    "numpy+windows": lambda records, start, end: compute_daily_kpis(
+        records, start=start, end=end, windows=(14, 28, 90), backend="numpy"
+    ),
+    "series": _series_backend,
+}
+
+
+def measure(run: Callable[[], Any], repeat: int) -> dict[str, float]:
+    # Timing runs without tracemalloc (it slows allocations down a lot)
+    times = []
+    for _ in range(repeat):
+        gc.collect()
+        t0 = time.perf_counter()
+        run()
+        times.append(time.perf_counter() - t0)
+    median = statistics.median(times)
+    if len(times) >= 4:
+        q1, _, q3 = statistics.quantiles(times, n=4)
+        noise = (q3 - q1) / median
+    else:
+        noise = (max(times) - min(times)) / median
+
+    # One traced run for memory
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    result = run()
+    _, peak = tracemalloc.get_traced_memory()
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    blocks = sum(s.count_diff for s in after.compare_to(before, "filename"))
+    del result
+
+    return {
+        "time_ms": median * 1000,
+        "min_ms": min(times) * 1000,
+        "noise": round(noise, 4),
+        "peak_kib": peak / 1024,
+        "blocks": blocks,
+    }
+
+
+def run_suite(
+    *,
+    cases: tuple[Case, ...],
+    backends: tuple[str, ...],
+    repeat: int,
+    gap_rate: float,
+    duplicate_rate: float,
+    missing_rate: float,
+    seed: int,
+    only: Optional[set[str]] = None,
+) -> dict[str, Any]:
+    """Measure every (case, backend) pair, or only the "case/backend" keys in `only`."""
+    results: dict[str, dict[str, float]] = {}
+    for case in cases:
+        keys = [f"{case.name}/{backend}" for backend in backends]
+        if only is not None and not only.intersection(keys):
+            continue
+        records = synthetic_history(
+            case.days, gap_rate=gap_rate, duplicate_rate=duplicate_rate, missing_rate=missing_rate, seed=seed
+        )
+        start, end = records[0].date.date(), records[-1].date.date()
+        for key, backend in zip(keys, backends):
+            if only is not None and key not in only:
+                continue
+            fn = BACKENDS[backend]
+            results[key] = measure(lambda: fn(records, start, end), repeat)
+
+    return {
+        "meta": {
+            "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "machine": platform.machine(),
+            "params": {
+                "timing": "median",
+                "repeat": repeat,
+                "gap_rate": gap_rate,
+                "duplicate_rate": duplicate_rate,
+                "missing_rate": missing_rate,
+                "seed": seed,
+            },
+        },
+        "results": results,
+    }
+
+
+def _case_regressions(
+    key: str, now: dict[str, float], before: dict[str, float], max_slowdown: float, max_memory_growth: float
+) -> list[str]:
+    regressions: list[str] = []
+    noise = max(before.get("noise", 0.0), now.get("noise", 0.0))
+    allowed = max_slowdown * (1 + NOISE_TOLERANCE_FACTOR * noise)
+    if before["time_ms"] >= MIN_GATED_TIME_MS and now["time_ms"] > before["time_ms"] * allowed:
+        regressions.append(
+            f"{key}: time {before['time_ms']:.2f} -> {now['time_ms']:.2f} ms "
+            f"(x{now['time_ms'] / before['time_ms']:.2f} > x{allowed:.2f})"
+        )
+    if before["peak_kib"] > 0 and now["peak_kib"] > before["peak_kib"] * max_memory_growth:
+        regressions.append(
+            f"{key}: peak memory {before['peak_kib']:.0f} -> {now['peak_kib']:.0f} KiB "
+            f"(x{now['peak_kib'] / before['peak_kib']:.2f} > x{max_memory_growth})"
+        )
+    return regressions
+
+
+def compare(
+    current: dict[str, Any],
+    baseline: dict[str, Any],
+    *,
+    max_slowdown: float = DEFAULT_MAX_SLOWDOWN,
+    max_memory_growth: float = DEFAULT_MAX_MEMORY_GROWTH,
+) -> list[str]:
+    """
+    Regression messages for every case present in both runs (empty list = pass).
+    Time: median vs median, allowed up to max_slowdown * (1 + NOISE_TOLERANCE_FACTOR * noise),
+    noise being the larger of the two runs' spreads for that case.
+    """
+    regressions: list[str] = []
+    for key, now in current["results"].items():
+        before = baseline["results"].get(key)
+        if before is not None:
+            regressions.extend(_case_regressions(key, now, before, max_slowdown, max_memory_growth))
+    return regressions
+
+
+def confirm(
+    current: dict[str, Any],
+    baseline: dict[str, Any],
+    remeasure: Callable[[set[str]], dict[str, Any]],
+    *,
+    attempts: int = DEFAULT_CONFIRM_ATTEMPTS,
+    max_slowdown: float = DEFAULT_MAX_SLOWDOWN,
+    max_memory_growth: float = DEFAULT_MAX_MEMORY_GROWTH,
+) -> list[str]:
+    """
+    compare(), after re-measuring the flagged cases up to `attempts` times.
+    `remeasure(keys)` returns a report of those keys only; each case keeps its fastest
+    median in `current`, so only cases slower in every attempt are reported.
+    """
+    for _ in range(attempts):
+        flagged = {
+            key for key, now in current["results"].items()
+            if key in baseline["results"]
+            and _case_regressions(key, now, baseline["results"][key], max_slowdown, max_memory_growth)
+        }
+        if not flagged:
+            break
+        for key, again in remeasure(flagged)["results"].items():
+            if again["time_ms"] < current["results"][key]["time_ms"]:
+                current["results"][key] = again
+    return compare(current, baseline, max_slowdown=max_slowdown, max_memory_growth=max_memory_growth)
+
+
+def _print_table(report: dict[str, Any], baseline: Optional[dict[str, Any]]) -> None:
+    print(f"{'case':<22} {'time ms':>10} {'noise':>7} {'peak KiB':>10} {'blocks':>9} {'vs base':>8}")
+    for key, r in report["results"].items():
+        ratio = ""
+        if baseline is not None and key in baseline["results"]:
+            ratio = f"x{r['time_ms'] / baseline['results'][key]['time_ms']:.2f}"
+        noise = f"{r.get('noise', 0.0):.0%}"
+        print(f"{key:<22} {r['time_ms']:>10.2f} {noise:>7} {r['peak_kib']:>10.0f} {r['blocks']:>9} {ratio:>8}")
+
+
+def self_check(
+    suite: Callable[[Optional[set[str]]], dict[str, Any]],
+    *,
+    attempts: int = DEFAULT_CONFIRM_ATTEMPTS,
+    max_slowdown: float = DEFAULT_MAX_SLOWDOWN,
+    max_memory_growth: float = DEFAULT_MAX_MEMORY_GROWTH,
+) -> tuple[dict[str, Any], dict[str, Any], list[str]]:
+    """
+    Run `suite` twice and gate the second run against the first as if it were a saved baseline
+    (same compare + confirm as --baseline). `suite(only)` measures the keys in `only`, or all if None.
+    Nothing changed in between, so any regression reported is noise the gate failed to absorb.
+    Returns (baseline, rerun, regressions).
+    """
+    baseline = suite(None)
+    rerun = suite(None)
+    regressions = confirm(
+        rerun, baseline, suite, attempts=attempts, max_slowdown=max_slowdown, max_memory_growth=max_memory_growth
+    )
+    return baseline, rerun, regressions
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--quick", action="store_true", help=f"only the {', '.join(QUICK_CASES)} cases")
+    parser.add_argument("--backends", default=",".join(BACKENDS), help="comma-separated backend names")
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT)
+    parser.add_argument("--gap-rate", type=float, default=0.05)
+    parser.add_argument("--duplicate-rate", type=float, default=0.01)
+    parser.add_argument("--missing-rate", type=float, default=0.10)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--save", type=Path, help="write the results JSON here")
+    parser.add_argument("--baseline", type=Path, help="compare with this results JSON, exit 1 on regression")
+    parser.add_argument("--max-slowdown", type=float, default=DEFAULT_MAX_SLOWDOWN)
+    parser.add_argument("--max-memory-growth", type=float, default=DEFAULT_MAX_MEMORY_GROWTH)
+    parser.add_argument(
+        "--confirm", type=int, default=DEFAULT_CONFIRM_ATTEMPTS, help="re-measurements of a flagged case"
+    )
+    parser.add_argument(
+        "--self-check", action="store_true", help="run twice, exit 1 if the re-run is flagged against the first run"
+    )
+    args = parser.parse_args(argv)
+
+    backends = tuple(b.strip() for b in args.backends.split(",") if b.strip())
+    unknown = [b for b in backends if b not in BACKENDS]
+    if unknown:
+        parser.error(f"unknown backends {unknown} (available: {', '.join(BACKENDS)})")
+
+    cases = tuple(c for c in CASES if not args.quick or c.name in QUICK_CASES)
+
+    def suite(only: Optional[set[str]] = None) -> dict[str, Any]:
+        return run_suite(
+            cases=cases,
+            backends=backends,
+            repeat=args.repeat,
+            gap_rate=args.gap_rate,
+            duplicate_rate=args.duplicate_rate,
+            missing_rate=args.missing_rate,
+            seed=args.seed,
+            only=only,
+        )
+
+    if args.self_check:
+        first, rerun, regressions = self_check(
+            suite, attempts=args.confirm, max_slowdown=args.max_slowdown, max_memory_growth=args.max_memory_growth
+        )
+        _print_table(rerun, first)
+        for message in regressions:
+            print(f"NOISE {message}")
+        if regressions:
+            print("self-check failed: unchanged code was flagged, raise --repeat on this machine")
+            return 1
+        print("self-check passed")
+        return 0
+
+    report = suite()
+
+    baseline = json.loads(args.baseline.read_text()) if args.baseline else None
+    _print_table(report, baseline)
+
+    if args.save:
+        args.save.parent.mkdir(parents=True, exist_ok=True)
+        args.save.write_text(json.dumps(report, indent=2) + "\n")
+        print(f"saved: {args.save}")
+
+    if baseline is not None:
+        if baseline["meta"]["params"] != report["meta"]["params"]:
+            print("warning: baseline was recorded with different parameters")
+        regressions = confirm(
+            report,
+            baseline,
+            suite,
+            attempts=args.confirm,
+            max_slowdown=args.max_slowdown,
+            max_memory_growth=args.max_memory_growth,
+        )
+        for message in regressions:
+            print(f"REGRESSION {message}")
+        if regressions:
+            return 1
+        print("no regressions")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,125 @@
+'''
+Benchmark: per-row cost of a 5-year range read.
+
+    - orm:    the previous read path (ORM instances in the identity map, attribute-by-attribute
+              copy into the domain entity), kept here only for comparison
+    - core:   get_output / get_input (plain Core row tuples -> entities, positional)
+    - series: get_output_series / get_input_series (Core rows -> columnar arrays)
+
+Run:
+    python -m benchmarks.bench_reads                        # in-memory SQLite
+    python -m benchmarks.bench_reads --years 20
+    python -m benchmarks.bench_reads --url postgresql+psycopg://user:pw@host:5433/db
+
+WARNING: with --url the daily_inputs / daily_kpis tables are dropped and recreated.
+'''
+
+from __future__ import annotations
+
+import argparse
+import time
+from datetime import date, datetime, time as dtime, timezone
+from typing import Any, Callable
+
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.domain.entities import DailyKPIsOutput, DailyMetricsInput
+from app.infrastructure.db.base import Base
+from app.infrastructure.db.models import DailyInputORM, DailyKPIORM
+from app.infrastructure.db.repository_impl import DI_Postgres_InputRepository, DI_Postgres_OutputRepository
+from benchmarks.bench_upsert import make_inputs, make_outputs
+
+
+def orm_get_output(session: Session, start: date, end: date) -> list[DailyKPIsOutput]:
+    stmt = select(DailyKPIORM).where(DailyKPIORM.date >= start, DailyKPIORM.date <= end).order_by(DailyKPIORM.date)
+    return [
+        DailyKPIsOutput(
+            date=datetime.combine(row.date, dtime.min, tzinfo=timezone.utc),
+            kcal_out_total=row.kcal_out_total,
+            balance_kcal=row.balance_kcal,
+            balance_7d_average=row.balance_7d_average,
+            protein_per_kg=row.protein_per_kg,
+            healthy_food_pct=row.healthy_food_pct,
+            adherence_steps=row.adherence_steps,
+            weight_7d_avg=row.weight_7d_avg,
+            waist_change_7d=row.waist_change_7d,
+        )
+        for row in session.execute(stmt).scalars().all()
+    ]
+
+
+def orm_get_input(session: Session, start: date, end: date) -> list[DailyMetricsInput]:
+    stmt = select(DailyInputORM).where(DailyInputORM.date >= start, DailyInputORM.date <= end).order_by(DailyInputORM.date)
+    return [
+        DailyMetricsInput(
+            date=datetime.combine(row.date, dtime.min, tzinfo=timezone.utc),
+            steps_n=row.steps_n,
+            proteins_g=row.proteins_g,
+            kcal_in=row.kcal_in,
+            kcal_junk_in=row.kcal_junk_in,
+            kcal_out_training=row.kcal_out_training,
+            sleep_hours=row.sleep_hours,
+            stress_rel=row.stress_rel,
+            weight_kg=row.weight_kg,
+            waist_cm=row.waist_cm,
+        )
+        for row in session.execute(stmt).scalars().all()
+    ]
+
+
+def best_of(session_factory: sessionmaker, read: Callable[[Session], Any], repeat: int) -> tuple[float, int]:
+    """Best wall time (seconds) of `read` in a fresh session, and the row count."""
+    best, rows = float("inf"), 0
+    for _ in range(repeat):
+        with session_factory() as session:
+            t0 = time.perf_counter()
+            result = read(session)
+            best = min(best, time.perf_counter() - t0)
+            rows = len(result)
+    return best, rows
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="sqlite://", help="SQLAlchemy URL (default: in-memory SQLite)")
+    parser.add_argument("--years", type=int, default=5)
+    parser.add_argument("--repeat", type=int, default=7)
+    args = parser.parse_args()
+
+    # StaticPool: one shared connection keeps the in-memory SQLite database alive between sessions
+    engine = create_engine(args.url, poolclass=StaticPool) if args.url == "sqlite://" else create_engine(args.url)
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+    session_factory = sessionmaker(bind=engine, autoflush=False, autocommit=False)
+
+    days = args.years * 365
+    inputs, outputs = make_inputs(days), make_outputs(days)
+    with session_factory() as session:
+        DI_Postgres_InputRepository(session).save_input(inputs)
+        DI_Postgres_OutputRepository(session).save_output(outputs)
+
+    start, end = inputs[0].date.date(), inputs[-1].date.date()
+    start_dt, end_dt = inputs[0].date, inputs[-1].date
+
+    cases = [
+        ("kpis", "orm", lambda s: orm_get_output(s, start, end)),
+        ("kpis", "core", lambda s: DI_Postgres_OutputRepository(s).get_output(start_dt, end_dt)),
+        ("kpis", "series", lambda s: DI_Postgres_OutputRepository(s).get_output_series(start, end)),
+        ("inputs", "orm", lambda s: orm_get_input(s, start, end)),
+        ("inputs", "core", lambda s: DI_Postgres_InputRepository(s).get_input(start, end)),
+        ("inputs", "series", lambda s: DI_Postgres_InputRepository(s).get_input_series(start, end)),
+    ]
+
+    print(f"backend: {engine.dialect.name}, {days} days ({args.years} years), best of {args.repeat}")
+    print(f"{'table':<7} {'path':<7} {'rows':>6} {'total ms':>9} {'us/row':>7}")
+    for table, path, read in cases:
+        seconds, rows = best_of(session_factory, read, args.repeat)
+        print(f"{table:<7} {path:<7} {rows:>6} {seconds * 1000:>9.2f} {seconds * 1e6 / max(rows, 1):>7.2f}")
+
+    engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+'''
+Benchmark: row-by-row ORM upsert vs bulk INSERT ... ON CONFLICT upsert.
+
+Measures DB round trips (cursor executions) and wall time for save_input / save_output
+at 100 / 1,000 / 10,000 rows. Each size runs twice on the same DB:
+    - "insert": every day is new
+    - "update": every day already exists (a re-upload of the same file)
+
+Run:
+    python -m benchmarks.bench_upsert                       # in-memory SQLite
+    python -m benchmarks.bench_upsert --url postgresql+psycopg://user:pw@host:5433/db
+
+WARNING: with --url the daily_inputs / daily_kpis tables are dropped and recreated.
+'''
+
+from __future__ import annotations
+
+import argparse
+import time
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import sessionmaker
+
+from app.domain.entities import DailyKPIsOutput, DailyMetricsInput
+from app.infrastructure.db.base import Base
+from app.infrastructure.db.repository_impl import (
+    DI_Postgres_InputRepository,
+    DI_Postgres_OutputRepository,
+)
+
+SIZES = (100, 1_000, 10_000)
+
+
+def make_inputs(n: int) -> list[DailyMetricsInput]:
+    start = datetime(2000, 1, 1, tzinfo=timezone.utc)
+    return [
+        DailyMetricsInput(
+            date=start + timedelta(days=i),
+            steps_n=8_000 + i % 5_000,
+            proteins_g=120,
+            kcal_in=2_200,
+            kcal_junk_in=300,
+            kcal_out_training=400,
+            sleep_hours=7.0,
+            stress_rel=3,
+            weight_kg=80.0 + (i % 10) / 10,
+            waist_cm=90.0,
+        )
+        for i in range(n)
+    ]
+
+
+def make_outputs(n: int) -> list[DailyKPIsOutput]:
+    start = datetime(2000, 1, 1, tzinfo=timezone.utc)
+    return [
+        DailyKPIsOutput(
+            date=start + timedelta(days=i),
+            kcal_out_total=400.0,
+            balance_kcal=1_800.0,
+            balance_7d_average=1_800.0,
+            protein_per_kg=1.5,
+            healthy_food_pct=86.4,
+            adherence_steps=i % 2,
+            weight_7d_avg=80.5,
+            waist_change_7d=0.0,
+        )
+        for i in range(n)
+    ]
+
+
+class RoundTripCounter:
+    def __init__(self, engine: Engine):
+        self.count = 0
+        event.listen(engine, "before_cursor_execute", self._on_execute)
+
+    def _on_execute(self, conn, cursor, statement, parameters, context, executemany):
+        self.count += 1
+
+
+def run_case(engine: Engine, counter: RoundTripCounter, kind: str, n: int, bulk: bool) -> list[tuple]:
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+    session_factory = sessionmaker(bind=engine, autoflush=False, autocommit=False)
+
+    results = []
+    for phase in ("insert", "update"):
+        with session_factory() as session:
+            if kind == "inputs":
+                repo = DI_Postgres_InputRepository(session, bulk_upsert=bulk)
+                data = make_inputs(n)
+                save = repo.save_input
+            else:
+                repo = DI_Postgres_OutputRepository(session, bulk_upsert=bulk)
+                data = make_outputs(n)
+                save = repo.save_output
+
+            counter.count = 0
+            t0 = time.perf_counter()
+            save(data)
+            elapsed_ms = (time.perf_counter() - t0) * 1000
+
+        results.append((kind, n, "bulk" if bulk else "rowwise", phase, counter.count, elapsed_ms))
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="sqlite://", help="SQLAlchemy URL (default: in-memory SQLite)")
+    args = parser.parse_args()
+
+    engine = create_engine(args.url)
+    counter = RoundTripCounter(engine)
+
+    print(f"backend: {engine.dialect.name}")
+    print(f"{'table':<8} {'rows':>7} {'mode':<8} {'phase':<7} {'round trips':>12} {'wall ms':>10}")
+
+    for kind in ("inputs", "outputs"):
+        for n in SIZES:
+            for bulk in (False, True):
+                for row in run_case(engine, counter, kind, n, bulk):
+                    k, size, mode, phase, trips, ms = row
+                    print(f"{k:<8} {size:>7} {mode:<8} {phase:<7} {trips:>12} {ms:>10.1f}")
+
+    engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
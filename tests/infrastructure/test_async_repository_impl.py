@@ -0,0 +1,64 @@
+# Async repositories against an in-memory SQLite database through aiosqlite
+# (pinned in requirements.txt; production runs psycopg 3 in async mode).
+
+import asyncio
+from datetime import date, datetime, timezone
+
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.pool import StaticPool
+
+from app.domain.entities import DailyKPIsOutput, DailyMetricsInput
+from app.infrastructure.db.async_repository_impl import (
+    DI_AsyncPostgres_InputRepository,
+    DI_AsyncPostgres_OutputRepository,
+)
+from app.infrastructure.db.base import Base
+
+
+def kpi(day: int) -> DailyKPIsOutput:
+    return DailyKPIsOutput(date=datetime(2026, 1, day, tzinfo=timezone.utc), balance_kcal=float(day), adherence_steps=1)
+
+
+async def with_session(scenario):
+    engine = create_async_engine("sqlite+aiosqlite://", poolclass=StaticPool)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    try:
+        async with async_sessionmaker(bind=engine, expire_on_commit=False)() as session:
+            return await scenario(session)
+    finally:
+        await engine.dispose()
+
+
+def test_async_output_repository_roundtrip_pages_and_stream():
+    async def scenario(session):
+        repo = DI_AsyncPostgres_OutputRepository(session)
+        await repo.save_output([kpi(d) for d in range(1, 11)])
+
+        rows = await repo.get_output(datetime(2026, 1, 3, tzinfo=timezone.utc), datetime(2026, 1, 5, tzinfo=timezone.utc))
+        page = await repo.get_output_page(date(2026, 1, 1), date(2026, 1, 31), after=date(2026, 1, 8), limit=5)
+        series = await repo.get_output_series(date(2026, 1, 1), date(2026, 1, 2))
+        batches = [b async for b in repo.iter_output(date(2026, 1, 2), date(2026, 1, 9), batch_size=3)]
+        return rows, page, series, batches
+
+    rows, page, series, batches = asyncio.run(with_session(scenario))
+
+    assert [r.balance_kcal for r in rows] == [3.0, 4.0, 5.0]
+    assert [r.balance_kcal for r in page] == [9.0, 10.0]
+    assert series.column("balance_kcal") == [1.0, 2.0]
+    assert [len(b) for b in batches] == [3, 3, 2]
+
+
+def test_async_input_repository_saves_and_projects():
+    async def scenario(session):
+        repo = DI_AsyncPostgres_InputRepository(session)
+        written = await repo.save_input(
+            [DailyMetricsInput(date=datetime(2026, 1, d, tzinfo=timezone.utc), steps_n=1000 * d, kcal_in=2000) for d in (1, 2)]
+        )
+        rows = await repo.get_input(date(2026, 1, 1), date(2026, 1, 2), columns=("steps_n",))
+        return written, rows
+
+    written, rows = asyncio.run(with_session(scenario))
+
+    assert written == (date(2026, 1, 1), date(2026, 1, 2))
+    assert [(r.steps_n, r.kcal_in) for r in rows] == [(1000, None), (2000, None)]
@@ -0,0 +1,129 @@
+# DI_CsvParserV2 must return exactly what DI_CsvParserV1 returns, and fail with the same messages.
+
+import pytest
+
+from app.infrastructure.parser.parser_impls import DI_CsvParserV1, DI_CsvParserV2
+
+
+HEADER = "date;steps_n;proteins_g;kcal_in;kcal_junk_in;kcal_out_training;sleep_hours;stress_rel;weight_kg;waist_cm"
+
+VALID_FILES = {
+    "sample export": "﻿" + HEADER + "\n18/03/2026;10000;160;2000;3;2;6;1;81;100\n15/03/2026;10000;160;2000;11;8;7;7;83,9;100\n",
+    "comma delimited, iso dates": HEADER.replace(";", ",") + "\n2024-01-01,9000,150,2100,0,300,7.5,3,80.2,91\n2024-01-02,,,,,,,,,\n",
+    "blank and invisible-only rows": HEADER + "\n\n2024-01-01;1;2;3;4;5;6;7;8;9\n;;;;;;;;;\n​;  ;;;;;;;;\n2024-01-03;1;;;;;;;;\n",
+    "invisible characters in cells": HEADER + "\n​2024-01-01⁠; 10 000‍;1‌2;;;;7,25;;80,5﻿;\n".replace("10 000", "10000"),
+    "columns reordered, missing, unknown": "weight_kg;date;extra;steps_n\n80,1;2024-02-01;x;7000\n;2024-02-02;;\n",
+    "short and long rows": HEADER + "\n2024-01-01;5000\n2024-01-02;1;2;3;4;5;6;7;8;9;extra;more\n",
+    "header with spaces and BOM": " date ;﻿steps_n; weight_kg\n2024-03-01;42;70\n",
+    "duplicated headers": "date;steps_n;steps_n; steps_n\n2024-01-01;1;2;3\n2024-01-02;1;;\n",
+    "duplicated date headers hide a cell": "date;date;steps_n\n;;\n2024-01-01;;\nx;2024-01-02;4\n",
+    "header only": HEADER + "\n",
+    "dates V1 accepts but the fast paths don't": "date;steps_n\n05/01/2024;1\n5/1/2024;2\n2024-1-5;3\n2024-01- 7;4\n",
+    "format changes after detection": "date;steps_n\n" + "".join(f"{d:02d}/01/2024;1\n" for d in range(1, 26)) + "2024-02-01;2\n",
+    "duplicated days": "date;steps_n\n" + "2024-01-01;1\n2024-01-02;2\n" * 300,
+}
+
+INVALID_FILES = {
+    "bad int": HEADER + "\n2024-01-01;10000\n2024-01-02;12a\n",
+    "bad float": HEADER + "\n2024-01-01;1;2;3;4;5;6;7;8;9\n\n2024-01-02;1;2;3;4;5;6;7;eighty;9\n",
+    "bad date": HEADER + "\n2024-13-01;1\n",
+    "missing date": HEADER + "\n;1;2\n",
+    "short row without date": "steps_n;date\n5\n",
+    "only an extra cell": HEADER + "\n2024-01-01;1\n;;;;;;;;;;;x\n",
+    "no date column": "day;steps_n\n2024-01-01;1\n",
+    "empty file": "",
+    "blank first line": "\n" + HEADER + "\n2024-01-01;1\n",
+    "signed day": "date;steps_n\n01/01/2024;1\n+1/01/2024;1\n",
+    "space inside day": "date;steps_n\n1 /01/2024;1\n",
+    "non-ASCII digits": "date;steps_n\n٠٥/٠١/٢٠٢٤;1\n",
+    "impossible day after detection": "date;steps_n\n" + "".join(f"2024-01-{d:02d};1\n" for d in range(1, 26)) + "2023-02-29;1\n",
+}
+
+
+@pytest.mark.parametrize("content", VALID_FILES.values(), ids=VALID_FILES.keys())
+def test_same_entities_as_v1(content):
+    file_bytes = content.encode("utf-8")
+    assert DI_CsvParserV2().parse(file_bytes) == DI_CsvParserV1().parse(file_bytes)
+
+
+@pytest.mark.parametrize("content", INVALID_FILES.values(), ids=INVALID_FILES.keys())
+def test_same_errors_as_v1(content):
+    file_bytes = content.encode("utf-8")
+    with pytest.raises(ValueError) as v1_error:
+        DI_CsvParserV1().parse(file_bytes)
+    with pytest.raises(ValueError) as v2_error:
+        DI_CsvParserV2().parse(file_bytes)
+    assert str(v2_error.value) == str(v1_error.value)
+
+
+def test_row_numbers_in_errors():
+    content = HEADER + "\n2024-01-01;1\n\n;;\n2024-01-04;oops\n"
+    with pytest.raises(ValueError, match=r"^CSV parse error on row 4: Invalid int value: 'oops'$"):
+        DI_CsvParserV2().parse(content.encode("utf-8"))
+
+
+def test_not_utf8():
+    with pytest.raises(ValueError, match="UTF-8"):
+        DI_CsvParserV2().parse(HEADER.encode("utf-16"))
+
+
+def test_sample_file(tmp_path):
+    from pathlib import Path
+
+    file_bytes = (Path(__file__).resolve().parents[2] / "samples" / "sample_data.csv").read_bytes()
+    parsed = DI_CsvParserV2().parse(file_bytes)
+    assert parsed and parsed == DI_CsvParserV1().parse(file_bytes)
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_random_files_match_v1(seed):
+    import random
+
+    rng = random.Random(seed)
+    noise = ["", " ", "\u200b", "\u00a0", "\ufeff"]  # blank or invisible-only
+    typed = {
+        "date": ["2024-02-29", "03/04/2025", " 2023-12-31 ", "\u200b01/01/2024"],
+        "int": ["12", " 3 ", "\ufeff42", "1\u2060", "-4", "10000"],
+        "float": ["7,5", "80.25", "6", " 81,3\u00a0"],
+    }
+    kinds = {"date": "date", "sleep_hours": "float", "weight_kg": "float", "waist_cm": "float"}
+
+    header = HEADER.split(";")[1:]
+    rng.shuffle(header)
+    header = header[:rng.randint(0, len(header))]
+    header.insert(rng.randint(0, len(header)), "date")
+    can_truncate = header[-1] != "date"
+    lines = [";".join(header)]
+    for _ in range(200):
+        if rng.random() < 0.05:
+            lines.append(";".join(rng.choice(noise) for _ in header))  # blank row, skipped by both
+            continue
+        row = [
+            rng.choice(noise) if rng.random() < 0.2 and name != "date" else rng.choice(typed[kinds.get(name, "int")])
+            for name in header
+        ]
+        lines.append(";".join(row[:-1] if can_truncate and rng.random() < 0.1 else row))
+    if seed % 4 == 0:
+        lines.insert(rng.randint(2, len(lines)), ";".join(["x"] * len(header)))  # one bad row somewhere
+    file_bytes = "\n".join(lines).encode("utf-8")
+
+    def outcome(parser):
+        try:
+            return parser.parse(file_bytes)
+        except ValueError as e:
+            return str(e)
+
+    assert outcome(DI_CsvParserV2()) == outcome(DI_CsvParserV1())
+
+
+def test_date_format_is_detected_once_per_file():
+    from app.infrastructure.parser import parser_impls
+
+    converter = parser_impls._DateConverter()
+    for d in range(1, parser_impls.DATE_DETECTION_ROWS + 1):
+        converter(f"{d:02d}/03/2026")
+    assert converter.format == "DD/MM/YYYY"
+
+    # ISO still parses (per-row fallback), identical to V1
+    assert converter("2026-03-05") == parser_impls._parse_date("2026-03-05")
+    assert converter("\u200b05/03/2026") == parser_impls._parse_date("05/03/2026")
@@ -0,0 +1,117 @@
+# daily_cumulative on SQLite: kept up to date by the ingest, incrementally, and equal to a full rebuild.
+
+from datetime import date, datetime, timezone
+
+import pytest
+from sqlalchemy import delete
+
+from app.business.use_cases import GetRangeStats, IngestDailyCSV, RefreshCumulativeStats
+from app.infrastructure.db.models import daily_cumulative
+from app.infrastructure.db.repository_impl import (
+    DI_Postgres_CumulativeRepository,
+    DI_Postgres_InputRepository,
+    DI_Postgres_OutputRepository,
+)
+
+from tests.unit.test_kpi_calculator_numpy import make_history
+from tests.use_cases.test_ingest_daily_csv import FakeCSVParser, FakeFileStorage
+
+
+def repos(db_session):
+    return (
+        DI_Postgres_InputRepository(db_session),
+        DI_Postgres_OutputRepository(db_session),
+        DI_Postgres_CumulativeRepository(db_session),
+    )
+
+
+def ingest(db_session, records):
+    input_repo, output_repo, cumulative_repo = repos(db_session)
+    return IngestDailyCSV(
+        input_repo=input_repo,
+        output_repo=output_repo,
+        file_storage=FakeFileStorage(),
+        parser=FakeCSVParser(records),
+        cumulative_repo=cumulative_repo,
+    ).execute(file_bytes=b"csv", filename="upload.csv")
+
+
+def all_stats(db_session, start: date, end: date):
+    return GetRangeStats(cumulative_repo=DI_Postgres_CumulativeRepository(db_session)).execute(
+        datetime(start.year, start.month, start.day, tzinfo=timezone.utc),
+        datetime(end.year, end.month, end.day, tzinfo=timezone.utc),
+    )
+
+
+def test_ingest_keeps_totals_equal_to_a_full_rebuild(db_session):
+    history = make_history(200, seed=9)
+    first, last = history[0].date.date(), history[-1].date.date()
+
+    # Initial load, then a backdated re-upload of some days in the middle with new values
+    assert ingest(db_session, history[:150]).status == "processed"
+    assert ingest(db_session, history[150:]).status == "processed"
+    corrected = [r for r in history[60:70]]
+    for r in corrected:
+        r.steps_n = 12_345
+    assert ingest(db_session, corrected).status == "processed"
+
+    incremental = all_stats(db_session, first, last)
+    incremental_window = all_stats(db_session, date(2015, 3, 1), date(2015, 4, 15))
+
+    # Full rebuild from scratch
+    db_session.execute(delete(daily_cumulative))
+    db_session.commit()
+    input_repo, output_repo, cumulative_repo = repos(db_session)
+    written = RefreshCumulativeStats(input_repo, output_repo, cumulative_repo).execute()
+
+    assert written == (last - first).days + 1
+    for before, after in [(incremental, all_stats(db_session, first, last)),
+                          (incremental_window, all_stats(db_session, date(2015, 3, 1), date(2015, 4, 15)))]:
+        assert before.input_days == after.input_days
+        for name, metric in after.metrics.items():
+            assert before.metrics[name].count == metric.count, name
+            assert before.metrics[name].total == pytest.approx(metric.total, rel=1e-9, abs=1e-6), name
+
+
+class RecordingCumulativeRepository(DI_Postgres_CumulativeRepository):
+    def __init__(self, db_session):
+        super().__init__(db_session)
+        self.saved = []
+
+    def save_cumulative(self, rows):
+        self.saved.extend(rows)
+        super().save_cumulative(rows)
+
+
+def test_next_day_upload_only_writes_its_own_row(db_session):
+    history = make_history(40, seed=4)
+    ingest(db_session, history[:-1])
+    input_repo, output_repo, _ = repos(db_session)
+    cumulative_repo = RecordingCumulativeRepository(db_session)
+
+    IngestDailyCSV(
+        input_repo=input_repo,
+        output_repo=output_repo,
+        file_storage=FakeFileStorage(),
+        parser=FakeCSVParser(history[-1:]),
+        cumulative_repo=cumulative_repo,
+    ).execute(file_bytes=b"csv", filename="upload.csv")
+
+    # Only the new day (plus the calendar days of a gap before it, if any) is written
+    assert cumulative_repo.saved[-1].date == history[-1].date
+    assert cumulative_repo.saved[0].date > history[-2].date
+    assert cumulative_repo.saved[-1].input_days == len({r.date for r in history})
+
+
+def test_range_stats_validation(db_session):
+    use_case = GetRangeStats(cumulative_repo=DI_Postgres_CumulativeRepository(db_session))
+    start, end = datetime(2026, 1, 1, tzinfo=timezone.utc), datetime(2026, 1, 31, tzinfo=timezone.utc)
+
+    with pytest.raises(ValueError):
+        use_case.execute(end, start)
+    with pytest.raises(ValueError):
+        use_case.execute(start, end, metrics=["not_a_column"])
+
+    empty = use_case.execute(start, end, metrics=["weight_kg"])
+    assert empty.days == 31 and empty.input_days == 0
+    assert empty.metrics["weight_kg"].mean is None and empty.metrics["weight_kg"].coverage == 0.0
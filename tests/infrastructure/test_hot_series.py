@@ -0,0 +1,156 @@
+# Hot series store against a real (in-memory SQLite) daily_kpis table.
+
+from datetime import date, datetime, timezone
+
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.domain.entities import DailyKPIsOutput
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.api.routers.kpis import encode_cursor, get_output_repo, router
+from app.infrastructure.cache.hot_series import HotSeriesOutputRepository, HotSeriesStore
+from app.infrastructure.cache.kpi_cache import CachedOutputRepository
+from app.infrastructure.db.base import Base
+from app.infrastructure.db.repository_impl import DI_Postgres_OutputRepository
+
+
+def kpi(day: int, balance: float) -> DailyKPIsOutput:
+    return DailyKPIsOutput(date=datetime(2024, 1, day, tzinfo=timezone.utc), balance_kcal=balance, adherence_steps=1)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture()
+def setup():
+    engine = create_engine("sqlite://", poolclass=StaticPool)
+    Base.metadata.create_all(engine)
+    session_factory = sessionmaker(bind=engine, autoflush=False, autocommit=False)
+    statements = []
+    event.listen(engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+
+    with session_factory() as session:
+        DI_Postgres_OutputRepository(session).save_output([kpi(d, float(d)) for d in range(1, 11)])
+
+    clock = FakeClock()
+    store = HotSeriesStore(session_factory, check_interval=30, clock=clock)
+
+    def repo(session):
+        return HotSeriesOutputRepository(DI_Postgres_OutputRepository(session), store)
+
+    yield session_factory, store, clock, statements, repo
+    engine.dispose()
+
+
+def test_warm_store_answers_without_sql(setup):
+    session_factory, store, clock, statements, repo = setup
+    assert store.load()
+    statements.clear()
+
+    with session_factory() as session:
+        series = repo(session).get_output_series(date(2024, 1, 3), date(2024, 1, 5))
+        rows = repo(session).get_output(
+            datetime(2024, 1, 9, tzinfo=timezone.utc), datetime(2024, 1, 20, tzinfo=timezone.utc)
+        )
+
+    assert statements == []
+    assert series.column("balance_kcal") == [3.0, 4.0, 5.0]
+    assert [r.balance_kcal for r in rows] == [9.0, 10.0]
+
+
+def test_cold_store_falls_back_to_postgres_then_loads(setup):
+    session_factory, store, clock, statements, repo = setup
+
+    with session_factory() as session:
+        series = repo(session).get_output_series(date(2024, 1, 1), date(2024, 1, 2))
+
+    assert series.column("balance_kcal") == [1.0, 2.0]
+    assert store.loaded
+
+
+def test_own_writes_are_applied_incrementally(setup):
+    session_factory, store, clock, statements, repo = setup
+    store.load()
+
+    with session_factory() as session:
+        repo(session).save_output([kpi(5, -5.0), kpi(12, 12.0)])
+    clock.now = 100  # past the check interval: fingerprint must still match
+
+    assert store.is_fresh()
+    assert store.get_series(date(2024, 1, 4), date(2024, 1, 12)).column("balance_kcal") == [
+        4.0, -5.0, 6.0, 7.0, 8.0, 9.0, 10.0, 12.0,
+    ]
+
+
+def test_foreign_write_is_detected_at_next_check(setup):
+    session_factory, store, clock, statements, repo = setup
+    store.load()
+
+    # another process writes directly to Postgres
+    with session_factory() as session:
+        DI_Postgres_OutputRepository(session).save_output([kpi(3, 333.0)])
+
+    assert store.is_fresh()  # within the check interval: not checked yet
+    clock.now = 31
+
+    with session_factory() as session:
+        series = repo(session).get_output_series(date(2024, 1, 3), date(2024, 1, 3))
+
+    assert series.column("balance_kcal") == [333.0]  # served by Postgres, store reloaded
+    assert store.get_series(date(2024, 1, 3), date(2024, 1, 3)).column("balance_kcal") == [333.0]
+
+
+def test_warm_store_serves_keyset_pages(setup):
+    session_factory, store, clock, statements, repo = setup
+    assert store.load()
+    statements.clear()
+
+    with session_factory() as session:
+        page = repo(session).get_output_page(date(2024, 1, 2), date(2024, 1, 9), after=date(2024, 1, 4), limit=3)
+        expected = DI_Postgres_OutputRepository(session).get_output_page(
+            date(2024, 1, 2), date(2024, 1, 9), after=date(2024, 1, 4), limit=3
+        )
+
+    assert [k.balance_kcal for k in page] == [5.0, 6.0, 7.0]
+    assert page == expected
+    assert len(statements) == 1  # only the direct repository read
+
+
+def test_cursor_at_the_last_representable_day_returns_an_empty_page(setup):
+    session_factory, store, clock, statements, repo = setup
+    assert store.load()
+    app = FastAPI()
+    app.include_router(router)
+
+    with session_factory() as session:
+        app.dependency_overrides[get_output_repo] = lambda: repo(session)
+        resp = TestClient(app).get(
+            "/kpis/", params={"start_date": "2024-01-01", "end_date": "9999-12-31", "cursor": encode_cursor(date.max)}
+        )
+
+    assert resp.status_code == 200
+    assert resp.json() == []
+
+
+def test_one_read_layer_wraps_the_repository(monkeypatch):
+    monkeypatch.delenv("KPI_ARCHIVE_DIR", raising=False)
+
+    # Default: the hot store only, no range cache underneath that a warm store would never hit
+    monkeypatch.delenv("KPI_HOT_STORE", raising=False)
+    repo = get_output_repo(db=None)
+    assert isinstance(repo, HotSeriesOutputRepository)
+    assert isinstance(repo._inner, DI_Postgres_OutputRepository)
+
+    monkeypatch.setenv("KPI_HOT_STORE", "0")
+    repo = get_output_repo(db=None)
+    assert isinstance(repo, CachedOutputRepository)
+    assert isinstance(repo._inner, DI_Postgres_OutputRepository)
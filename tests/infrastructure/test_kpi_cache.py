@@ -0,0 +1,144 @@
+from datetime import date, datetime, timedelta, timezone
+
+from app.domain.entities import DailyKPIsOutput
+from app.infrastructure.cache.kpi_cache import CachedOutputRepository, KPIRangeCache
+
+
+def dt(day: date) -> datetime:
+    return datetime(day.year, day.month, day.day, tzinfo=timezone.utc)
+
+
+class CountingOutputRepository:
+    """In-memory 'DB' recording every range it is asked for."""
+
+    def __init__(self, days: list[date]):
+        self.rows = {d: DailyKPIsOutput(date=dt(d), balance_kcal=float(d.day)) for d in days}
+        self.reads: list[tuple[date, date]] = []
+
+    def get_output(self, start, end):
+        self.reads.append((start.date(), end.date()))
+        return [self.rows[d] for d in sorted(self.rows) if start.date() <= d <= end.date()]
+
+    def save_output(self, output_data):
+        for kpi in output_data:
+            self.rows[kpi.date.date()] = kpi
+
+
+def days(first: int, last: int) -> list[date]:
+    return [date(2024, 1, d) for d in range(first, last + 1)]
+
+
+def test_overlapping_ranges_only_fetch_missing_days():
+    inner = CountingOutputRepository(days(1, 31))
+    repo = CachedOutputRepository(inner, KPIRangeCache())
+
+    repo.get_output(dt(date(2024, 1, 10)), dt(date(2024, 1, 20)))
+    rows = repo.get_output(dt(date(2024, 1, 5)), dt(date(2024, 1, 25)))
+
+    assert [r.date.day for r in rows] == list(range(5, 26))
+    assert inner.reads == [
+        (date(2024, 1, 10), date(2024, 1, 20)),
+        (date(2024, 1, 5), date(2024, 1, 9)),
+        (date(2024, 1, 21), date(2024, 1, 25)),
+    ]
+
+    repo.get_output(dt(date(2024, 1, 6)), dt(date(2024, 1, 24)))
+    assert len(inner.reads) == 3  # fully cached
+
+
+def test_days_without_rows_are_cached_as_empty():
+    inner = CountingOutputRepository([date(2024, 1, 2)])
+    repo = CachedOutputRepository(inner, KPIRangeCache())
+
+    assert len(repo.get_output(dt(date(2024, 1, 1)), dt(date(2024, 1, 3)))) == 1
+    assert len(repo.get_output(dt(date(2024, 1, 1)), dt(date(2024, 1, 3)))) == 1
+    assert len(inner.reads) == 1
+
+
+def test_save_output_invalidates_exactly_the_written_days():
+    inner = CountingOutputRepository(days(1, 10))
+    cache = KPIRangeCache()
+    repo = CachedOutputRepository(inner, cache)
+    repo.get_output(dt(date(2024, 1, 1)), dt(date(2024, 1, 10)))
+
+    repo.save_output([DailyKPIsOutput(date=dt(date(2024, 1, 4)), balance_kcal=-1.0)])
+    rows = repo.get_output(dt(date(2024, 1, 1)), dt(date(2024, 1, 10)))
+
+    assert inner.reads[-1] == (date(2024, 1, 4), date(2024, 1, 4))
+    assert rows[3].balance_kcal == -1.0
+    assert cache.stats()["invalidations"] == 1
+
+
+def test_returned_rows_are_copies():
+    inner = CountingOutputRepository(days(1, 3))
+    repo = CachedOutputRepository(inner, KPIRangeCache())
+
+    repo.get_output(dt(date(2024, 1, 1)), dt(date(2024, 1, 3)))[0].balance_kcal = 999.0
+
+    assert repo.get_output(dt(date(2024, 1, 1)), dt(date(2024, 1, 3)))[0].balance_kcal == 1.0
+
+
+def test_lru_bound_and_counters():
+    inner = CountingOutputRepository(days(1, 31))
+    cache = KPIRangeCache(max_days=10)
+    repo = CachedOutputRepository(inner, cache)
+
+    repo.get_output(dt(date(2024, 1, 1)), dt(date(2024, 1, 8)))   # 8 misses
+    repo.get_output(dt(date(2024, 1, 1)), dt(date(2024, 1, 8)))   # 8 hits
+    repo.get_output(dt(date(2024, 1, 20)), dt(date(2024, 1, 24)))  # 5 misses, evicts 3 oldest
+
+    stats = cache.stats()
+    assert stats == {**stats, "cached_days": 10, "hits": 8, "misses": 13, "evictions": 3}
+    assert cache.missing_ranges(date(2024, 1, 1), date(2024, 1, 8)) == [(date(2024, 1, 1), date(2024, 1, 3))]
+
+
+def test_range_larger_than_cache_still_answers_from_db():
+    inner = CountingOutputRepository(days(1, 31))
+    repo = CachedOutputRepository(inner, KPIRangeCache(max_days=5))
+
+    assert len(repo.get_output(dt(date(2024, 1, 1)), dt(date(2024, 1, 31)))) == 31
+
+
+def test_stale_fill_after_concurrent_write_is_dropped():
+    cache = KPIRangeCache()
+    version = cache.version
+    cache.invalidate([date(2024, 1, 1)])  # a write lands while a read is in flight
+
+    cache.put_range(date(2024, 1, 1), date(2024, 1, 1), [], version=version)
+
+    assert cache.missing_ranges(date(2024, 1, 1), date(2024, 1, 1)) == [(date(2024, 1, 1), date(2024, 1, 1))]
+
+
+def test_disabled_cache_passes_through():
+    inner = CountingOutputRepository(days(1, 3))
+    repo = CachedOutputRepository(inner, KPIRangeCache(max_days=0))
+
+    repo.get_output(dt(date(2024, 1, 1)), dt(date(2024, 1, 3)))
+    repo.get_output(dt(date(2024, 1, 1)), dt(date(2024, 1, 3)))
+
+    assert len(inner.reads) == 2
+
+
+def test_range_ending_at_the_last_representable_day():
+    inner = CountingOutputRepository([date(9999, 12, 30), date(9999, 12, 31)])
+    repo = CachedOutputRepository(inner, KPIRangeCache())
+
+    first = repo.get_output(dt(date(9999, 12, 1)), dt(date.max))
+    again = repo.get_output(dt(date(9999, 12, 1)), dt(date.max))
+
+    assert [r.date.day for r in first] == [r.date.day for r in again] == [30, 31]
+    assert len(inner.reads) == 1
+
+
+def test_range_longer_than_the_cache_bypasses_it():
+    inner = CountingOutputRepository(days(1, 31))
+    cache = KPIRangeCache(max_days=60)
+    repo = CachedOutputRepository(inner, cache)
+    repo.get_output(dt(date(2024, 1, 1)), dt(date(2024, 1, 10)))
+
+    rows = repo.get_output(dt(date(1000, 1, 1)), dt(date(2999, 12, 31)))
+
+    assert len(rows) == 31
+    assert inner.reads[-1] == (date(1000, 1, 1), date(2999, 12, 31))
+    assert cache.stats()["cached_days"] == 10  # nothing added, nothing evicted
+    assert cache.stats()["evictions"] == 0
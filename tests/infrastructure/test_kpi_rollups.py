@@ -0,0 +1,110 @@
+# kpi_rollups on SQLite: kept up to date by the ingest for the touched periods only, equal to a full rebuild.
+
+from datetime import date, datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import delete
+
+from app.business.use_cases import GetKPIRollups, IngestDailyCSV, RefreshKPIRollups
+from app.infrastructure.db.models import kpi_rollups
+from app.infrastructure.db.repository_impl import (
+    DI_Postgres_InputRepository,
+    DI_Postgres_OutputRepository,
+    DI_Postgres_RollupRepository,
+)
+
+from tests.unit.test_kpi_calculator_numpy import make_history
+from tests.use_cases.test_ingest_daily_csv import FakeCSVParser, FakeFileStorage
+
+
+class RecordingRollupRepository(DI_Postgres_RollupRepository):
+    def __init__(self, db_session):
+        super().__init__(db_session)
+        self.saved = []
+        self.reads = 0
+
+    def get_rollups(self, granularity, start, end):
+        self.reads += 1
+        return super().get_rollups(granularity, start, end)
+
+    def save_rollups(self, rows):
+        self.saved.append(rows)
+        super().save_rollups(rows)
+
+
+def ingest(db_session, records, rollup_repo=None):
+    return IngestDailyCSV(
+        input_repo=DI_Postgres_InputRepository(db_session),
+        output_repo=DI_Postgres_OutputRepository(db_session),
+        file_storage=FakeFileStorage(),
+        parser=FakeCSVParser(records),
+        rollup_repo=rollup_repo or DI_Postgres_RollupRepository(db_session),
+    ).execute(file_bytes=b"csv", filename="upload.csv")
+
+
+def all_rollups(db_session):
+    repo = DI_Postgres_RollupRepository(db_session)
+    return {g: repo.get_rollups(g, date.min, date.max) for g in ("week", "month")}
+
+
+def test_ingest_keeps_rollups_equal_to_a_full_rebuild(db_session):
+    history = make_history(200, seed=4)
+
+    # Initial load (empty table: everything is built), a later upload, then a backdated correction
+    assert ingest(db_session, history[:150]).status == "processed"
+    assert ingest(db_session, history[150:]).status == "processed"
+    corrected = history[60:66]
+    for r in corrected:
+        r.steps_n = 2_000
+    assert ingest(db_session, corrected).status == "processed"
+    incremental = all_rollups(db_session)
+
+    db_session.execute(delete(kpi_rollups))
+    db_session.commit()
+    RefreshKPIRollups(DI_Postgres_OutputRepository(db_session), DI_Postgres_RollupRepository(db_session)).execute()
+
+    assert incremental == all_rollups(db_session)
+    assert len(incremental["month"]) == len({(r.date.year, r.date.month) for r in history})
+
+
+def test_next_day_upload_rewrites_one_week_and_one_month(db_session):
+    history = make_history(60, seed=6)
+    last = max(r.date.date() for r in history)
+    assert ingest(db_session, history).status == "processed"
+
+    repo = RecordingRollupRepository(db_session)
+    next_day = history[-1].__class__(
+        date=datetime.combine(last + timedelta(days=1), datetime.min.time(), tzinfo=timezone.utc), steps_n=12_000, kcal_in=2_000,
+    )
+    assert ingest(db_session, [next_day], rollup_repo=repo).status == "processed"
+
+    # The new day and the later days of every window reaching back to it are all in one week + one month
+    # (or two when the day starts a new period)
+    (saved,) = repo.saved
+    assert repo.reads == 0  # the "is the table empty?" check is has_rollups(), no rollup is loaded
+    assert {r.granularity for r in saved} == {"week", "month"}
+    assert len(saved) <= 4
+    assert all(r.period_end.date() >= last + timedelta(days=1) for r in saved)
+
+
+def test_get_rollups_returns_whole_periods_overlapping_the_range(db_session):
+    history = make_history(120, seed=2)
+    assert ingest(db_session, history).status == "processed"
+    use_case = GetKPIRollups(DI_Postgres_RollupRepository(db_session))
+
+    months = use_case.execute("month", datetime(2015, 2, 10, tzinfo=timezone.utc), datetime(2015, 3, 5, tzinfo=timezone.utc))
+    weeks = use_case.execute("week", datetime(2015, 2, 11, tzinfo=timezone.utc), datetime(2015, 2, 20, tzinfo=timezone.utc))
+
+    assert [m.period_start.date() for m in months] == [date(2015, 2, 1), date(2015, 3, 1)]
+    assert [w.period_start.date() for w in weeks] == [date(2015, 2, 9), date(2015, 2, 16)]
+    with pytest.raises(ValueError):
+        use_case.execute("year", datetime(2015, 1, 1, tzinfo=timezone.utc), datetime(2015, 2, 1, tzinfo=timezone.utc))
+
+
+def test_has_rollups(db_session):
+    repo = DI_Postgres_RollupRepository(db_session)
+    assert not repo.has_rollups()
+
+    assert ingest(db_session, make_history(10, seed=1)).status == "processed"
+
+    assert repo.has_rollups()
@@ -0,0 +1,235 @@
+# Parquet cold tier on a temp directory + SQLite: archive job, tier-aware reads and writes.
+
+import asyncio
+from dataclasses import replace
+from datetime import date, datetime, timedelta, timezone
+
+import pyarrow.parquet as pq
+import pytest
+from sqlalchemy import func, select
+
+from app.business.kpi_calculator import compute_daily_kpis, kpis_equal
+from app.business.use_cases import IngestDailyCSV
+from app.domain.entities import DailyMetricsInput
+from app.infrastructure.archive.parquet_archive import ParquetArchive, archive_closed_years
+from app.infrastructure.archive.tiered_repository import (
+    AsyncTieredOutputRepository,
+    TieredInputRepository,
+    TieredOutputRepository,
+    first_hot_day,
+    split_by_tier,
+)
+from app.infrastructure.db.models import DailyInputORM, DailyKPIORM
+from app.infrastructure.db.repository_impl import DI_Postgres_InputRepository, DI_Postgres_OutputRepository
+from app.infrastructure.db.sql_kpi_engine import DI_Postgres_KPIEngine
+
+from tests.use_cases.test_ingest_daily_csv import FakeCSVParser, FakeFileStorage
+
+
+FIRST, LAST = date(2019, 1, 1), date(2021, 5, 31)
+TODAY = date(2021, 6, 1)
+
+
+def utc(day: date) -> datetime:
+    return datetime.combine(day, datetime.min.time(), tzinfo=timezone.utc)
+
+
+def make_records() -> list[DailyMetricsInput]:
+    records, day = [], FIRST
+    while day <= LAST:
+        n = day.toordinal()
+        if n % 11:  # a few missing days
+            records.append(DailyMetricsInput(
+                date=utc(day), steps_n=6_000 + (n * 37) % 8_000, proteins_g=100 + n % 60, kcal_in=1_800 + (n * 13) % 900,
+                kcal_junk_in=n % 400, kcal_out_training=n % 500, weight_kg=80.0 - (n % 30) / 10,
+                waist_cm=None if n % 5 == 0 else 90.0 + (n % 7) / 2,
+            ))
+        day += timedelta(days=1)
+    return records
+
+
+@pytest.fixture()
+def archive(tmp_path):
+    return ParquetArchive(tmp_path / "archive", row_group_days=31)
+
+
+@pytest.fixture()
+def loaded(db_session, archive):
+    """History 2019-01 .. 2021-05 stored in SQLite, then 2019 and 2020 archived."""
+    records = make_records()
+    kpis = compute_daily_kpis(records, start=FIRST, end=LAST)
+    DI_Postgres_InputRepository(db_session).save_input(records)
+    DI_Postgres_OutputRepository(db_session).save_output(kpis)
+
+    archived = archive_closed_years(db_session, archive, keep_years=1, today=TODAY)
+
+    assert archived == [("daily_kpis", 2019), ("daily_kpis", 2020), ("daily_inputs", 2019), ("daily_inputs", 2020)]
+    return records, kpis
+
+
+def tiered(db_session, archive):
+    return (
+        TieredInputRepository(DI_Postgres_InputRepository(db_session), archive),
+        TieredOutputRepository(DI_Postgres_OutputRepository(db_session), archive),
+    )
+
+
+def assert_same_kpis(expected, actual):
+    assert [k.date for k in actual] == [k.date for k in expected]
+    assert all(kpis_equal(e, a) for e, a in zip(expected, actual))
+
+
+def test_split_by_tier():
+    archived = {2019, 2020}
+    assert split_by_tier(date(2018, 12, 1), date(2021, 2, 1), archived) == [
+        (False, date(2018, 12, 1), date(2018, 12, 31)),
+        (True, date(2019, 1, 1), date(2019, 12, 31)),
+        (True, date(2020, 1, 1), date(2020, 12, 31)),
+        (False, date(2021, 1, 1), date(2021, 2, 1)),
+    ]
+    assert split_by_tier(date(2020, 3, 1), date(2020, 3, 9), archived) == [(True, date(2020, 3, 1), date(2020, 3, 9))]
+    assert split_by_tier(date(2021, 1, 1), date(2021, 2, 1), archived) == [(False, date(2021, 1, 1), date(2021, 2, 1))]
+    assert split_by_tier(date.min, date.max, {2019})[-1] == (False, date(2020, 1, 1), date.max)
+
+
+def test_archive_job_moves_closed_years_out_of_the_database(db_session, archive, loaded):
+    for table in (DailyKPIORM, DailyInputORM):
+        assert db_session.execute(select(func.min(table.date))).scalar() == date(2021, 1, 1)
+
+    metadata = pq.ParquetFile(archive.path("daily_kpis", 2020)).metadata
+    rows_2020 = sum(1 for r in loaded[0] if r.date.year == 2020)
+    assert metadata.num_rows == rows_2020
+    assert metadata.row_group(0).column(0).compression == "ZSTD"
+    assert metadata.num_row_groups == -(-rows_2020 // 31)  # ~monthly row groups for predicate pushdown
+
+    # Nothing left to archive
+    assert archive_closed_years(db_session, archive, keep_years=1, today=TODAY) == []
+
+
+def test_rerun_after_a_crash_keeps_corrections_made_to_the_file(db_session, archive, loaded):
+    records, _ = loaded
+    input_repo, _ = tiered(db_session, archive)
+    day = date(2020, 7, 14)
+    original = next(r for r in records if r.date.date() == day)
+
+    # Crash between writing the 2020 file and deleting its rows: the rows are still in the database
+    DI_Postgres_InputRepository(db_session).save_input([replace(original, weight_kg=80.0)])
+    # A late correction goes to the file, the source of truth for an archived year
+    input_repo.save_input([replace(original, weight_kg=75.0)])
+
+    archive_closed_years(db_session, archive, keep_years=1, today=TODAY)
+
+    assert [r.weight_kg for r in input_repo.get_input(day, day)] == [75.0]
+    assert db_session.execute(select(func.min(DailyInputORM.date))).scalar() == date(2021, 1, 1)
+
+
+def test_tiered_reads_combine_parquet_and_database(db_session, archive, loaded):
+    records, kpis = loaded
+    input_repo, output_repo = tiered(db_session, archive)
+    start, end = date(2019, 11, 20), date(2021, 2, 10)
+    expected = [k for k in kpis if start <= k.date.date() <= end]
+
+    assert_same_kpis(expected, output_repo.get_output(utc(start), utc(end)))
+    assert_same_kpis(expected, output_repo.get_output_series(start, end).to_entities())
+    assert_same_kpis(expected, [k for batch in output_repo.iter_output(start, end, batch_size=50) for k in batch])
+
+    # Keyset pages walk across the tier boundary
+    paged, after = [], None
+    while True:
+        page = output_repo.get_output_page(start, end, after=after, limit=97)
+        if not page:
+            break
+        paged.extend(page)
+        after = page[-1].date.date()
+    assert_same_kpis(expected, paged)
+
+    # Inputs: projection on both tiers, open-ended iteration over the whole history
+    steps = input_repo.get_input(start, end, columns=["steps_n"])
+    assert [(r.date, r.steps_n, r.kcal_in) for r in steps] == [
+        (r.date, r.steps_n, None) for r in records if start <= r.date.date() <= end
+    ]
+    assert [r.date for r in input_repo.iter_input()] == [r.date for r in records]
+    assert input_repo.get_input_series(start, end, columns=["weight_kg"]).column("weight_kg") == [
+        r.weight_kg for r in records if start <= r.date.date() <= end
+    ]
+
+    # Async twin (stream endpoint)
+    async def stream():
+        async_repo = AsyncTieredOutputRepository(FakeAsyncHot(DI_Postgres_OutputRepository(db_session)), archive)
+        return [k async for batch in async_repo.iter_output(start, end, batch_size=64) for k in batch]
+
+    assert_same_kpis(expected, asyncio.run(stream()))
+
+
+class FakeAsyncHot:
+    def __init__(self, sync_repo):
+        self._sync = sync_repo
+
+    async def iter_output(self, start, end, batch_size=1000):
+        for batch in self._sync.iter_output(start, end, batch_size=batch_size):
+            yield batch
+
+
+def test_page_after_the_last_representable_day_is_empty(db_session, archive, loaded):
+    _, output_repo = tiered(db_session, archive)
+    async_repo = AsyncTieredOutputRepository(FakeAsyncHot(DI_Postgres_OutputRepository(db_session)), archive)
+
+    assert output_repo.get_output_page(FIRST, date.max, after=date.max) == []
+    assert asyncio.run(async_repo.get_output_page(FIRST, date.max, after=date.max)) == []
+
+
+def test_write_to_an_archived_year_rewrites_its_file_atomically(db_session, archive, loaded):
+    _, kpis = loaded
+    _, output_repo = tiered(db_session, archive)
+    day = date(2020, 7, 14)
+    fixed = replace(next(k for k in kpis if k.date.date() == day), balance_kcal=-123.0)
+
+    output_repo.save_output([fixed])
+
+    stored = output_repo.get_output(utc(date(2020, 1, 1)), utc(date(2020, 12, 31)))
+    assert next(k for k in stored if k.date.date() == day).balance_kcal == -123.0
+    assert len(stored) == sum(1 for k in kpis if k.date.year == 2020)
+    # the write did not land in Postgres, and no temporary file was left behind
+    assert db_session.execute(select(func.count()).select_from(DailyKPIORM).where(DailyKPIORM.date == day)).scalar() == 0
+    assert sorted(p.name for p in archive.path("daily_kpis", 2020).parent.iterdir()) == [
+        "daily_kpis_2019.parquet", "daily_kpis_2020.parquet",
+    ]
+
+
+def test_backdated_upload_into_an_archived_year(db_session, archive, loaded):
+    records, _ = loaded
+    input_repo, output_repo = tiered(db_session, archive)
+    corrected = [replace(r, kcal_in=3_000) for r in records if date(2020, 12, 28) <= r.date.date() <= date(2020, 12, 31)]
+
+    report = IngestDailyCSV(
+        input_repo=input_repo, output_repo=output_repo, file_storage=FakeFileStorage(), parser=FakeCSVParser(corrected),
+    ).execute(file_bytes=b"csv", filename="fix.csv")
+
+    assert report.status == "processed"
+    by_day = {r.date: r for r in records}
+    by_day.update({r.date: r for r in corrected})
+    expected = compute_daily_kpis(list(by_day.values()), start=FIRST, end=LAST)
+    # The rolling windows of early January (Postgres) saw the archived December corrections
+    assert_same_kpis(expected, output_repo.get_output(utc(FIRST), utc(LAST)))
+
+
+def test_sql_rebuild_skips_days_whose_lookback_was_archived(db_session, archive, loaded):
+    _, kpis = loaded
+    _, output_repo = tiered(db_session, archive)
+    hot_from = first_hot_day(archive)
+    assert hot_from == date(2021, 1, 1)
+    first_full = date(2021, 1, 8)  # first day whose 7-day lookback is entirely in the database
+
+    # Unrestricted, the SQL engine only sees 2021 inputs: early-January windows and lags come out wrong
+    DI_Postgres_KPIEngine(db_session).rebuild_kpis(hot_from, date(2021, 1, 7))
+    early = output_repo.get_output(utc(hot_from), utc(date(2021, 1, 7)))
+    expected_early = [k for k in kpis if hot_from <= k.date.date() <= date(2021, 1, 7)]
+    assert not all(kpis_equal(e, a) for e, a in zip(expected_early, early))
+    output_repo.save_output(expected_early)  # put the correct rows back
+
+    # With hot_from, the rebuild starts at the first day with full context and leaves the others alone
+    written = DI_Postgres_KPIEngine(db_session, hot_from=hot_from).rebuild_kpis(hot_from, LAST)
+
+    assert written == sum(1 for k in kpis if first_full <= k.date.date() <= LAST)
+    assert_same_kpis([k for k in kpis if k.date.date() >= FIRST], output_repo.get_output(utc(FIRST), utc(LAST)))
+    assert DI_Postgres_KPIEngine(db_session, hot_from=hot_from).rebuild_kpis(hot_from, date(2021, 1, 7)) == 0
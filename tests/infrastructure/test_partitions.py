@@ -0,0 +1,28 @@
+# Partition maintenance helper: DDL generation (Postgres-only at runtime) and the SQLite no-op.
+
+
+from sqlalchemy import create_engine
+
+from app.infrastructure.db.partitions import create_partition_sql, ensure_future_partitions, partition_bounds
+
+
+def test_yearly_partition_bounds_and_ddl():
+    assert partition_bounds(2028) == ("2028-01-01", "2029-01-01")
+
+    create, move, attach = create_partition_sql("daily_kpis", 2028)
+
+    assert create == "CREATE TABLE daily_kpis_y2028 (LIKE daily_kpis INCLUDING DEFAULTS)"
+    # Rows of 2028 already sitting in the default partition are moved before attaching
+    assert "DELETE FROM daily_kpis_default WHERE date >= '2028-01-01' AND date < '2029-01-01'" in move
+    assert "INSERT INTO daily_kpis_y2028" in move
+    assert attach == (
+        "ALTER TABLE daily_kpis ATTACH PARTITION daily_kpis_y2028 FOR VALUES FROM ('2028-01-01') TO ('2029-01-01')"
+    )
+
+
+def test_non_postgres_database_is_left_alone():
+    engine = create_engine("sqlite://")
+    try:
+        assert ensure_future_partitions(engine) == []
+    finally:
+        engine.dispose()
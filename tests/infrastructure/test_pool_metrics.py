@@ -0,0 +1,63 @@
+# Pool instrumentation against a SQLite file database (QueuePool semantics, no server needed).
+
+import pytest
+from sqlalchemy import create_engine, exc, text
+
+from app.infrastructure.db.engine import engine_options
+from app.infrastructure.db.pool_metrics import InstrumentedQueuePool, instrument_engine
+
+
+@pytest.fixture()
+def engine(tmp_path):
+    engine = create_engine(
+        f"sqlite:///{tmp_path}/pool.db", poolclass=InstrumentedQueuePool, pool_size=1, max_overflow=0, pool_timeout=0.05
+    )
+    instrument_engine(engine)
+    yield engine
+    engine.dispose()
+
+
+def test_checkouts_waits_and_timeouts_are_counted(engine):
+    with engine.connect() as conn:
+        conn.execute(text("SELECT 1"))
+        during = engine.pool.metrics.snapshot(engine.pool)
+
+        # The only connection is taken: the next checkout queues, then times out
+        with pytest.raises(exc.TimeoutError):
+            engine.connect()
+
+    stats = engine.pool.metrics.snapshot(engine.pool)
+
+    assert during["in_use"] == 1
+    assert stats["in_use"] == 0 and stats["idle"] == 1
+    assert stats["connects"] == 1
+    assert stats["checkouts"] == stats["checkins"] == 1
+    assert stats["waits"] == 1 and stats["timeouts"] == 1
+    assert stats["wait_ms"]["max"] >= 40
+    assert stats["checkout_ms"]["samples"] == 1
+
+
+def test_metrics_survive_engine_dispose(engine):
+    with engine.connect():
+        pass
+    engine.dispose()
+    with engine.connect():
+        pass
+
+    assert engine.pool.metrics.snapshot(engine.pool)["checkouts"] == 2
+
+
+def test_engine_options_from_env(monkeypatch):
+    monkeypatch.setenv("DB_POOL_SIZE", "20")
+    monkeypatch.setenv("DB_MAX_OVERFLOW", "0")
+    monkeypatch.setenv("DB_POOL_TIMEOUT", "3")
+    monkeypatch.setenv("DB_POOL_RECYCLE", "-1")
+    monkeypatch.setenv("DB_STATEMENT_TIMEOUT_MS", "5000")
+
+    options = engine_options("postgresql+psycopg://u:p@db:5432/app")
+
+    assert options["poolclass"] is InstrumentedQueuePool
+    assert (options["pool_size"], options["max_overflow"], options["pool_timeout"], options["pool_recycle"]) == (20, 0, 3, -1)
+    assert options["connect_args"] == {"options": "-c statement_timeout=5000"}
+    # SQLite keeps SQLAlchemy's default pool
+    assert "poolclass" not in engine_options("sqlite://")
@@ -0,0 +1,218 @@
+# Repository tests run against an in-memory SQLite database.
+# SQLite understands INSERT ... ON CONFLICT too, so the bulk upsert path is exercised for real.
+
+from datetime import date, datetime, timezone
+
+import pytest
+from sqlalchemy import event, func, select
+
+from app.domain.entities import DailyKPIsOutput, DailyMetricsInput
+from app.infrastructure.db.models import DailyInputORM, DailyKPIORM
+from app.infrastructure.db.repository_impl import (
+    DI_Postgres_InputRepository,
+    DI_Postgres_OutputRepository,
+)
+
+
+def count_statements(engine) -> list[str]:
+    statements: list[str] = []
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _count(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    return statements
+
+
+def make_input(day: int, **overrides) -> DailyMetricsInput:
+    values = dict(
+        date=datetime(2026, 1, day, tzinfo=timezone.utc),
+        steps_n=10_000,
+        proteins_g=120,
+        kcal_in=2_000,
+        kcal_junk_in=200,
+        kcal_out_training=300,
+        sleep_hours=7.0,
+        stress_rel=3,
+        weight_kg=80.0,
+        waist_cm=90.0,
+    )
+    values.update(overrides)
+    return DailyMetricsInput(**values)
+
+
+def make_kpi(day: int, balance_kcal: float) -> DailyKPIsOutput:
+    return DailyKPIsOutput(
+        date=datetime(2026, 1, day, tzinfo=timezone.utc),
+        kcal_out_total=300.0,
+        balance_kcal=balance_kcal,
+        adherence_steps=1,
+    )
+
+
+def test_bulk_save_input_inserts_then_updates_by_date(db_session):
+    repo = DI_Postgres_InputRepository(db_session)
+
+    repo.save_input([make_input(1), make_input(2)])
+    repo.save_input([make_input(2, weight_kg=79.5), make_input(3)])
+
+    rows = repo.get_input(date(2026, 1, 1), date(2026, 1, 31))
+
+    assert [r.date.date() for r in rows] == [date(2026, 1, 1), date(2026, 1, 2), date(2026, 1, 3)]
+    assert rows[1].weight_kg == 79.5
+
+
+def test_bulk_save_input_last_duplicate_day_wins(db_session):
+    repo = DI_Postgres_InputRepository(db_session)
+
+    repo.save_input([make_input(5, steps_n=1_000), make_input(5, steps_n=2_000)])
+
+    assert db_session.scalar(select(func.count()).select_from(DailyInputORM)) == 1
+    assert repo.get_input(date(2026, 1, 5), date(2026, 1, 5))[0].steps_n == 2_000
+
+
+def test_bulk_save_output_upserts_and_chunks_statements(engine, db_session):
+    repo = DI_Postgres_OutputRepository(db_session, batch_size=10)
+    statements = count_statements(engine)
+
+    repo.save_output([make_kpi(day, balance_kcal=100.0) for day in range(1, 26)])
+    inserts = [s for s in statements if s.startswith("INSERT")]
+
+    # 25 rows / 10 per chunk -> 3 statements, no per-row SELECT
+    assert len(inserts) == 3
+    assert not any(s.startswith("SELECT") for s in statements)
+
+    repo.save_output([make_kpi(3, balance_kcal=-50.0)])
+
+    rows = repo.get_output(datetime(2026, 1, 1), datetime(2026, 1, 31))
+    assert len(rows) == 25
+    assert rows[2].balance_kcal == -50.0
+    assert db_session.scalar(select(func.count()).select_from(DailyKPIORM)) == 25
+
+
+def test_rowwise_mode_matches_bulk_mode(engine, db_session):
+    bulk = DI_Postgres_OutputRepository(db_session)
+    rowwise = DI_Postgres_OutputRepository(db_session, bulk_upsert=False)
+
+    bulk.save_output([make_kpi(1, 10.0), make_kpi(2, 20.0)])
+    rowwise.save_output([make_kpi(2, 25.0), make_kpi(3, 30.0)])
+
+    rows = bulk.get_output(datetime(2026, 1, 1), datetime(2026, 1, 31))
+    assert [r.balance_kcal for r in rows] == [10.0, 25.0, 30.0]
+
+
+def test_staged_loader_merges_and_returns_affected_range(db_session):
+    repo = DI_Postgres_InputRepository(db_session)
+    repo.save_input([make_input(2, weight_kg=70.0)])
+
+    affected = repo.load_input_staged(
+        [make_input(4), make_input(2, weight_kg=81.0), make_input(3), make_input(4, steps_n=1)]
+    )
+
+    assert affected == (date(2026, 1, 2), date(2026, 1, 4))
+
+    rows = repo.get_input(date(2026, 1, 1), date(2026, 1, 31))
+    assert [r.date.date() for r in rows] == [date(2026, 1, 2), date(2026, 1, 3), date(2026, 1, 4)]
+    assert rows[0].weight_kg == 81.0   # existing day updated
+    assert rows[2].steps_n == 1        # duplicated day: last row in file order wins
+
+
+def test_save_input_switches_to_staged_loader_above_threshold(engine, db_session):
+    repo = DI_Postgres_InputRepository(db_session, copy_threshold=3)
+    statements = count_statements(engine)
+
+    affected = repo.save_input([make_input(day) for day in range(1, 6)])
+
+    assert affected == (date(2026, 1, 1), date(2026, 1, 5))
+    assert any("daily_inputs_staging" in s for s in statements)
+    assert len(repo.get_input(date(2026, 1, 1), date(2026, 1, 31))) == 5
+
+    # Staging table is dropped, so a second large load on the same connection works too
+    repo.save_input([make_input(day, steps_n=5) for day in range(1, 6)])
+    assert all(r.steps_n == 5 for r in repo.get_input(date(2026, 1, 1), date(2026, 1, 31)))
+
+
+from app.domain.entities import RollingCheckpoint
+def test_get_input_projection_loads_only_requested_columns(db_session):
+    repo = DI_Postgres_InputRepository(db_session)
+    repo.save_input([make_input(1), make_input(2, steps_n=4_000)])
+
+    rows = repo.get_input(date(2026, 1, 1), date(2026, 1, 2), columns=("steps_n", "weight_kg"))
+
+    assert [(r.date.day, r.steps_n, r.weight_kg) for r in rows] == [(1, 10_000, 80.0), (2, 4_000, 80.0)]
+    assert all(r.kcal_in is None and r.waist_cm is None for r in rows)
+    assert rows[0].date == datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+    with pytest.raises(ValueError, match="Unknown input columns"):
+        repo.get_input(date(2026, 1, 1), date(2026, 1, 2), columns=("nope",))
+
+
+def test_iter_input_streams_rows_in_date_order(db_session):
+    repo = DI_Postgres_InputRepository(db_session)
+    repo.save_input([make_input(d) for d in (3, 1, 2, 4)])
+
+    assert [r.date.day for r in repo.iter_input(batch_size=2)] == [1, 2, 3, 4]
+    assert [r.date.day for r in repo.iter_input(start=date(2026, 1, 2), end=date(2026, 1, 3))] == [2, 3]
+
+
+def test_series_reads_match_entity_reads(db_session):
+    inputs = DI_Postgres_InputRepository(db_session)
+    outputs = DI_Postgres_OutputRepository(db_session)
+    inputs.save_input([make_input(d, waist_cm=None if d == 2 else 90.0) for d in (1, 2, 3)])
+    outputs.save_output([make_kpi(d, balance_kcal=-100.0 * d) for d in (1, 2, 3)])
+    start, end = date(2026, 1, 1), date(2026, 1, 3)
+
+    assert inputs.get_input_series(start, end).to_entities() == inputs.get_input(start, end)
+    assert outputs.get_output_series(start, end).to_entities() == outputs.get_output(
+        datetime(2026, 1, 1, tzinfo=timezone.utc), datetime(2026, 1, 3, tzinfo=timezone.utc)
+    )
+    assert inputs.get_input_series(start, end, columns=("waist_cm",)).column("waist_cm") == [90.0, None, 90.0]
+
+
+def test_iter_output_yields_bounded_batches(db_session):
+    repo = DI_Postgres_OutputRepository(db_session)
+    repo.save_output([make_kpi(d, balance_kcal=float(d)) for d in range(1, 11)])
+
+    batches = list(repo.iter_output(date(2026, 1, 2), date(2026, 1, 9), batch_size=3))
+
+    assert [len(b) for b in batches] == [3, 3, 2]
+    assert [k.balance_kcal for b in batches for k in b] == [float(d) for d in range(2, 10)]
+
+
+def test_get_output_page_walks_the_range_with_keyset(db_session):
+    repo = DI_Postgres_OutputRepository(db_session)
+    repo.save_output([make_kpi(d, balance_kcal=float(d)) for d in range(1, 11)])
+    start, end = date(2026, 1, 2), date(2026, 1, 9)
+
+    pages, after = [], None
+    while True:
+        page = repo.get_output_page(start, end, after=after, limit=3)
+        if not page:
+            break
+        pages.append([k.balance_kcal for k in page])
+        after = page[-1].date.date()
+
+    assert pages == [[2.0, 3.0, 4.0], [5.0, 6.0, 7.0], [8.0, 9.0]]
+
+
+from app.infrastructure.db.repository_impl import DI_Postgres_CheckpointRepository
+
+
+def test_checkpoint_is_returned_only_while_it_matches_latest_input_day(db_session):
+    inputs = DI_Postgres_InputRepository(db_session)
+    checkpoints = DI_Postgres_CheckpointRepository(db_session)
+
+    assert checkpoints.get_checkpoint() is None
+
+    inputs.save_input([make_input(1), make_input(2)])
+    checkpoints.save_checkpoint(
+        RollingCheckpoint(date=datetime(2026, 1, 2, tzinfo=timezone.utc), state={"version": 1, "x": [1.5]})
+    )
+
+    checkpoint = checkpoints.get_checkpoint()
+    assert checkpoint.date.date() == date(2026, 1, 2)
+    assert checkpoint.state == {"version": 1, "x": [1.5]}
+
+    # A later input day makes the checkpoint stale
+    inputs.save_input([make_input(3)])
+    assert checkpoints.get_checkpoint() is None
@@ -0,0 +1,90 @@
+# Read/write routing with two SQLite files standing in for the primary and the replica.
+
+from datetime import datetime, timezone
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.domain.entities import DailyKPIsOutput
+from app.infrastructure.db.base import Base
+from app.infrastructure.db.repository_impl import DI_Postgres_OutputRepository
+from app.infrastructure.db.session_router import SessionRouter
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture()
+def databases(tmp_path):
+    factories = {}
+    engines = []
+    for name in ("primary", "replica"):
+        engine = create_engine(f"sqlite:///{tmp_path}/{name}.db")
+        Base.metadata.create_all(engine)
+        engines.append(engine)
+        factories[name] = sessionmaker(bind=engine, autoflush=False, autocommit=False)
+    yield factories
+    for engine in engines:
+        engine.dispose()
+
+
+def read_days(router: SessionRouter) -> list[int]:
+    with router.read_factory()() as session:
+        rows = DI_Postgres_OutputRepository(session).get_output(
+            datetime(2024, 1, 1, tzinfo=timezone.utc), datetime(2024, 1, 31, tzinfo=timezone.utc)
+        )
+    return [r.date.day for r in rows]
+
+
+def test_reads_go_to_replica_except_in_read_your_writes_window(databases):
+    clock = FakeClock()
+    router = SessionRouter(databases["primary"], databases["replica"], read_your_writes_seconds=5, clock=clock)
+
+    # Ingest writes on the primary only (the replica hasn't caught up yet)
+    with router.write_factory()() as session:
+        DI_Postgres_OutputRepository(session).save_output(
+            [DailyKPIsOutput(date=datetime(2024, 1, 10, tzinfo=timezone.utc), balance_kcal=-100.0)]
+        )
+
+    assert router.has_replica
+    assert read_days(router) == []          # no write marked yet: replica
+    router.mark_write()
+    assert read_days(router) == [10]        # read-your-writes: primary
+    clock.now += 4.9
+    assert read_days(router) == [10]
+    clock.now += 0.2
+    assert read_days(router) == []          # window over: back to the (lagging) replica
+
+
+def test_without_replica_everything_uses_the_primary(databases):
+    router = SessionRouter(databases["primary"])
+
+    assert not router.has_replica
+    assert router.reads_use_primary()
+    assert router.read_factory() is databases["primary"]
+
+
+def test_empty_read_your_writes_seconds_uses_the_default(monkeypatch):
+    import subprocess
+    import sys
+
+    from app.infrastructure.db.engine import _env_float
+    from app.infrastructure.db.session_router import DEFAULT_READ_YOUR_WRITES_SECONDS
+
+    monkeypatch.setenv("READ_YOUR_WRITES_SECONDS", "")
+    assert _env_float("READ_YOUR_WRITES_SECONDS", DEFAULT_READ_YOUR_WRITES_SECONDS) == DEFAULT_READ_YOUR_WRITES_SECONDS
+    monkeypatch.setenv("READ_YOUR_WRITES_SECONDS", " 2.5 ")
+    assert _env_float("READ_YOUR_WRITES_SECONDS", DEFAULT_READ_YOUR_WRITES_SECONDS) == 2.5
+
+    # `NAME=` lines copied from .env.example must not break importing the engine module
+    monkeypatch.setenv("READ_YOUR_WRITES_SECONDS", "")
+    result = subprocess.run(
+        [sys.executable, "-c", "import app.infrastructure.db.engine"], capture_output=True, text=True,
+    )
+    assert result.returncode == 0, result.stderr
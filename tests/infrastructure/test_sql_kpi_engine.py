@@ -0,0 +1,89 @@
+# SQL push-down engine vs the Python calculator, on SQLite (same statement shape as Postgres:
+# calendar CTE, RANGE window averages, LAG on the calendar, INSERT ... SELECT ... ON CONFLICT).
+
+from datetime import date, datetime, time, timezone
+
+import pytest
+from sqlalchemy import func, select
+
+from app.business.kpi_calculator import compute_daily_kpis, kpis_equal
+from app.business.use_cases import RebuildKPIsInDB
+from app.domain.entities import DailyKPIsOutput
+from app.infrastructure.db.models import DailyKPIORM
+from app.infrastructure.db.repository_impl import DI_Postgres_InputRepository, DI_Postgres_OutputRepository
+from app.infrastructure.db.sql_kpi_engine import DI_Postgres_KPIEngine, rebuild_kpis_sql
+
+from tests.unit.test_kpi_calculator_numpy import make_history
+
+
+def stored_kpis(db_session, start: date, end: date) -> list[DailyKPIsOutput]:
+    return DI_Postgres_OutputRepository(db_session).get_output(
+        datetime.combine(start, time.min, tzinfo=timezone.utc), datetime.combine(end, time.min, tzinfo=timezone.utc)
+    )
+
+
+def assert_same_kpis(expected: list[DailyKPIsOutput], actual: list[DailyKPIsOutput]):
+    assert [k.date for k in actual] == [k.date for k in expected]
+    for e, a in zip(expected, actual):
+        assert kpis_equal(e, a, abs_tol=1e-6), (e, a)
+
+
+@pytest.mark.parametrize("seed", [1, 2, 3])
+def test_sql_engine_matches_python_calculator(db_session, seed):
+    # Gaps, duplicated days (last one wins in both paths) and ~15% missing values
+    records = make_history(600, seed)
+    DI_Postgres_InputRepository(db_session).save_input(records)
+    start, end = date(2015, 2, 10), date(2016, 3, 31)  # clipped: the first days are window context only
+
+    written = DI_Postgres_KPIEngine(db_session).rebuild_kpis(start, end, target_steps=9_000)
+
+    expected = compute_daily_kpis(records, start=start, end=end, target_steps=9_000, backend="python")
+    assert written == len(expected)
+    assert_same_kpis(expected, stored_kpis(db_session, start, end))
+
+
+def test_full_history_rebuild_overwrites_stale_rows(db_session):
+    records = make_history(300, seed=7)
+    DI_Postgres_InputRepository(db_session).save_input(records)
+    first, last = records[0].date.date(), records[-1].date.date()
+
+    # A stale row computed with an old steps goal
+    expected = compute_daily_kpis(records, start=first, end=last, target_steps=10_000, backend="python")
+    stale = compute_daily_kpis(records, start=first, end=last, target_steps=1, backend="python")
+    DI_Postgres_OutputRepository(db_session).save_output(stale[:50])
+
+    written = RebuildKPIsInDB(kpi_engine=DI_Postgres_KPIEngine(db_session)).execute()
+
+    assert written == len(expected)
+    assert db_session.execute(select(func.count()).select_from(DailyKPIORM)).scalar_one() == len(expected)
+    assert_same_kpis(expected, stored_kpis(db_session, first, last))
+
+
+def test_days_outside_the_range_are_left_alone(db_session):
+    records = make_history(60, seed=3)
+    DI_Postgres_InputRepository(db_session).save_input(records)
+    start, end = records[20].date.date(), records[30].date.date()
+
+    DI_Postgres_KPIEngine(db_session).rebuild_kpis(start, end)
+
+    days = db_session.execute(select(DailyKPIORM.date).order_by(DailyKPIORM.date)).scalars().all()
+    assert days[0] == start and days[-1] == end
+
+
+def test_empty_inputs_and_bad_range(db_session):
+    engine = DI_Postgres_KPIEngine(db_session)
+
+    assert engine.rebuild_kpis() == 0
+    with pytest.raises(ValueError):
+        engine.rebuild_kpis(date(2026, 2, 1), date(2026, 1, 1))
+
+
+def test_postgres_statement_uses_calendar_windows_and_upsert():
+    sql = rebuild_kpis_sql("postgresql")
+
+    assert "generate_series" in sql
+    assert "RANGE BETWEEN INTERVAL '6 days' PRECEDING AND CURRENT ROW" in sql
+    assert "LAG(waist_cm, 7) OVER (ORDER BY date)" in sql
+    assert "ON CONFLICT (date) DO UPDATE" in sql
+    with pytest.raises(NotImplementedError):
+        rebuild_kpis_sql("mysql")
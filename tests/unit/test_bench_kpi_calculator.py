@@ -0,0 +1,77 @@
+from benchmarks.bench_kpi_calculator import compare, confirm, main, synthetic_history
+
+
+def test_synthetic_history_is_deterministic_and_sorted():
+    a = synthetic_history(365, seed=1)
+    b = synthetic_history(365, seed=1)
+
+    assert a == b
+    assert [r.date for r in a] == sorted(r.date for r in a)
+
+
+def test_synthetic_history_rates():
+    records = synthetic_history(2_000, gap_rate=0.2, duplicate_rate=0.1, missing_rate=0.0, seed=3)
+    days = {r.date for r in records}
+
+    assert 0.15 < 1 - len(days) / 2_000 < 0.25          # gaps
+    assert 0.05 < len(records) / len(days) - 1 < 0.15   # duplicated days
+    assert all(r.steps_n is not None for r in records)
+
+
+def test_compare_flags_slower_and_bigger_cases_only():
+    baseline = {"results": {
+        "1y/python": {"time_ms": 10.0, "peak_kib": 100.0, "blocks": 1},
+        "1y/numpy": {"time_ms": 10.0, "peak_kib": 100.0, "blocks": 1},
+        "30d/python": {"time_ms": 0.1, "peak_kib": 10.0, "blocks": 1},
+    }}
+    current = {"results": {
+        "1y/python": {"time_ms": 13.0, "peak_kib": 100.0, "blocks": 1},
+        "1y/numpy": {"time_ms": 11.0, "peak_kib": 200.0, "blocks": 1},
+        "30d/python": {"time_ms": 0.5, "peak_kib": 10.0, "blocks": 1},  # below the noise floor
+        "20y/python": {"time_ms": 99.0, "peak_kib": 1.0, "blocks": 1},  # not in baseline
+    }}
+
+    regressions = compare(current, baseline, max_slowdown=1.25, max_memory_growth=1.25)
+
+    assert len(regressions) == 2
+    assert regressions[0].startswith("1y/python: time")
+    assert regressions[1].startswith("1y/numpy: peak memory")
+
+
+def test_compare_widens_the_time_gate_by_the_measured_noise():
+    baseline = {"results": {"1y/python": {"time_ms": 10.0, "noise": 0.0, "peak_kib": 100.0, "blocks": 1}}}
+    noisy = {"results": {"1y/python": {"time_ms": 14.0, "noise": 0.1, "peak_kib": 100.0, "blocks": 1}}}
+    quiet = {"results": {"1y/python": {"time_ms": 14.0, "noise": 0.0, "peak_kib": 100.0, "blocks": 1}}}
+
+    assert compare(noisy, baseline, max_slowdown=1.25) == []  # x1.4 <= x1.25 * 1.3
+    assert len(compare(quiet, baseline, max_slowdown=1.25)) == 1
+
+
+def test_confirm_drops_a_spike_and_keeps_a_real_regression():
+    baseline = {"results": {
+        "1y/python": {"time_ms": 10.0, "peak_kib": 100.0, "blocks": 1},
+        "1y/numpy": {"time_ms": 10.0, "peak_kib": 100.0, "blocks": 1},
+    }}
+    current = {"results": {
+        "1y/python": {"time_ms": 20.0, "peak_kib": 100.0, "blocks": 1},  # spike: fast again when re-measured
+        "1y/numpy": {"time_ms": 20.0, "peak_kib": 100.0, "blocks": 1},   # real: slow every time
+    }}
+    remeasured = []
+
+    def remeasure(keys):
+        remeasured.append(sorted(keys))
+        return {"results": {k: {"time_ms": 10.5 if k == "1y/python" else 19.0, "peak_kib": 100.0, "blocks": 1} for k in keys}}
+
+    regressions = confirm(current, baseline, remeasure, attempts=2)
+
+    assert [r.split(":")[0] for r in regressions] == ["1y/numpy"]
+    assert remeasured == [["1y/numpy", "1y/python"], ["1y/numpy"]]
+
+
+def test_fresh_baseline_passes_against_an_immediate_rerun(tmp_path):
+    args = ["--quick", "--backends", "python", "--repeat", "7"]
+    baseline = tmp_path / "baseline.json"
+
+    assert main(args + ["--save", str(baseline)]) == 0
+    assert main(args + ["--baseline", str(baseline)]) == 0
+    assert main(args + ["--self-check"]) == 0
@@ -350,4 +350,31 @@ def test_compute_daily_kpis_waist_change_7d():
 
     kpi_day8 = result[-1]
 
-    assert kpi_day8.waist_change_7d == -2.0
\ No newline at end of file
+    assert kpi_day8.waist_change_7d == -2.0
+
+def test_compute_daily_kpis_extra_windows_in_one_pass():
+    records = [
+        DailyMetricsInput(
+            date=datetime(2026, 1, d, tzinfo=timezone.utc),
+            kcal_in=2000 + 10 * d,
+            kcal_out_training=0,
+            weight_kg=80.0 + d,
+        )
+        for d in range(1, 29)  # Jan 1..Jan 28
+    ]
+
+    result = compute_daily_kpis(
+        records=records,
+        start=date(2026, 1, 28),
+        end=date(2026, 1, 28),
+        windows=(14, 28),
+    )
+
+    kpi = result[0]
+
+    # Fixed 7d fields are unchanged: weights 22..28 -> 105.0
+    assert kpi.weight_7d_avg == 105.0
+    # Jan 15..28 -> mean of 95..108 = 101.5 ; Jan 1..28 -> mean of 81..108 = 94.5
+    assert kpi.rolling["weight_14d_avg"] == 101.5
+    assert kpi.rolling["weight_28d_avg"] == 94.5
+    assert kpi.rolling["balance_28d_average"] == 2145.0
@@ -0,0 +1,108 @@
+import random
+from datetime import date, datetime, timedelta, timezone
+
+import pytest
+
+from app.business.kpi_calculator import compute_daily_kpis
+from app.domain.entities import DailyMetricsInput
+
+KPI_FIELDS = (
+    "kcal_out_total",
+    "balance_kcal",
+    "balance_7d_average",
+    "protein_per_kg",
+    "healthy_food_pct",
+    "adherence_steps",
+    "weight_7d_avg",
+    "waist_change_7d",
+)
+
+
+def make_history(n: int, seed: int) -> list[DailyMetricsInput]:
+    """Irregular history: gaps, duplicated days (same day twice) and ~15% missing values."""
+    rng = random.Random(seed)
+
+    def maybe(value):
+        return None if rng.random() < 0.15 else value
+
+    records = []
+    day = datetime(2015, 1, 1, tzinfo=timezone.utc)
+    for _ in range(n):
+        day += timedelta(days=rng.choice((0, 1, 1, 1, 1, 3)))
+        records.append(
+            DailyMetricsInput(
+                date=day,
+                steps_n=maybe(rng.randint(0, 20_000)),
+                proteins_g=maybe(rng.randint(40, 220)),
+                kcal_in=maybe(rng.choice((0, rng.randint(1_000, 3_500)))),
+                kcal_junk_in=maybe(rng.randint(0, 900)),
+                kcal_out_training=maybe(rng.randint(0, 900)),
+                weight_kg=maybe(rng.choice((0.0, rng.uniform(60, 95)))),
+                waist_cm=maybe(rng.uniform(75, 105)),
+            )
+        )
+    return records
+
+
+def assert_same_kpis(expected, actual):
+    assert [k.date for k in actual] == [k.date for k in expected]
+    for e, a in zip(expected, actual):
+        for field in KPI_FIELDS:
+            e_value, a_value = getattr(e, field), getattr(a, field)
+            if e_value is None:
+                assert a_value is None, (e.date, field)
+            else:
+                assert a_value == pytest.approx(e_value, rel=1e-9, abs=1e-6), (e.date, field)
+        assert e.rolling.keys() == a.rolling.keys()
+        for name, e_value in e.rolling.items():
+            assert (e_value is None) == (a.rolling[name] is None)
+            if e_value is not None:
+                assert a.rolling[name] == pytest.approx(e_value, rel=1e-9, abs=1e-6)
+
+
+@pytest.mark.parametrize("seed", [1, 2, 3])
+def test_numpy_backend_matches_python_backend(seed):
+    records = make_history(1_500, seed)
+    start, end = date(2015, 3, 1), date(2019, 6, 30)  # clipped on both sides
+
+    expected = compute_daily_kpis(records, start=start, end=end, target_steps=9_000, windows=(14, 28), backend="python")
+    actual = compute_daily_kpis(records, start=start, end=end, target_steps=9_000, windows=(14, 28), backend="numpy")
+
+    assert len(expected) > 0
+    assert_same_kpis(expected, actual)
+
+
+def test_numpy_backend_duplicate_day_last_one_wins():
+    records = [
+        DailyMetricsInput(date=datetime(2026, 1, 1, tzinfo=timezone.utc), steps_n=1, weight_kg=70.0),
+        DailyMetricsInput(date=datetime(2026, 1, 1, tzinfo=timezone.utc), steps_n=20_000, weight_kg=90.0),
+    ]
+
+    result = compute_daily_kpis(records, start=date(2026, 1, 1), end=date(2026, 1, 1), backend="numpy")
+
+    assert len(result) == 1
+    assert result[0].adherence_steps == 1
+    assert result[0].weight_7d_avg == 90.0
+
+
+def test_numpy_backend_returns_python_types_and_none():
+    records = [DailyMetricsInput(date=datetime(2026, 1, 10, tzinfo=timezone.utc), steps_n=12_000)]
+
+    kpi = compute_daily_kpis(records, start=date(2026, 1, 1), end=date(2026, 1, 31), backend="numpy")[0]
+
+    assert kpi.adherence_steps == 1 and type(kpi.adherence_steps) is int
+    assert kpi.balance_kcal is None
+    assert kpi.weight_7d_avg is None
+    assert kpi.date == datetime(2026, 1, 10, tzinfo=timezone.utc)
+
+
+def test_numpy_backend_empty_range_and_empty_input():
+    records = make_history(30, seed=4)
+
+    assert compute_daily_kpis(records, start=date(2030, 1, 1), end=date(2030, 12, 31), backend="numpy") == []
+    assert compute_daily_kpis([], start=date(2030, 1, 1), end=date(2030, 12, 31), backend="numpy") == []
+
+
+def test_unknown_backend_is_rejected():
+    with pytest.raises(ValueError):
+        compute_daily_kpis([], start=date(2026, 1, 1), end=date(2026, 1, 2), backend="fortran")
@@ -0,0 +1,67 @@
+from datetime import date
+
+import pytest
+
+from app.business.kpi_calculator import compute_daily_kpis, kpi_max_lookback_days
+from app.business.kpi_registry import (
+    KPI_FIELDS,
+    kpis_depending_on_params,
+    plan_lookback_days,
+    required_input_columns,
+    resolve_kpis,
+)
+
+from tests.unit.test_kpi_calculator_numpy import make_history
+
+
+def names(plan):
+    return [d.name for d in plan]
+
+
+def test_full_plan_covers_every_persisted_kpi_with_dependencies_first():
+    plan = names(resolve_kpis())
+
+    assert set(plan) == set(KPI_FIELDS)
+    assert plan.index("kcal_out_total") < plan.index("balance_kcal") < plan.index("balance_7d_average")
+
+
+def test_subset_pulls_in_dependencies_and_nothing_else():
+    plan = resolve_kpis(["balance_7d_average"])
+
+    assert names(plan) == ["kcal_out_total", "balance_kcal", "balance_7d_average"]
+    assert required_input_columns(plan) == ("kcal_out_training", "kcal_in")
+    assert plan_lookback_days(plan) == 6
+
+
+def test_extra_window_names_are_resolved_on_demand():
+    plan = resolve_kpis(["weight_28d_avg"])
+
+    assert names(plan) == ["weight_28d_avg"]
+    assert required_input_columns(plan) == ("weight_kg",)
+    assert kpi_max_lookback_days(kpis=["weight_28d_avg"]) == 27
+
+
+def test_unknown_kpi_is_rejected():
+    with pytest.raises(ValueError, match="Unknown KPI"):
+        resolve_kpis(["vo2max"])
+
+
+def test_kpis_depending_on_params():
+    assert kpis_depending_on_params({"target_steps"}) == ("adherence_steps",)
+    assert kpis_depending_on_params({"unused"}) == ()
+
+
+@pytest.mark.parametrize("backend", ["python", "numpy"])
+def test_subset_matches_full_computation_and_leaves_other_fields_empty(backend):
+    records = make_history(300, seed=7)
+    start, end = records[0].date.date(), records[-1].date.date()
+    subset = ("balance_7d_average", "adherence_steps")
+
+    full = compute_daily_kpis(records, start=start, end=end, backend=backend)
+    partial = compute_daily_kpis(records, start=start, end=end, kpis=subset, backend=backend)
+
+    assert [k.date for k in partial] == [k.date for k in full]
+    for f, p in zip(full, partial):
+        for field in subset:
+            assert getattr(p, field) == pytest.approx(getattr(f, field))
+        assert p.protein_per_kg is None and p.weight_7d_avg is None and p.waist_change_7d is None
@@ -0,0 +1,45 @@
+from datetime import date, datetime, timezone
+
+import pytest
+
+from app.business.kpi_calculator import compute_daily_kpis, iter_daily_kpis
+from app.domain.entities import DailyMetricsInput
+
+from tests.unit.test_kpi_calculator_numpy import assert_same_kpis, make_history
+
+
+def test_chunks_match_compute_daily_kpis():
+    records = make_history(2_000, seed=3)  # sorted, with duplicated days
+    start, end = date(2016, 1, 1), records[-1].date.date()
+
+    chunks = list(iter_daily_kpis(iter(records), start=start, end=end, windows=(28,), chunk_size=250))
+
+    assert all(1 <= len(chunk) <= 250 for chunk in chunks)
+    streamed = [k for chunk in chunks for k in chunk]
+    assert_same_kpis(compute_daily_kpis(records, start=start, end=end, windows=(28,), backend="python"), streamed)
+
+
+def test_unsorted_records_are_rejected():
+    records = [
+        DailyMetricsInput(date=datetime(2024, 1, 2, tzinfo=timezone.utc), weight_kg=80.0),
+        DailyMetricsInput(date=datetime(2024, 1, 1, tzinfo=timezone.utc), weight_kg=81.0),
+    ]
+
+    with pytest.raises(ValueError, match="sorted"):
+        list(iter_daily_kpis(records))
+
+
+def test_stops_reading_after_end():
+    history = make_history(500, seed=11)
+    end = history[100].date.date()
+    consumed = []
+
+    def source():
+        for r in history:
+            consumed.append(r)
+            yield r
+
+    streamed = [k for chunk in iter_daily_kpis(source(), end=end) for k in chunk]
+
+    assert streamed[-1].date.date() == end
+    assert len(consumed) < len(history)
@@ -0,0 +1,63 @@
+# Prefix sums: any range from two cumulative rows must equal a scan of the range.
+
+from datetime import date, timedelta
+
+import pytest
+
+from app.business.kpi_calculator import compute_daily_kpis
+from app.business.range_stats import CUMULATIVE_COLUMNS, accumulate_totals, range_stats
+
+from tests.unit.test_kpi_calculator_numpy import make_history
+
+
+def scan(records, kpis, start: date, end: date, column: str) -> list[float]:
+    source = records if column in ("steps_n", "weight_kg", "kcal_in") else kpis
+    by_day = {r.date.date(): r for r in source}  # last one wins
+    return [getattr(r, column) for d, r in by_day.items() if start <= d <= end and getattr(r, column) is not None]
+
+
+def latest_on_or_before(rows, day: date):
+    candidates = [r for r in rows if r.date.date() <= day]
+    return candidates[-1] if candidates else None
+
+
+def test_any_range_matches_a_scan():
+    records = make_history(400, seed=11)
+    first, last = records[0].date.date(), records[-1].date.date()
+    kpis = compute_daily_kpis(records, start=first, end=last)
+    rows = accumulate_totals(None, records, kpis, start=first, end=last)
+
+    assert len(rows) == (last - first).days + 1  # one row per calendar day
+
+    # ranges inside, across and outside the stored history
+    for start, end in [(first, last), (first + timedelta(days=30), first + timedelta(days=95)),
+                       (first - timedelta(days=10), first + timedelta(days=3)), (last - timedelta(days=2), last + timedelta(days=40)),
+                       (last + timedelta(days=1), last + timedelta(days=9))]:
+        stats = range_stats(
+            latest_on_or_before(rows, start - timedelta(days=1)), latest_on_or_before(rows, end),
+            start=start, end=end, metrics=("steps_n", "weight_kg", "kcal_in", "balance_kcal", "adherence_steps"),
+        )
+        assert stats.days == (end - start).days + 1
+        for column, metric in stats.metrics.items():
+            values = scan(records, kpis, start, end, column)
+            assert metric.count == len(values)
+            assert metric.total == pytest.approx(sum(values), rel=1e-9, abs=1e-6)
+            assert metric.mean == (pytest.approx(sum(values) / len(values)) if values else None)
+            assert metric.coverage == len(values) / stats.days
+
+
+def test_continuing_from_a_previous_row_equals_one_pass():
+    records = make_history(120, seed=5)
+    first, last = records[0].date.date(), records[-1].date.date()
+    kpis = compute_daily_kpis(records, start=first, end=last)
+    middle = first + timedelta(days=50)
+
+    one_pass = accumulate_totals(None, records, kpis, start=first, end=last)
+    head = accumulate_totals(None, records, kpis, start=first, end=middle)
+    tail = accumulate_totals(head[-1], records, kpis, start=middle + timedelta(days=1), end=last)
+
+    assert [(r.date, r.input_days, r.counts) for r in head + tail] == [(r.date, r.input_days, r.counts) for r in one_pass]
+    for a, b in zip(head + tail, one_pass):
+        assert a.sums == pytest.approx(b.sums)
+    assert set(one_pass[-1].sums) == set(CUMULATIVE_COLUMNS)
+    assert one_pass[-1].input_days == len({r.date.date() for r in records})
@@ -0,0 +1,58 @@
+import random
+from datetime import date, timedelta
+
+import pytest
+
+from app.business.rolling import RollingEngine, RollingWindow
+
+
+def brute_force_mean(values: dict[date, float | None], day: date, days: int):
+    window = [values.get(day - timedelta(days=i)) for i in range(days)]
+    window = [v for v in window if v is not None]
+    return sum(window) / len(window) if window else None
+
+
+def test_rolling_window_ignores_missing_values_and_days():
+    window = RollingWindow(7)
+    window.push(date(2026, 1, 1), 80.0)
+    window.push(date(2026, 1, 4), None)
+    window.push(date(2026, 1, 7), 86.0)
+
+    assert window.mean() == 83.0
+    assert window.count == 2
+
+
+def test_rolling_window_evicts_values_older_than_window():
+    window = RollingWindow(3)
+    window.push(date(2026, 1, 1), 10.0)
+    window.push(date(2026, 1, 2), 20.0)
+    window.push(date(2026, 1, 5), None)
+
+    # Jan 1 and Jan 2 are both outside [Jan 3, Jan 5]
+    assert window.mean() is None
+    assert window.count == 0
+
+
+def test_rolling_window_rejects_empty_span():
+    with pytest.raises(ValueError):
+        RollingWindow(0)
+
+
+def test_rolling_engine_matches_brute_force_for_several_windows():
+    rng = random.Random(42)
+    values: dict[date, float | None] = {}
+    engine = RollingEngine(metrics=("weight",), windows=(7, 14, 28, 90))
+
+    day = date(2024, 1, 1)
+    for _ in range(400):
+        day += timedelta(days=rng.choice((1, 1, 1, 2, 5)))  # irregular gaps
+        value = None if rng.random() < 0.2 else rng.uniform(70, 90)
+        values[day] = value
+        engine.push(day, {"weight": value})
+
+        for n in (7, 14, 28, 90):
+            expected = brute_force_mean(values, day, n)
+            if expected is None:
+                assert engine.mean("weight", n) is None
+            else:
+                assert engine.mean("weight", n) == pytest.approx(expected)
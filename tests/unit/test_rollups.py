@@ -0,0 +1,59 @@
+# Weekly / monthly rollups must equal a plain aggregation of each period's daily KPIs.
+
+from datetime import date
+
+import pytest
+
+from app.business.kpi_calculator import compute_daily_kpis
+from app.business.rollups import ROLLUP_COLUMNS, compute_rollups, period_bounds
+
+from tests.unit.test_kpi_calculator_numpy import make_history
+
+
+def test_period_bounds():
+    assert period_bounds(date(2024, 5, 15), "week") == (date(2024, 5, 13), date(2024, 5, 19))  # Wednesday
+    assert period_bounds(date(2024, 5, 13), "week") == (date(2024, 5, 13), date(2024, 5, 19))  # Monday
+    assert period_bounds(date(2024, 12, 31), "week") == (date(2024, 12, 30), date(2025, 1, 5))
+    assert period_bounds(date(2024, 2, 10), "month") == (date(2024, 2, 1), date(2024, 2, 29))
+    assert period_bounds(date(2023, 2, 28), "month") == (date(2023, 2, 1), date(2023, 2, 28))
+    with pytest.raises(ValueError):
+        period_bounds(date(2024, 1, 1), "year")
+
+
+@pytest.mark.parametrize("granularity", ["week", "month"])
+def test_rollups_match_a_plain_aggregation(granularity):
+    records = make_history(200, seed=3)
+    kpis = compute_daily_kpis(records, start=records[0].date.date(), end=records[-1].date.date())
+
+    rollups = compute_rollups(kpis, granularity)
+
+    by_period: dict[date, list] = {}
+    for kpi in kpis:
+        by_period.setdefault(period_bounds(kpi.date.date(), granularity)[0], []).append(kpi)
+
+    assert [r.period_start.date() for r in rollups] == sorted(by_period)
+    for rollup in rollups:
+        days = by_period[rollup.period_start.date()]
+        assert rollup.period_end.date() == period_bounds(rollup.period_start.date(), granularity)[1]
+        assert rollup.days == len(days)
+
+        for column in ROLLUP_COLUMNS:
+            values = [getattr(k, column) for k in days if getattr(k, column) is not None]
+            metric = rollup.metrics[column]
+            assert metric.count == len(values)
+            assert metric.mean == (pytest.approx(sum(values) / len(values)) if values else None)
+            assert (metric.min, metric.max) == ((min(values), max(values)) if values else (None, None))
+
+        adherence = [k.adherence_steps for k in days if k.adherence_steps is not None]
+        assert rollup.adherence_ratio == (pytest.approx(sum(adherence) / len(adherence)) if adherence else None)
+
+
+def test_only_the_requested_periods_are_computed():
+    records = make_history(90, seed=8)
+    kpis = compute_daily_kpis(records, start=records[0].date.date(), end=records[-1].date.date())
+    months = {r.period_start.date(): r for r in compute_rollups(kpis, "month")}
+    wanted = sorted(months)[1:2]
+
+    only = compute_rollups(kpis, "month", periods=set(wanted))
+
+    assert only == [months[wanted[0]]]
@@ -0,0 +1,56 @@
+from datetime import date, datetime, timezone
+
+import pytest
+
+from app.business.kpi_calculator import compute_daily_kpis, compute_kpi_series
+from app.domain.entities import DailyKPIsOutput, DailyMetricsInput
+from app.domain.series import KPISeries, MetricsSeries
+
+from tests.unit.test_kpi_calculator_numpy import KPI_FIELDS, assert_same_kpis, make_history
+
+
+def test_entities_have_no_instance_dict():
+    assert not hasattr(DailyMetricsInput(date=datetime(2024, 1, 1, tzinfo=timezone.utc)), "__dict__")
+    assert not hasattr(DailyKPIsOutput(date=datetime(2024, 1, 1, tzinfo=timezone.utc)), "__dict__")
+
+
+def test_round_trip_keeps_values_types_and_nulls():
+    records = make_history(200, seed=5)
+
+    series = MetricsSeries.from_entities(records)
+
+    assert len(series) == len(records)
+    assert series.to_entities() == records
+    assert series.column("steps_n") == [r.steps_n for r in records]
+
+
+def test_projection_reads_missing_columns_as_none():
+    records = make_history(20, seed=1)
+
+    series = MetricsSeries.from_entities(records, columns=("weight_kg",))
+
+    assert series.columns == ("weight_kg",)
+    assert series.column("kcal_in") == [None] * 20
+    with pytest.raises(ValueError, match="Unknown"):
+        MetricsSeries(columns=("nope",))
+
+
+def test_numpy_round_trip():
+    records = make_history(50, seed=2)
+    series = MetricsSeries.from_entities(records)
+
+    rebuilt = MetricsSeries.from_numpy(series.days, {c: series.to_numpy(c) for c in series.columns})
+
+    assert rebuilt.to_entities() == records
+
+
+@pytest.mark.parametrize("backend", ["python", "numpy"])
+def test_compute_kpi_series_matches_compute_daily_kpis(backend):
+    records = make_history(1_500, seed=9)
+    start, end = date(2015, 6, 1), records[-1].date.date()
+
+    series = compute_kpi_series(MetricsSeries.from_entities(records), start=start, end=end, backend=backend)
+
+    assert isinstance(series, KPISeries)
+    assert series.columns == KPI_FIELDS
+    assert_same_kpis(compute_daily_kpis(records, start=start, end=end, backend="python"), series.to_entities())
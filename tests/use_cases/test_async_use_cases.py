@@ -0,0 +1,89 @@
+# Async use cases, driven with asyncio.run (no async test plugin needed).
+# Repositories are faked: the async SQLAlchemy wiring itself needs a real async driver.
+
+import asyncio
+import time
+from datetime import datetime, timezone
+
+import pytest
+
+from app.business.use_cases import AsyncGetKPIPage, AsyncGetKPIs, AsyncIngestDailyCSV, IngestDailyCSV
+from app.domain.entities import DailyKPIsOutput, DailyMetricsInput
+from tests.use_cases.test_ingest_daily_csv import (
+    FakeCSVParser,
+    FakeFileStorage,
+    FakeInputRepository,
+    FakeOutputRepository,
+)
+
+
+def kpi(day: int) -> DailyKPIsOutput:
+    return DailyKPIsOutput(date=datetime(2024, 1, day, tzinfo=timezone.utc), balance_kcal=float(day))
+
+
+class FakeAsyncOutputRepo:
+    def __init__(self, rows: list[DailyKPIsOutput]):
+        self._rows = rows
+
+    async def get_output(self, start, end):
+        return [r for r in self._rows if start <= r.date <= end]
+
+    async def get_output_page(self, start, end, after=None, limit=100):
+        rows = [r for r in self._rows if start <= r.date.date() <= end and (after is None or r.date.date() > after)]
+        return rows[:limit]
+
+
+def test_async_get_kpis_and_pages():
+    repo = FakeAsyncOutputRepo([kpi(d) for d in range(1, 6)])
+    start, end = datetime(2024, 1, 2, tzinfo=timezone.utc), datetime(2024, 1, 31, tzinfo=timezone.utc)
+
+    rows = asyncio.run(AsyncGetKPIs(output_repo=repo).execute(start, end))
+    first = asyncio.run(AsyncGetKPIPage(output_repo=repo).execute(start, end, limit=3))
+    last = asyncio.run(AsyncGetKPIPage(output_repo=repo).execute(start, end, limit=3, after=first.next_after))
+
+    assert [r.balance_kcal for r in rows] == [2.0, 3.0, 4.0, 5.0]
+    assert [r.balance_kcal for r in first.rows] == [2.0, 3.0, 4.0]
+    assert [r.balance_kcal for r in last.rows] == [5.0]
+    assert last.next_after is None
+
+    with pytest.raises(ValueError):
+        asyncio.run(AsyncGetKPIs(output_repo=repo).execute(end, start))
+
+
+class SlowCSVParser(FakeCSVParser):
+    # Stands in for a big CSV: parsing holds the CPU (here: the calling thread) for a while
+    def parse(self, file_bytes: bytes):
+        time.sleep(0.3)
+        return super().parse(file_bytes)
+
+
+def test_async_ingest_runs_off_the_event_loop():
+    record = DailyMetricsInput(date=datetime(2024, 1, 10, tzinfo=timezone.utc), steps_n=12000, kcal_in=2200)
+    output_repo = FakeOutputRepository()
+    ingest = IngestDailyCSV(
+        input_repo=FakeInputRepository(existing_records=[record]),
+        output_repo=output_repo,
+        file_storage=FakeFileStorage(),
+        parser=SlowCSVParser(records=[record]),
+    )
+
+    async def scenario():
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.01)
+                ticks += 1
+
+        task = asyncio.create_task(ticker())
+        report = await AsyncIngestDailyCSV(ingest=ingest).execute(file_bytes=b"csv", filename="big.csv")
+        task.cancel()
+        return report, ticks
+
+    report, ticks = asyncio.run(scenario())
+
+    assert report.status == "processed"
+    assert len(output_repo.saved_outputs) == 1
+    # The loop kept running while the upload was parsed (it would be ~0 if parsing blocked it)
+    assert ticks >= 10
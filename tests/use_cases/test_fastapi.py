@@ -13,8 +13,9 @@ from datetime import datetime, timezone
 from fastapi import FastAPI
 from fastapi.testclient import TestClient
 
-from app.api.routers.kpis import router, get_output_repo
+from app.api.routers.kpis import router, get_async_output_repo, get_output_repo
 from app.domain.entities import DailyKPIsOutput
+from app.domain.series import KPISeries
 
 
 class FakeOutputRepo:
@@ -26,13 +27,38 @@ class FakeOutputRepo:
         self.calls.append((start, end))
         return self._rows
 
+    def iter_output(self, start, end, batch_size=1000):
+        self.calls.append((start, end))
+        for i in range(0, len(self._rows), batch_size):
+            yield self._rows[i:i + batch_size]
+
+    def get_output_page(self, start, end, after=None, limit=100):
+        self.calls.append((start, end))
+        rows = [r for r in self._rows if after is None or r.date.date() > after]
+        return rows[:limit]
+
+    def get_output_series(self, start, end) -> KPISeries:
+        self.calls.append((start, end))
+        return KPISeries.from_entities(self._rows)
+
+
+class FakeAsyncOutputRepo:
+    # Async twin used by the `async def` endpoints (same rows as the sync fake)
+    def __init__(self, sync_repo: FakeOutputRepo):
+        self._sync = sync_repo
+
+    async def iter_output(self, start, end, batch_size=1000):
+        for batch in self._sync.iter_output(start, end, batch_size=batch_size):
+            yield batch
+
 
 def make_client_with_repo(fake_repo: FakeOutputRepo) -> TestClient:
     app = FastAPI()
     app.include_router(router)
 
-    # FastAPI-native override: swap the real repo provider for our fake
+    # FastAPI-native override: swap the real repo providers for our fakes
     app.dependency_overrides[get_output_repo] = lambda: fake_repo
+    app.dependency_overrides[get_async_output_repo] = lambda: FakeAsyncOutputRepo(fake_repo)
 
     return TestClient(app)
 
@@ -81,3 +107,156 @@ def test_kpis_start_after_end_returns_400_and_repo_not_called():
 
     # Business rule triggers before hitting repo
     assert fake_repo.calls == []
+
+
+def test_kpis_columns_returns_one_list_per_field():
+    rows = [
+        DailyKPIsOutput(date=datetime(2024, 1, 1, tzinfo=timezone.utc), balance_kcal=-200, adherence_steps=1),
+        DailyKPIsOutput(date=datetime(2024, 1, 2, tzinfo=timezone.utc), balance_kcal=150, adherence_steps=None),
+    ]
+    fake_repo = FakeOutputRepo(rows=rows)
+    client = make_client_with_repo(fake_repo)
+
+    resp = client.get("/kpis/columns", params={"start_date": "2024-01-01", "end_date": "2024-01-07"})
+
+    assert resp.status_code == 200
+    data = resp.json()
+    assert data["date"] == ["2024-01-01", "2024-01-02"]
+    assert data["balance_kcal"] == [-200.0, 150.0]
+    assert data["adherence_steps"] == [1, None]
+    assert data["weight_7d_avg"] == [None, None]
+
+
+def test_kpis_stream_returns_same_json_as_list_endpoint():
+    rows = [
+        DailyKPIsOutput(date=datetime(2024, 1, d, tzinfo=timezone.utc), balance_kcal=-10.0 * d, adherence_steps=d % 2)
+        for d in range(1, 31)
+    ]
+    client = make_client_with_repo(FakeOutputRepo(rows=rows))
+    params = {"start_date": "2024-01-01", "end_date": "2024-01-31"}
+
+    streamed = client.get("/kpis/stream", params=params)
+
+    assert streamed.status_code == 200
+    assert streamed.headers["content-type"] == "application/json"
+    assert streamed.json() == client.get("/kpis/", params=params).json()
+
+
+def test_kpis_stream_empty_range_and_bad_range():
+    client = make_client_with_repo(FakeOutputRepo(rows=[]))
+
+    assert client.get("/kpis/stream", params={"start_date": "2024-01-01", "end_date": "2024-01-02"}).json() == []
+    resp = client.get("/kpis/stream", params={"start_date": "2024-01-10", "end_date": "2024-01-09"})
+    assert resp.status_code == 400
+
+
+
+def test_kpis_pages_follow_next_cursor_until_exhausted():
+    rows = [
+        DailyKPIsOutput(date=datetime(2024, 1, d, tzinfo=timezone.utc), balance_kcal=float(d), adherence_steps=1)
+        for d in range(1, 8)
+    ]
+    client = make_client_with_repo(FakeOutputRepo(rows=rows))
+    params = {"start_date": "2024-01-01", "end_date": "2024-01-31", "limit": 3}
+
+    pages = []
+    while True:
+        resp = client.get("/kpis/", params=params)
+        assert resp.status_code == 200
+        pages.append([r["balance_kcal"] for r in resp.json()])
+        cursor = resp.headers.get("X-Next-Cursor")
+        if cursor is None:
+            break
+        params["cursor"] = cursor
+
+    assert pages == [[1.0, 2.0, 3.0], [4.0, 5.0, 6.0], [7.0]]
+    # Unpaged calls are unchanged (no cursor header, full list)
+    unpaged = client.get("/kpis/", params={"start_date": "2024-01-01", "end_date": "2024-01-31"})
+    assert "X-Next-Cursor" not in unpaged.headers
+    assert len(unpaged.json()) == 7
+
+
+def test_kpis_page_rejects_bad_cursor_and_limit():
+    client = make_client_with_repo(FakeOutputRepo(rows=[]))
+    params = {"start_date": "2024-01-01", "end_date": "2024-01-31"}
+
+    assert client.get("/kpis/", params={**params, "cursor": "not-a-cursor"}).status_code == 400
+    assert client.get("/kpis/", params={**params, "limit": 0}).status_code == 422
+    assert client.get("/kpis/", params={**params, "limit": 100_000}).status_code == 422
+
+
+def test_stats_range_answers_from_two_cumulative_rows():
+    from app.api.routers.stats import get_cumulative_repo, router as stats_router
+    from app.domain.entities import CumulativeTotals
+
+    class FakeCumulativeRepo:
+        # Days 1..10 of Jan 2024 stored, weight 80 on even days only
+        def __init__(self):
+            self.lookups = []
+
+        def get_cumulative(self, day):
+            self.lookups.append(day)
+            if day < datetime(2024, 1, 1).date():
+                return None
+            n = min(day.day if day.month == 1 and day.year == 2024 else 10, 10)
+            return CumulativeTotals(
+                date=datetime(2024, 1, n, tzinfo=timezone.utc), input_days=n,
+                sums={"weight_kg": 80.0 * (n // 2)}, counts={"weight_kg": n // 2},
+            )
+
+    repo = FakeCumulativeRepo()
+    app = FastAPI()
+    app.include_router(stats_router)
+    app.dependency_overrides[get_cumulative_repo] = lambda: repo
+    client = TestClient(app)
+
+    response = client.get("/stats/range", params={"start_date": "2024-01-03", "end_date": "2024-01-12", "metrics": "weight_kg"})
+
+    assert response.status_code == 200
+    body = response.json()
+    assert (body["days"], body["input_days"]) == (10, 8)
+    assert body["metrics"]["weight_kg"] == {"total": 320.0, "count": 4, "mean": 80.0, "coverage": 0.4}
+    assert len(repo.lookups) == 2
+
+    assert client.get("/stats/range", params={"start_date": "2024-01-03", "end_date": "2024-01-12", "metrics": "nope"}).status_code == 400
+    assert client.get("/stats/range", params={"start_date": "2024-02-03", "end_date": "2024-01-12"}).status_code == 400
+
+
+def test_kpi_rollup_serves_materialized_periods():
+    from app.api.routers.kpis import get_rollup_repo
+    from app.domain.entities import KPIRollup, MetricRollup
+
+    class FakeRollupRepo:
+        def __init__(self):
+            self.calls = []
+
+        def get_rollups(self, granularity, start, end):
+            self.calls.append((granularity, start, end))
+            return [
+                KPIRollup(
+                    granularity=granularity,
+                    period_start=datetime(2024, 1, 1, tzinfo=timezone.utc),
+                    period_end=datetime(2024, 1, 31, tzinfo=timezone.utc),
+                    days=31,
+                    adherence_ratio=0.5,
+                    metrics={"balance_kcal": MetricRollup(mean=-250.0, min=-900.0, max=300.0, count=30)},
+                )
+            ]
+
+    repo = FakeRollupRepo()
+    app = FastAPI()
+    app.include_router(router)
+    app.dependency_overrides[get_rollup_repo] = lambda: repo
+    client = TestClient(app)
+
+    response = client.get("/kpis/rollup", params={"granularity": "month", "start_date": "2024-01-15", "end_date": "2024-03-01"})
+
+    assert response.status_code == 200
+    assert response.json() == [{
+        "granularity": "month", "period_start": "2024-01-01", "period_end": "2024-01-31", "days": 31, "adherence_ratio": 0.5,
+        "metrics": {"balance_kcal": {"mean": -250.0, "min": -900.0, "max": 300.0, "count": 30}},
+    }]
+    # whole months: the first period starts before start_date
+    assert repo.calls == [("month", datetime(2024, 1, 1).date(), datetime(2024, 3, 1).date())]
+
+    assert client.get("/kpis/rollup", params={"granularity": "year", "start_date": "2024-01-01", "end_date": "2024-03-01"}).status_code == 400
@@ -0,0 +1,127 @@
+# Next-day uploads with a rolling-state checkpoint: no context read, same KPIs as the windowed path.
+
+from __future__ import annotations
+
+from datetime import date, datetime, timezone
+
+import pytest
+
+from app.business.kpi_calculator import compute_daily_kpis, kpis_equal
+from app.business.use_cases import IngestDailyCSV
+from app.domain.entities import DailyMetricsInput, RollingCheckpoint
+
+from tests.use_cases.test_ingest_daily_csv import FakeCSVParser, FakeFileStorage, FakeOutputRepository
+
+
+class InMemoryInputRepository:
+    def __init__(self):
+        self.rows: dict[date, DailyMetricsInput] = {}
+        self.get_calls = []
+
+    def save_input(self, input_data):
+        for r in input_data:
+            self.rows[r.date.date()] = r
+        days = [r.date.date() for r in input_data]
+        return min(days), max(days)
+
+    def get_input(self, start, end):
+        self.get_calls.append((start, end))
+        return [self.rows[d] for d in sorted(self.rows) if start <= d <= end]
+
+
+class FakeCheckpointRepository:
+    """Mimics the real repository: a checkpoint is only returned while it matches the latest input day."""
+
+    def __init__(self, input_repo: InMemoryInputRepository):
+        self.input_repo = input_repo
+        self.checkpoint: RollingCheckpoint | None = None
+
+    def get_checkpoint(self):
+        if self.checkpoint is None or not self.input_repo.rows:
+            return None
+        if max(self.input_repo.rows) != self.checkpoint.date.date():
+            return None
+        return self.checkpoint
+
+    def save_checkpoint(self, checkpoint):
+        self.checkpoint = checkpoint
+
+
+def make_day(day: int, **values) -> DailyMetricsInput:
+    defaults = dict(steps_n=9_000 + 150 * day, kcal_in=2_100, kcal_junk_in=250, kcal_out_training=350,
+                    proteins_g=140, weight_kg=82.0 - day / 10, waist_cm=95.0 - day / 5)
+    defaults.update(values)
+    return DailyMetricsInput(date=datetime(2024, 5, day, tzinfo=timezone.utc), **defaults)
+
+
+@pytest.fixture()
+def setup():
+    input_repo = InMemoryInputRepository()
+    output_repo = FakeOutputRepository()
+    checkpoint_repo = FakeCheckpointRepository(input_repo)
+
+    def upload(records):
+        return IngestDailyCSV(
+            input_repo=input_repo,
+            output_repo=output_repo,
+            file_storage=FakeFileStorage(),
+            parser=FakeCSVParser(records=records),
+            checkpoint_repo=checkpoint_repo,
+        ).execute(b"bytes", "upload.csv")
+
+    return input_repo, output_repo, checkpoint_repo, upload
+
+
+def test_next_day_upload_uses_checkpoint_and_skips_context_read(setup):
+    input_repo, output_repo, checkpoint_repo, upload = setup
+
+    upload([make_day(d) for d in range(1, 15)])      # first load: windowed path, seeds the checkpoint
+    assert checkpoint_repo.checkpoint.date.date() == date(2024, 5, 14)
+
+    input_repo.get_calls.clear()
+    output_repo.saved_outputs.clear()
+    report = upload([make_day(15)])
+
+    assert report.status == "processed"
+    assert input_repo.get_calls == []                 # no context read at all
+    assert checkpoint_repo.checkpoint.date.date() == date(2024, 5, 15)
+
+    # Same KPIs as a full recompute over the stored history
+    expected = compute_daily_kpis(list(input_repo.rows.values()), start=date(2024, 5, 15), end=date(2024, 5, 15))
+    assert len(output_repo.saved_outputs) == 1
+    assert kpis_equal(output_repo.saved_outputs[0], expected[0])
+    assert output_repo.saved_outputs[0].waist_change_7d is not None
+
+
+def test_backdated_upload_falls_back_to_windowed_recompute(setup):
+    input_repo, output_repo, checkpoint_repo, upload = setup
+    upload([make_day(d) for d in range(1, 15)])
+    input_repo.get_calls.clear()
+
+    upload([make_day(10, weight_kg=90.0)])
+
+    assert input_repo.get_calls != []                 # context was read
+    assert checkpoint_repo.checkpoint.date.date() == date(2024, 5, 14)
+
+
+def test_gap_after_checkpoint_falls_back(setup):
+    input_repo, output_repo, checkpoint_repo, upload = setup
+    upload([make_day(d) for d in range(1, 10)])
+    input_repo.get_calls.clear()
+
+    upload([make_day(12)])                             # skips May 10-11
+
+    assert input_repo.get_calls != []
+    assert checkpoint_repo.checkpoint.date.date() == date(2024, 5, 12)
+
+
+def test_unreadable_checkpoint_state_falls_back(setup):
+    input_repo, output_repo, checkpoint_repo, upload = setup
+    upload([make_day(d) for d in range(1, 10)])
+    checkpoint_repo.checkpoint = RollingCheckpoint(date=checkpoint_repo.checkpoint.date, state={"version": 0})
+    input_repo.get_calls.clear()
+
+    report = upload([make_day(10)])
+
+    assert report.status == "processed"
+    assert input_repo.get_calls != []
@@ -62,7 +62,7 @@ parser.parse
 '''
 
 
-from datetime import datetime
+from datetime import date, datetime
 from typing import List
 
 from app.domain.entities import DailyMetricsInput, DailyKPIsOutput
@@ -113,12 +113,16 @@ class FakeInputRepository:
 
 
 class FakeOutputRepository:
-    def __init__(self):
+    def __init__(self, existing_outputs: List[DailyKPIsOutput] | None = None):
         self.saved_outputs = []
+        self.existing_outputs = existing_outputs or []
 
     def save_output(self, output_data: List[DailyKPIsOutput]) -> None:
         self.saved_outputs.extend(output_data)
 
+    def get_output(self, start: datetime, end: datetime) -> List[DailyKPIsOutput]:
+        return [k for k in self.existing_outputs if start.date() <= k.date.date() <= end.date()]
+
 
 
 
@@ -240,3 +244,96 @@ def test_file_is_moved_to_processed_only_after_success():
     assert storage.saved_files
     assert storage.processed == ["fake://file.csv"]
     assert storage.unprocessable == []
+
+
+class RangeReportingInputRepository(FakeInputRepository):
+    def __init__(self, existing_records, affected_range):
+        super().__init__(existing_records=existing_records)
+        self.affected_range = affected_range
+
+    def save_input(self, input_data):
+        super().save_input(input_data)
+        return self.affected_range
+
+
+def test_kpi_context_uses_range_reported_by_input_repo():
+    record = DailyMetricsInput(date=datetime(2024, 1, 10, tzinfo=timezone.utc), weight_kg=80.0)
+
+    input_repo = RangeReportingInputRepository(
+        existing_records=[record],
+        affected_range=(date(2024, 1, 8), date(2024, 1, 10)),
+    )
+
+    use_case = IngestDailyCSV(
+        input_repo=input_repo,
+        output_repo=FakeOutputRepository(),
+        file_storage=FakeFileStorage(),
+        parser=FakeCSVParser(records=[record]),
+    )
+
+    report = use_case.execute(b"bytes", "file.csv")
+
+    assert report.status == "processed"
+    # context starts one max-lookback (7 days) before the reported start, not before the uploaded record
+    assert input_repo.get_calls[0][0] == date(2024, 1, 1)
+
+
+class RangeFilteringInputRepository(FakeInputRepository):
+    def get_input(self, start, end):
+        self.get_calls.append((start, end))
+        return [r for r in self.existing_records if start <= r.date.date() <= end]
+
+
+def make_day(day: int, **values) -> DailyMetricsInput:
+    return DailyMetricsInput(date=datetime(2024, 3, day, tzinfo=timezone.utc), **values)
+
+
+def test_backfill_recomputes_downstream_days_and_waist_lookback():
+    history = [make_day(d, weight_kg=80.0, waist_cm=90.0) for d in range(1, 21)]
+    backfilled = make_day(5, weight_kg=87.0, waist_cm=95.0)
+    stored_inputs = [r for r in history if r.date.day != 5] + [backfilled]
+
+    input_repo = RangeFilteringInputRepository(existing_records=stored_inputs)
+    output_repo = FakeOutputRepository()
+
+    use_case = IngestDailyCSV(
+        input_repo=input_repo,
+        output_repo=output_repo,
+        file_storage=FakeFileStorage(),
+        parser=FakeCSVParser(records=[backfilled]),
+    )
+
+    use_case.execute(b"bytes", "backfill.csv")
+
+    # Context starts 7 days before the backfilled day (waist_change_7d lookback)
+    # and extends 7 days after it (the days whose windows contain Mar 5)
+    assert input_repo.get_calls == [(date(2024, 2, 27), date(2024, 3, 12))]
+
+    saved = {k.date.day: k for k in output_repo.saved_outputs}
+    assert sorted(saved) == list(range(5, 13))
+    assert saved[11].weight_7d_avg == 81.0      # Mar 5..11 window includes the 87.0
+    assert saved[12].waist_change_7d == -5.0    # 90 (Mar 12) - 95 (Mar 5)
+
+
+def test_unchanged_kpis_are_not_upserted_again():
+    records = [make_day(d, steps_n=12_000, kcal_in=2_000, kcal_out_training=300) for d in range(1, 4)]
+    input_repo = RangeFilteringInputRepository(existing_records=records)
+    output_repo = FakeOutputRepository()
+
+    def run():
+        IngestDailyCSV(
+            input_repo=input_repo,
+            output_repo=output_repo,
+            file_storage=FakeFileStorage(),
+            parser=FakeCSVParser(records=records),
+        ).execute(b"bytes", "same.csv")
+
+    run()
+    assert len(output_repo.saved_outputs) == 3
+
+    # Re-upload the same file: every KPI is already stored with the same values
+    output_repo.existing_outputs = list(output_repo.saved_outputs)
+    output_repo.saved_outputs = []
+    run()
+
+    assert output_repo.saved_outputs == []
@@ -0,0 +1,97 @@
+# Partial recompute after a profile change (only the affected KPIs and their input columns)
+# and streamed full rebuilds.
+
+from __future__ import annotations
+
+from dataclasses import fields, replace
+from datetime import date, datetime, timezone
+
+import pytest
+
+from app.business.kpi_calculator import compute_daily_kpis, kpis_equal
+from app.business.use_cases import RebuildKPIs, RecomputeKPIs
+from app.domain.entities import DailyMetricsInput
+
+from tests.use_cases.test_ingest_daily_csv import FakeOutputRepository
+
+
+class ProjectingInputRepository:
+    def __init__(self, rows: list[DailyMetricsInput]):
+        self.rows = rows
+        self.get_calls = []
+
+    def get_input(self, start, end, columns=None):
+        self.get_calls.append((start, end, columns))
+        selected = [r for r in self.rows if start <= r.date.date() <= end]
+        if columns is None:
+            return selected
+        dropped = {f.name: None for f in fields(DailyMetricsInput) if f.name != "date" and f.name not in columns}
+        return [replace(r, **dropped) for r in selected]
+
+    def iter_input(self, start=None, end=None, batch_size=1000):
+        self.get_calls.append((start, end, None))
+        return iter([r for r in self.rows if (start is None or start <= r.date.date()) and (end is None or r.date.date() <= end)])
+
+
+def make_day(day: int) -> DailyMetricsInput:
+    return DailyMetricsInput(
+        date=datetime(2024, 3, day, tzinfo=timezone.utc),
+        steps_n=8_000 + 250 * day, kcal_in=2_000, kcal_junk_in=300, kcal_out_training=400,
+        proteins_g=130, weight_kg=80.0 - day / 10, waist_cm=92.0,
+    )
+
+
+def test_steps_goal_change_only_rewrites_adherence():
+    rows = [make_day(d) for d in range(1, 21)]
+    stored = compute_daily_kpis(rows, start=date(2024, 3, 1), end=date(2024, 3, 20), target_steps=10_000)
+    input_repo = ProjectingInputRepository(rows)
+    output_repo = FakeOutputRepository(existing_outputs=stored)
+
+    changed = RecomputeKPIs(input_repo=input_repo, output_repo=output_repo, steps_goal=11_000).execute(
+        date(2024, 3, 1), date(2024, 3, 20), changed_params={"target_steps"}
+    )
+
+    # adherence flips for steps in [10_000, 11_000): days 8..11
+    assert [k.date.day for k in changed] == [8, 9, 10, 11]
+    assert all(k.adherence_steps == 0 for k in changed)
+    assert all(k.balance_7d_average is not None for k in changed)  # other KPIs kept their stored values
+    assert output_repo.saved_outputs == changed
+
+    # only the steps column was read, with no extra context (adherence has no lookback)
+    assert input_repo.get_calls == [(date(2024, 3, 1), date(2024, 3, 20), ("steps_n",))]
+
+
+def test_rolling_kpi_recompute_reads_the_window_context():
+    rows = [make_day(d) for d in range(1, 21)]
+    input_repo = ProjectingInputRepository(rows)
+
+    RecomputeKPIs(input_repo=input_repo, output_repo=FakeOutputRepository()).execute(
+        date(2024, 3, 10), date(2024, 3, 12), kpis=["weight_7d_avg"]
+    )
+
+    assert input_repo.get_calls == [(date(2024, 3, 4), date(2024, 3, 12), ("weight_kg",))]
+
+
+def test_non_persisted_kpis_are_rejected():
+    use_case = RecomputeKPIs(input_repo=ProjectingInputRepository([]), output_repo=FakeOutputRepository())
+
+    with pytest.raises(ValueError, match="persisted"):
+        use_case.execute(date(2024, 3, 1), date(2024, 3, 2), kpis=["weight_28d_avg"])
+
+
+def test_rebuild_saves_in_chunks_and_matches_batch_computation():
+    rows = [make_day(d) for d in range(1, 31)]
+    input_repo = ProjectingInputRepository(rows)
+    output_repo = FakeOutputRepository()
+    saved_chunks = []
+    output_repo.save_output = lambda output_data: saved_chunks.append(output_data)
+
+    saved = RebuildKPIs(input_repo=input_repo, output_repo=output_repo, chunk_size=4).execute(
+        start=date(2024, 3, 10)
+    )
+
+    expected = compute_daily_kpis(rows, start=date(2024, 3, 10), end=date(2024, 3, 30))
+    assert saved == len(expected) == 21
+    assert [len(c) for c in saved_chunks] == [4, 4, 4, 4, 4, 1]
+    assert all(kpis_equal(a, b) for a, b in zip([k for c in saved_chunks for k in c], expected))
+    assert input_repo.get_calls == [(date(2024, 3, 3), None, None)]  # 7-day window context